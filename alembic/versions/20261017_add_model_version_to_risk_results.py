@@ -0,0 +1,25 @@
+"""Add model_version to depression risk results
+
+Revision ID: 20261017_risk_model_version
+Revises: 20260424_merge_heads
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_risk_model_version"
+down_revision: Union[str, None] = "20260424_merge_heads"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("depression_risk_results", sa.Column("model_version", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("depression_risk_results", "model_version")
@@ -0,0 +1,93 @@
+"""updated_at and delete tombstones for GET /sync
+
+Revision ID: 20261017_sync_change_tracking
+Revises: 20261017_user_created_at_idx
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_sync_change_tracking"
+down_revision: Union[str, None] = "20261017_user_created_at_idx"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNCED_TABLES = ["mood_journaling", "notifications", "depression_risk_results"]
+PRIMARY_KEYS = {"mood_journaling": "mood_id", "notifications": "id", "depression_risk_results": "result_id"}
+TOMBSTONES_INDEX = "ix_sync_tombstones_user_id_deleted_at"
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # now() is the start of this transaction: the value the new column reports for existing rows
+    added_at = bind.execute(sa.text("SELECT now()")).scalar()
+    for table in SYNCED_TABLES:
+        # PostgreSQL 11+ evaluates a non-volatile default like now() once and keeps it in the
+        # catalog, so adding the column rewrites no rows and holds its lock only briefly
+        op.add_column(
+            table,
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        )
+
+    op.create_table(
+        "sync_tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("table_name", sa.String(length=64), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_sync_tombstones_id"), "sync_tombstones", ["id"], unique=False)
+    op.create_index(TOMBSTONES_INDEX, "sync_tombstones", ["user_id", "deleted_at"], unique=False)
+
+    with op.get_context().autocommit_block():
+        # Existing rows were last changed when they were created. Backfill in
+        # primary-key batches, each committed on its own, so no batch holds its row
+        # locks for long; rows the app changed since the column was added are kept
+        for table in SYNCED_TABLES:
+            backfill_updated_at(bind, table, PRIMARY_KEYS[table], added_at)
+
+        # GET /sync range-scans each table by (user_id, updated_at); CONCURRENTLY keeps
+        # the tables writable while the indexes build, outside a transaction
+        for table in SYNCED_TABLES:
+            op.create_index(
+                f"ix_{table}_user_id_updated_at",
+                table,
+                ["user_id", "updated_at"],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+
+def backfill_updated_at(bind, table: str, primary_key: str, added_at) -> None:
+    """Set updated_at to created_at for rows still holding the column's added_at default"""
+    first, last = bind.execute(sa.text(f"SELECT min({primary_key}), max({primary_key}) FROM {table}")).one()
+    if first is None:
+        return
+    update = sa.text(
+        f"UPDATE {table} SET updated_at = created_at "
+        f"WHERE {primary_key} >= :start AND {primary_key} < :stop "
+        "AND updated_at = :added_at AND created_at IS NOT NULL"
+    )
+    for start in range(first, last + 1, BACKFILL_BATCH_SIZE):
+        bind.execute(update, {"start": start, "stop": start + BACKFILL_BATCH_SIZE, "added_at": added_at})
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in reversed(SYNCED_TABLES):
+            op.drop_index(f"ix_{table}_user_id_updated_at", table_name=table, postgresql_concurrently=True)
+
+    op.drop_index(TOMBSTONES_INDEX, table_name="sync_tombstones")
+    op.drop_index(op.f("ix_sync_tombstones_id"), table_name="sync_tombstones")
+    op.drop_table("sync_tombstones")
+    for table in reversed(SYNCED_TABLES):
+        op.drop_column(table, "updated_at")
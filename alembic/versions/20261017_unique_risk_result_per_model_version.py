@@ -0,0 +1,46 @@
+"""Unique depression risk result per test and model version
+
+Revision ID: 20261017_unique_risk_result
+Revises: 20261017_risk_model_version
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_unique_risk_result"
+down_revision: Union[str, None] = "20261017_risk_model_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Retried predictions may already have stored duplicates; keep the newest of each
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM depression_risk_results
+            WHERE depression_test_id IS NOT NULL
+              AND model_version IS NOT NULL
+              AND result_id NOT IN (
+                  SELECT MAX(result_id)
+                  FROM depression_risk_results
+                  WHERE depression_test_id IS NOT NULL AND model_version IS NOT NULL
+                  GROUP BY depression_test_id, model_version
+              )
+            """
+        )
+    )
+    op.create_index(
+        "uq_depression_risk_results_test_model_version",
+        "depression_risk_results",
+        ["depression_test_id", "model_version"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_depression_risk_results_test_model_version", table_name="depression_risk_results")
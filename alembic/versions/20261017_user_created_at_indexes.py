@@ -0,0 +1,57 @@
+"""Composite (user_id, created_at) indexes for per-user time series
+
+Revision ID: 20261017_user_created_at_idx
+Revises: 20261017_unique_risk_result
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261017_user_created_at_idx"
+down_revision: Union[str, None] = "20261017_unique_risk_result"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, table) pairs on (user_id, created_at DESC): every per-user read filters
+# by user_id and orders or ranges by created_at
+USER_CREATED_AT_INDEXES = [
+    ("ix_mood_journaling_user_id_created_at", "mood_journaling"),
+    ("ix_depression_tests_user_id_created_at", "depression_tests"),
+    ("ix_depression_risk_results_user_id_created_at", "depression_risk_results"),
+    ("ix_notifications_user_id_created_at", "notifications"),
+]
+UNREAD_NOTIFICATIONS_INDEX = "ix_notifications_unread_user_id_created_at"
+
+
+def upgrade() -> None:
+    # CONCURRENTLY on PostgreSQL so the tables stay writable while the indexes build;
+    # it cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for index, table in USER_CREATED_AT_INDEXES:
+            op.create_index(
+                index,
+                table,
+                ["user_id", sa.text("created_at DESC")],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.create_index(
+            UNREAD_NOTIFICATIONS_INDEX,
+            "notifications",
+            ["user_id", sa.text("created_at DESC")],
+            postgresql_where=sa.text("is_read = false"),
+            sqlite_where=sa.text("is_read = 0"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(UNREAD_NOTIFICATIONS_INDEX, table_name="notifications", postgresql_concurrently=True)
+        for index, table in reversed(USER_CREATED_AT_INDEXES):
+            op.drop_index(index, table_name=table, postgresql_concurrently=True)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db, get_db, get_read_db
 from app.models.user import UserCreate, UserLogin, UserResponse, Token
 from app.crud import user as user_crud
 from app.utils.security import create_access_token, decode_access_token
@@ -14,32 +15,80 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
-    """Dependency to get current authenticated user"""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_user_id(token: str) -> int:
     token_data = decode_access_token(token)
     if token_data is None or token_data.user_id is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return token_data.user_id
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """
+    Dependency to get current authenticated user, for sync def routes
+    
+    A plain def, so FastAPI runs its query in the threadpool rather than on the
+    event loop; it shares the route's get_db session. Users are served from
+    user_cache for up to USER_CACHE_TTL_SECONDS without a query.
+    """
+    user = user_crud.get_user_by_id_cached(db, user_id=_token_user_id(token))
+    if user is None:
+        raise _credentials_exception()
+    
+    return user
+
+
+def get_current_user_read(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_read_db)
+):
+    """get_current_user for read-only routes, sharing the route's get_read_db session"""
+    user = user_crud.get_user_by_id_cached(db, user_id=_token_user_id(token))
+    if user is None:
+        raise _credentials_exception()
+    
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Dependency to get current authenticated user, for async def routes"""
+    user = await user_crud.get_user_by_id_async(db, user_id=_token_user_id(token))
+    if user is None:
+        raise _credentials_exception()
     
-    user = user_crud.get_user_by_id(db, user_id=token_data.user_id)
+    return user
+
+
+async def get_current_user_read_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """get_current_user_async for read-only routes, sharing the route's get_async_read_db session"""
+    user = await user_crud.get_user_by_id_async(db, user_id=_token_user_id(token))
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     return user
 
 
 @router.post("/signup", response_model=Token, status_code=status.HTTP_201_CREATED)
-async def signup(user: UserCreate, db: Session = Depends(get_db)):
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     # Check if user already exists
-    existing_user = user_crud.get_user_by_email(db, email=user.email)
+    existing_user = await user_crud.get_user_by_email_async(db, email=user.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -47,7 +96,7 @@ async def signup(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create user
-    db_user = user_crud.create_user(db, user=user)
+    db_user = await user_crud.create_user_async(db, user=user)
     
     # Send welcome email (non-blocking)
     try:
@@ -68,11 +117,11 @@ async def signup(user: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Login user and return access token"""
     # Authenticate user
-    user = user_crud.authenticate_user(db, email=form_data.username, password=form_data.password)
+    user = await user_crud.authenticate_user_async(db, email=form_data.username, password=form_data.password)
     
     if not user:
         raise HTTPException(
@@ -91,9 +140,9 @@ async def login(
 
 
 @router.post("/login-json", response_model=Token)
-async def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
+async def login_json(user_login: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login with JSON body (alternative to form data)"""
-    user = user_crud.authenticate_user(db, email=user_login.email, password=user_login.password)
+    user = await user_crud.authenticate_user_async(db, email=user_login.email, password=user_login.password)
     
     if not user:
         raise HTTPException(
@@ -110,13 +159,13 @@ async def login_json(user_login: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user = Depends(get_current_user)):
+async def get_current_user_info(current_user = Depends(get_current_user_async)):
     """Get current user information"""
     return current_user
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(current_user = Depends(get_current_user)):
+async def refresh_token(current_user = Depends(get_current_user_async)):
     """Refresh access token"""
     access_token = create_access_token(
         data={"sub": current_user.id, "email": current_user.email},
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
 from uuid import uuid4
 import json
 import logging
-from app.database import get_db
+from app.database import get_async_db, get_async_read_db, get_db, recent_writes
 from app.models.chatbot import (
     ChatMessage,
     ConversationContext,
@@ -20,7 +21,7 @@ from app.services.chatbot_service import (
     dict_to_message,
     message_to_dict,
 )
-from app.api.auth import get_current_user
+from app.api.auth import get_current_user_async, get_current_user_read_async
 from app.utils.security import decode_access_token
 from app.config import settings
 
@@ -29,13 +30,13 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/chatbot", tags=["Chatbot"])
 
 
-def _build_conversation_context(db: Session, user_id: int) -> ConversationContext:
+async def _build_conversation_context(db: AsyncSession, user_id: int) -> ConversationContext:
     """Build personalized context from user's recent data."""
-    recent_moods = mood_crud.get_user_mood_entries(db, user_id=user_id, limit=1)
+    recent_moods = await mood_crud.get_user_mood_entries_async(db, user_id=user_id, limit=1)
     recent_mood = recent_moods[0] if recent_moods else None
 
-    recent_risk = risk_crud.get_latest_risk_result(db, user_id=user_id)
-    stats = mood_crud.get_mood_statistics(db, user_id=user_id, days=30)
+    recent_risk = await risk_crud.get_latest_risk_result_by_user_async(db, user_id=user_id)
+    stats = await mood_crud.get_mood_statistics_async(db, user_id=user_id, days=30)
 
     return ConversationContext(
         user_id=user_id,
@@ -48,11 +49,11 @@ def _build_conversation_context(db: Session, user_id: int) -> ConversationContex
 
 @router.get("/conversation/bootstrap", response_model=FrontendChatBootstrapResponse)
 async def conversation_bootstrap(
-    current_user=Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Bootstrap payload for frontend chatbot screen."""
-    context = _build_conversation_context(db=db, user_id=current_user.id)
+    context = await _build_conversation_context(db=db, user_id=current_user.id)
 
     starter_suggestions = [
         "How are you feeling today?",
@@ -203,6 +204,7 @@ async def websocket_endpoint(websocket: WebSocket, token: str = Query(None)):
                     history_messages = chat.get_history()
                     if history_messages:
                         chat_history_crud.update_chat_history(db, user_id, json.dumps([message_to_dict(msg) for msg in history_messages], default=pydantic_encoder))
+                        recent_writes.record(user_id)
                         logger.info(f"Saved {len(history_messages)} messages for user {user_id}")
                 except Exception as e:
                     logger.error(f"Error saving chat history: {str(e)}")
@@ -236,11 +238,11 @@ async def websocket_endpoint(websocket: WebSocket, token: str = Query(None)):
 
 @router.get("/conversation/history", response_model=list[ChatMessage])
 async def get_conversation_history(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_read_async),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """Retrieve the user's chat history."""
-    history = chat_history_crud.get_user_chat_history(db, user_id=current_user.id)
+    history = await chat_history_crud.get_user_chat_history_async(db, user_id=current_user.id)
     if not history or not history.messages:
         return []
     
@@ -1,29 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app.api.auth import get_current_user
-from app.database import get_db
+from app.api.auth import get_current_user, get_current_user_read
+from app.config import settings
+from app.database import get_db, get_read_db
 from app.schemas.depression_risk_result import (
+    DepressionRiskBatchRequest,
     DepressionRiskResultCreate,
     DepressionRiskResultResponse,
     WeeklyRiskScoresResponse,
+    WhatIfResponse,
     DailyRiskResultsResponse,
 )
 from app.crud.depression_risk_result import (
     create_risk_result,
+    create_risk_results_bulk,
+    get_or_create_risk_result,
+    get_risk_result_for_test,
+    get_risk_results_for_tests,
     get_weekly_risk_scores,
     get_latest_risk_result_by_user,
     get_daily_risk_results,
+    get_daily_risk_results_page,
 )
-from app.crud.depression_test import get_depression_test_by_id
+from app.crud.depression_test import (
+    depression_test_to_dict,
+    get_depression_test_by_id,
+    get_depression_tests_by_ids,
+    insert_depression_tests,
+)
+from app.services.metrics import PREDICTION_STAGE_SECONDS
+from app.services.prediction_batcher import prediction_batcher
+from app.services.prediction_executor import prediction_executor
 from app.services.prediction_service import prediction_service
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.single_flight import SingleFlight
 
 router = APIRouter(
     prefix="/depression-risk-results",
     tags=["Depression Risk Results"],
 )
 
+# Concurrent retries of /predict/{id} in this worker score the test only once
+predict_single_flight = SingleFlight()
+
 # @router.post(
 #     "",
 #     response_model=DepressionRiskResultResponse,
@@ -54,21 +76,28 @@ router = APIRouter(
 )
 def predict_and_save_risk_result(
     depression_test_id: int,
+    response: Response,
+    explain: bool = False,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
     Run ML model prediction on a depression test and save the result.
     
+    Idempotent: if the test already has a result from the active model version,
+    that result is returned with status 200 instead of scoring it again.
+    
     Args:
         depression_test_id: ID of the depression test to analyze
+        explain: Also return each answer's contribution to the score
         db: Database session
         
     Returns:
-        The created depression risk result with predictions
+        The depression risk result from the active model version
     """
     # Get the depression test data
-    test = get_depression_test_by_id(db, depression_test_id)
+    with PREDICTION_STAGE_SECONDS.time("load_test"):
+        test = get_depression_test_by_id(db, depression_test_id)
     if not test:
         raise HTTPException(
             status_code=404,
@@ -83,43 +112,217 @@ def predict_and_save_risk_result(
         )
     
     # Convert test data to dictionary for prediction
-    test_data = {
-        'mood': test.mood,
-        'sleep_hour': test.sleep_hour,
-        'appetite': test.appetite,
-        'exercise': test.exercise,
-        'screen_time': test.screen_time,
-        'academic_work': test.academic_work,
-        'socialize': test.socialize,
-        'energy_level': test.energy_level,
-        'trouble_concentrating': test.trouble_concentrating,
-        'negative_thoughts': test.negative_thoughts,
-        'decision_making': test.decision_making,
-        'bothered_things': test.bothered_things,
-        'sleepy_tired': test.sleepy_tired,
-        'stressful_events': test.stressful_events,
-        'future_hope': test.future_hope,
+    test_data = depression_test_to_dict(test)
+    
+    try:
+        model_version = prediction_service.ensure_loaded().model_version
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Prediction failed: {str(e)}"
+        )
+    
+    with predict_single_flight.lock((depression_test_id, model_version)):
+        # Return the result of an earlier (or concurrent) call for this model version
+        result = get_risk_result_for_test(db, depression_test_id, model_version)
+        if result is not None:
+            response.status_code = 200
+        else:
+            # Run prediction
+            try:
+                with PREDICTION_STAGE_SECONDS.time("predict"):
+                    prediction = prediction_batcher.predict(test_data)
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Prediction failed: {str(e)}"
+                )
+            
+            # Save result to database; another worker may have saved it first
+            with PREDICTION_STAGE_SECONDS.time("insert_result"):
+                result, created = get_or_create_risk_result(
+                    db=db,
+                    user_id=test.user_id,
+                    depression_test_id=depression_test_id,
+                    risk_level=prediction.risk_level,
+                    risk_score=prediction.risk_score,
+                    model_version=prediction.model_version,
+                )
+            if not created:
+                response.status_code = 200
+    
+    if explain:
+        return DepressionRiskResultResponse.with_explanation(
+            result, prediction_service.explain_depression_risk(test_data, result.model_version)
+        )
+    return result
+
+
+@router.post(
+    "/predict-batch",
+    response_model=List[DepressionRiskResultResponse],
+    status_code=201,
+)
+def predict_and_save_risk_results_batch(
+    batch: DepressionRiskBatchRequest,
+    explain: bool = False,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Run ML model prediction on many depression tests and save the results.
+    
+    Stored tests are referenced by depression_test_ids; raw payloads in tests are
+    stored first. All tests are scored in a single model call and the results are
+    written with one multi-row insert in a single transaction. Stored tests that
+    already have a result from the active model version reuse it.
+    
+    Args:
+        batch: Depression test IDs and/or raw depression test payloads
+        explain: Also return each answer's contribution to each score
+        db: Database session
+        
+    Returns:
+        The depression risk results, stored tests first, then raw payloads
+    """
+    # Load stored tests, keeping the requested order
+    stored_tests = {
+        test.depression_test_id: test
+        for test in get_depression_tests_by_ids(db, batch.depression_test_ids)
+    }
+    missing_ids = [test_id for test_id in batch.depression_test_ids if test_id not in stored_tests]
+    if missing_ids:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Depression tests not found: {missing_ids}"
+        )
+    
+    # Check if current user has permission to access every test
+    if any(test.user_id != current_user.id for test in stored_tests.values()) or any(
+        test.user_id != current_user.id for test in batch.tests
+    ):
+        raise HTTPException(
+            status_code=403,
+            detail="You do not have permission to access one or more of these depression tests"
+        )
+    
+    try:
+        model_version = prediction_service.ensure_loaded().model_version
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Prediction failed: {str(e)}"
+        )
+    
+    # Stored tests already scored by the active model version keep their result
+    results_by_test = {
+        result.depression_test_id: result
+        for result in get_risk_results_for_tests(db, batch.depression_test_ids, model_version)
     }
+    test_ids = [
+        test_id for test_id in dict.fromkeys(batch.depression_test_ids) if test_id not in results_by_test
+    ]
+    tests_data = [depression_test_to_dict(stored_tests[test_id]) for test_id in test_ids]
+    
+    # Store raw payloads in the same transaction as their results
+    raw_test_ids = insert_depression_tests(db, batch.tests)
+    test_ids += raw_test_ids
+    tests_data += [test.model_dump() for test in batch.tests]
     
     # Run prediction
     try:
-        risk_score, risk_level = prediction_service.predict_depression_risk(test_data)
+        predictions = prediction_executor.predict_batch(tests_data)
     except Exception as e:
+        db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Prediction failed: {str(e)}"
         )
     
-    # Save result to database
-    result = create_risk_result(
-        db=db,
-        user_id=test.user_id,
-        depression_test_id=depression_test_id,
-        risk_level=risk_level,
-        risk_score=risk_score,
-    )
+    # Save results to database
+    try:
+        rows = create_risk_results_bulk(
+            db,
+            [
+                {
+                    "user_id": current_user.id,
+                    "depression_test_id": test_id,
+                    "risk_level": prediction.risk_level,
+                    "risk_score": prediction.risk_score,
+                    "model_version": prediction.model_version,
+                }
+                for test_id, prediction in zip(test_ids, predictions)
+            ],
+        )
+    except IntegrityError:
+        # A concurrent request scored one of the stored tests first
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Some of these depression tests were scored concurrently; retry the request"
+        )
+    results_by_test.update((row.depression_test_id, row) for row in rows)
+    
+    results = [results_by_test[test_id] for test_id in batch.depression_test_ids + raw_test_ids]
+    if explain:
+        tests_by_id = dict(zip(test_ids, tests_data))
+        return [
+            DepressionRiskResultResponse.with_explanation(
+                result,
+                prediction_service.explain_depression_risk(
+                    tests_by_id.get(result.depression_test_id)
+                    or depression_test_to_dict(stored_tests[result.depression_test_id]),
+                    result.model_version,
+                ),
+            )
+            for result in results
+        ]
+    return results
+
+
+@router.get(
+    "/what-if/{depression_test_id}",
+    response_model=WhatIfResponse,
+)
+def get_what_if_scores(
+    depression_test_id: int,
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Show how the risk score of a depression test would change with each answer
+    moved to every other allowed value. Nothing is saved.
     
-    return result
+    Args:
+        depression_test_id: ID of the depression test to analyze
+        current_user: Current authenticated user
+        db: Database session
+        
+    Returns:
+        The test's risk score and one alternative score per possible answer change
+    """
+    test = get_depression_test_by_id(db, depression_test_id)
+    if not test:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Depression test with ID {depression_test_id} not found"
+        )
+    
+    if current_user.id != test.user_id:
+        raise HTTPException(
+            status_code=403,
+            detail="You do not have permission to access this depression test"
+        )
+    
+    try:
+        what_if = prediction_service.what_if(depression_test_to_dict(test))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Prediction failed: {str(e)}"
+        )
+    
+    return {"depression_test_id": depression_test_id, **what_if}
 
 
 @router.get(
@@ -128,8 +331,8 @@ def predict_and_save_risk_result(
 )
 def get_latest_risk_result(
     user_id: int,
-    current_user=Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user_read),
+    db: Session = Depends(get_read_db),
 ):
     """
     Retrieve the most recent depression risk assessment result for a specific user.
@@ -167,8 +370,8 @@ def get_latest_risk_result(
 )
 def get_weekly_risk_scores_endpoint(
     user_id: int,
-    current_user=Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user_read),
+    db: Session = Depends(get_read_db),
 ):
     """
     Get weekly aggregated depression risk scores for a user.
@@ -207,20 +410,24 @@ def get_weekly_risk_scores_endpoint(
 def get_daily_risk_results_endpoint(
     user_id: int,
     days: int = 7,
-    current_user=Depends(get_current_user),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Results per page"),
+    current_user=Depends(get_current_user_read),
+    db: Session = Depends(get_read_db),
 ):
     """
-    Get daily depression risk results for the last N days.
+    Get daily depression risk results for the last N days, newest first, a page at a time.
     
     Args:
         user_id: ID of the user
         days: Number of days to retrieve (default: 7)
+        cursor: next_cursor of the previous page
+        limit: Results per page (ignored with LEGACY_LIST_RESPONSES, which returns them all)
         current_user: Current authenticated user
         db: Database session
         
     Returns:
-        List of daily risk results with date, risk_level, and risk_score
+        Daily risk results with date, risk_level, and risk_score, and the next page's cursor
     """
     # Check if current user has permission to access this data
     if current_user.id != user_id:
@@ -229,9 +436,15 @@ def get_daily_risk_results_endpoint(
             detail="You do not have permission to access risk results for this user"
         )
     
-    # Get daily risk results
-    daily_results = get_daily_risk_results(db, user_id, days)
+    if settings.LEGACY_LIST_RESPONSES:
+        return {"results": get_daily_risk_results(db, user_id, days)}
+
+    try:
+        daily_results, next_cursor = get_daily_risk_results_page(db, user_id, days, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
-        "results": daily_results
+        "results": daily_results,
+        "next_cursor": next_cursor,
     }
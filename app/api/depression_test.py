@@ -5,6 +5,7 @@ from typing import List
 from app.api.auth import get_current_user
 from app.database import get_db
 from app.schemas.depression_risk_result import DepressionRiskResultResponse
+from app.services.prediction_service import prediction_service
 from app.schemas.depression_test import (
     DepressionTestCreate,
     DepressionTestResponse,
@@ -28,6 +29,7 @@ router = APIRouter(
 )
 def create_test(
     depression_test: DepressionTestCreate,
+    explain: bool = False,
     current_user=Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -36,5 +38,10 @@ def create_test(
             status_code=403,
             detail="You do not have permission to create a depression test for this user"
         )
-    return create_depression_test(db, depression_test)
+    result = create_depression_test(db, depression_test)
+    if explain:
+        return DepressionRiskResultResponse.with_explanation(
+            result, prediction_service.explain_depression_risk(depression_test.model_dump(), result.model_version)
+        )
+    return result
 
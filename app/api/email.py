@@ -12,6 +12,7 @@ from app.api.auth import get_current_user
 from sqlalchemy.orm import Session
 from app.crud.user import get_user_by_email
 from app.database import get_db
+from app.services.user_cache import user_cache
 from app.utils.security import get_password_hash
 
 router = APIRouter(prefix="/email", tags=["Email"])
@@ -70,6 +71,7 @@ def reset_password(request: ResetPasswordRequest, db: Session = Depends(get_db))
 
     user.hashed_password = get_password_hash(request.new_password)
     db.commit()
+    user_cache.invalidate(user.id)
     delete_code(request.email)
 
     return {"detail": "Password reset successful"}
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.schemas.depression_risk_result import EmergencyAlertRequest
 from app.crud import emergency_contact as contact_crud
-from app.crud.user import get_user_by_id
-from app.api.auth import get_current_user
+from app.crud.user import get_user_by_id_async
+from app.api.auth import get_current_user_async
 from app.services.email_service import send_emergency_contact_alert
 
 router = APIRouter(prefix="/emergency-alert", tags=["Emergency Alert"])
@@ -13,8 +14,8 @@ router = APIRouter(prefix="/emergency-alert", tags=["Emergency Alert"])
 @router.post("/send", status_code=status.HTTP_200_OK)
 async def send_emergency_alert(
     request: EmergencyAlertRequest,
-    current_user=Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Send an emergency alert to the user's emergency contact.
@@ -35,7 +36,7 @@ async def send_emergency_alert(
         )
     
     # Get the user
-    user = get_user_by_id(db, request.user_id)
+    user = await get_user_by_id_async(db, request.user_id)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -43,7 +44,7 @@ async def send_emergency_alert(
         )
     
     # Get the user's emergency contact
-    emergency_contact = contact_crud.get_emergency_contact_by_user_id(db, request.user_id)
+    emergency_contact = await contact_crud.get_emergency_contact_by_user_id_async(db, request.user_id)
     if not emergency_contact:
         raise HTTPException(
             status_code=404,
@@ -56,9 +57,10 @@ async def send_emergency_alert(
             detail="Emergency contact has no email address"
         )
     
-    # Send the alert email
+    # Send the alert email (blocking SMTP, so off the event loop)
     try:
-        send_emergency_contact_alert(
+        await run_in_threadpool(
+            send_emergency_contact_alert,
             to_email=emergency_contact.contact_email,
             user_name=user.full_name or user.email,
             risk_level=request.alert_type,
@@ -0,0 +1,95 @@
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.config import settings
+from app.services.model_registry import ModelValidationError, model_registry
+from app.services.prediction_service import prediction_service
+from app.services.shadow_evaluator import shadow_evaluator
+
+router = APIRouter(prefix="/models", tags=["Model Registry"])
+
+
+def require_model_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow the request only with the configured X-Admin-Token"""
+    if not settings.MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Model administration is disabled")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.MODEL_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get("/active", dependencies=[Depends(require_model_admin)])
+def get_active_model():
+    """Active model version, last reload outcome and activation history"""
+    return model_registry.status()
+
+
+@router.post("/reload", dependencies=[Depends(require_model_admin)])
+def reload_model(force: bool = False):
+    """
+    Load the model in saved_models/, validate it against the golden set and
+    activate it if it is a new version. In-flight predictions are not blocked.
+
+    Only the worker handling this request reloads; with several workers, enable
+    MODEL_WATCH_ENABLED so the others pick up the new files too.
+    """
+    try:
+        return model_registry.reload(force=force)
+    except ModelValidationError as e:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": str(e), "validation": e.report}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Model reload failed: {str(e)}"
+        )
+
+
+def get_drift_monitor():
+    if prediction_service.drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Drift monitoring is disabled")
+    return prediction_service.drift_monitor
+
+
+@router.get("/drift", dependencies=[Depends(require_model_admin)])
+def get_drift(drift_monitor=Depends(get_drift_monitor)):
+    """
+    Answer and risk score distributions since the window started, each with its
+    population stability index (PSI) against the reference distribution
+    """
+    return drift_monitor.stats()
+
+
+@router.post("/drift/reference", dependencies=[Depends(require_model_admin)])
+def save_drift_reference(drift_monitor=Depends(get_drift_monitor)):
+    """Make the current distributions the drift reference and start a new window"""
+    drift_monitor.flush()
+    if drift_monitor.observations == 0:
+        raise HTTPException(status_code=409, detail="No predictions recorded in the current window")
+    drift_monitor.save_reference()
+    return {"reference_path": drift_monitor.reference_path}
+
+
+@router.get("/shadow", dependencies=[Depends(require_model_admin)])
+def get_shadow_report():
+    """Agreement between the shadow candidate and the primary model: score deltas and level flips"""
+    return shadow_evaluator.report()
+
+
+@router.post("/shadow/reload", dependencies=[Depends(require_model_admin)])
+def reload_shadow_model():
+    """Load SHADOW_MODEL_PATH as the shadow candidate and start a fresh report"""
+    if not settings.SHADOW_MODEL_PATH:
+        raise HTTPException(status_code=404, detail="No shadow model configured")
+    try:
+        candidate = shadow_evaluator.load_candidate(settings.SHADOW_MODEL_PATH)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Shadow model load failed: {str(e)}"
+        )
+    shadow_evaluator.attach(prediction_service)
+    return {"candidate_version": candidate.model_version}
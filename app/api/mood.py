@@ -1,17 +1,26 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from typing import List, Dict
+from typing import Any, List, Dict, Optional, Tuple, Union
 from datetime import datetime, date, timezone
-from app.database import get_db
-from app.schemas.mood import MoodCreate, MoodResponse
-from app.crud.mood import create_mood, get_user_moods, get_daily_moods, delete_daily_moods
-from app.api.auth import get_current_user
+from app.config import settings
+from app.database import get_db, get_read_db
+from app.models.mood import MoodJournaling
+from app.schemas.mood import MoodBulkItemResult, MoodBulkRequest, MoodBulkResponse, MoodCreate, MoodResponse
+from app.schemas.pagination import Page
+from app.crud.mood import create_mood, create_moods_bulk, get_user_moods, get_user_moods_page, get_daily_moods, delete_daily_moods
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.api.auth import get_current_user, get_current_user_read
 
 router = APIRouter(
     prefix="/moods",
     tags=["Mood Journaling"]
 )
 
+# Column sizes of mood_journaling
+MOOD_TYPE_MAX_LENGTH = MoodJournaling.mood_type.type.length
+ACTIVITY_MAX_LENGTH = MoodJournaling.activities.type.item_type.length
+
 
 @router.post("/", response_model=MoodResponse)
 def log_mood(
@@ -25,11 +34,53 @@ def log_mood(
     return create_mood(db, user_id=current_user.id, mood=mood)
 
 
+def _validate_mood_entry(entry: Dict[str, Any]) -> Tuple[Optional[MoodCreate], Optional[str]]:
+    """The entry as a MoodCreate, or why it cannot be stored"""
+    try:
+        mood = MoodCreate.model_validate(entry)
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'entry'}: {error['msg']}" for error in e.errors()
+        )
+    # Checked here so that one over-long value does not fail the whole INSERT
+    if len(mood.mood_type) > MOOD_TYPE_MAX_LENGTH:
+        return None, f"mood_type: at most {MOOD_TYPE_MAX_LENGTH} characters"
+    if any(len(activity) > ACTIVITY_MAX_LENGTH for activity in mood.activities):
+        return None, f"activities: each at most {ACTIVITY_MAX_LENGTH} characters"
+    return mood, None
+
+
+@router.post("/bulk", response_model=MoodBulkResponse)
+def log_moods_bulk(
+    payload: MoodBulkRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+):
+    """
+    Create many mood journal entries for a user, e.g. those logged while offline
+
+    Every entry is validated on its own; the valid ones are stored with a single
+    multi-row insert and the invalid ones are reported by index with the reason,
+    so the client can drop or fix just those.
+    """
+    results, moods = [], []
+    for index, entry in enumerate(payload.entries):
+        mood, error = _validate_mood_entry(entry)
+        results.append(MoodBulkItemResult(index=index, error=error))
+        if mood is not None:
+            moods.append((index, mood))
+
+    mood_ids = create_moods_bulk(db, user_id=current_user.id, moods=[mood for _, mood in moods])
+    for (index, _), mood_id in zip(moods, mood_ids):
+        results[index].mood_id = mood_id
+    return MoodBulkResponse(created=len(mood_ids), failed=len(results) - len(mood_ids), results=results)
+
+
 @router.get("/daily", response_model=List[MoodResponse])
 def read_daily_moods(
     selected_date: date = Query(..., description="Format: YYYY-MM-DD"),
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user_read),
 ):
     moods = get_daily_moods(
         db=db,
@@ -59,12 +110,22 @@ def delete_daily_moods_endpoint(
     return {"deleted": deleted_count}
 
 
-@router.get("/", response_model=List[MoodResponse])
+@router.get("/", response_model=Union[Page[MoodResponse], List[MoodResponse]])
 def read_user_moods(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Entries per page"),
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user_read),
 ):
     """
-    Get all mood journal entries for a user
+    Get the user's mood journal entries, newest first, a page at a time
+
+    With LEGACY_LIST_RESPONSES, every entry as a plain list instead.
     """
-    return get_user_moods(db, user_id=current_user.id)
+    if settings.LEGACY_LIST_RESPONSES:
+        return get_user_moods(db, user_id=current_user.id)
+    try:
+        items, next_cursor = get_user_moods_page(db, user_id=current_user.id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Page[MoodResponse](items=items, next_cursor=next_cursor)
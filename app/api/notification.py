@@ -1,16 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List, Dict
-from app.database import get_db
+from typing import List, Dict, Optional, Union
+from app.config import settings
+from app.database import get_db, get_read_db
 from app.schemas.notification import NotificationCreate, NotificationResponse
+from app.schemas.pagination import Page
 from app.crud.notification import (
     create_notification,
     get_notifications,
+    get_notifications_page,
     mark_all_notifications_as_read,
     delete_notification,
     delete_all_notifications
 )
-from app.api.auth import get_current_user
+from app.api.auth import get_current_user, get_current_user_read
 
 router = APIRouter(
     prefix="/notifications",
@@ -30,17 +33,26 @@ def create_new_notification(
     return create_notification(db, user_id=current_user.id, notification=notification)
 
 
-@router.get("/", response_model=List[NotificationResponse])
+@router.get("/", response_model=Union[Page[NotificationResponse], List[NotificationResponse]])
 def read_notifications(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    skip: int = Query(0, ge=0, description="Number of records to skip (LEGACY_LIST_RESPONSES only)"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of records to return"),
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_user_read),
 ):
     """
-    Get all notifications for the current user
+    Get the current user's notifications, newest first, a page at a time
+
+    With LEGACY_LIST_RESPONSES, a plain list paged with skip instead.
     """
-    return get_notifications(db, user_id=current_user.id, skip=skip, limit=limit)
+    if settings.LEGACY_LIST_RESPONSES:
+        return get_notifications(db, user_id=current_user.id, skip=skip, limit=limit)
+    try:
+        items, next_cursor = get_notifications_page(db, user_id=current_user.id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Page[NotificationResponse](items=items, next_cursor=next_cursor)
 
 
 @router.patch("/read-all", response_model=Dict[str, int])
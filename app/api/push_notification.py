@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 
 from app.api.auth import get_current_user
 from app.database import get_db
+from app.services.user_cache import user_cache
 from app.schemas.push_notification import (
     PushNotificationStatusResponse,
     PushPreferenceUpdateRequest,
@@ -21,7 +22,7 @@ def register_device_token(
     current_user.fcm_token = payload.fcm_token
     current_user.is_push_reminder_enabled = True
     db.commit()
-    db.refresh(current_user)
+    user_cache.invalidate(current_user.id)
 
     return PushNotificationStatusResponse(
         push_enabled=current_user.is_push_reminder_enabled,
@@ -37,7 +38,7 @@ def update_push_preferences(
 ):
     current_user.is_push_reminder_enabled = payload.enabled
     db.commit()
-    db.refresh(current_user)
+    user_cache.invalidate(current_user.id)
 
     return PushNotificationStatusResponse(
         push_enabled=current_user.is_push_reminder_enabled,
@@ -52,7 +53,7 @@ def unregister_device_token(
 ):
     current_user.fcm_token = None
     db.commit()
-    db.refresh(current_user)
+    user_cache.invalidate(current_user.id)
 
     return PushNotificationStatusResponse(
         push_enabled=current_user.is_push_reminder_enabled,
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+from app.config import settings
+from app.database import get_db
+from app.schemas.sync import SyncResponse
+from app.crud.sync import get_changes, tombstone_cutoff
+from app.utils.helpers import utcnow
+from app.api.auth import get_current_user
+
+router = APIRouter(
+    prefix="/sync",
+    tags=["Sync"]
+)
+
+
+@router.get("", response_model=SyncResponse)
+def sync_changes(
+    since: Optional[datetime] = Query(None, description="watermark of the previous sync; omit for a full sync"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+):
+    """
+    Get the user's moods, notifications and risk results changed since a watermark
+
+    Rows changed shortly before the returned watermark are sent again on the next
+    sync, so apply changes by id (insert or replace) and deletions by id (ignoring
+    unknown ones). Watermarks older than SYNC_TOMBSTONE_RETENTION_DAYS, or none,
+    get a full sync. Reads the primary: a lagging replica could hide changes from
+    before the watermark.
+    """
+    now = utcnow()
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    full = since is None or since < tombstone_cutoff(now)
+
+    changes = get_changes(db, user_id=current_user.id, since=None if full else since)
+    return SyncResponse(
+        watermark=now - timedelta(seconds=settings.SYNC_WATERMARK_LAG_SECONDS),
+        full=full,
+        **changes,
+    )
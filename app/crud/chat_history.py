@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import ProgrammingError
 from app.models.chat_history import ChatHistory
@@ -14,16 +16,21 @@ def _is_missing_chat_history_table(exc: Exception) -> bool:
     return 'relation "chat_history" does not exist' in str(exc)
 
 
+def _get_or_add_chat_history(db: Session, user_id: int) -> ChatHistory:
+    """The user's chat history, added to the session (not committed) if it does not exist yet"""
+    chat_history = db.query(ChatHistory).filter(ChatHistory.user_id == user_id).first()
+    if not chat_history:
+        chat_history = ChatHistory(user_id=user_id, messages=[])
+        db.add(chat_history)
+    return chat_history
+
+
 def get_or_create_user_chat_history(db: Session, user_id: int) -> ChatHistory:
     """Get existing chat history for user or create if not exists"""
     try:
-        chat_history = db.query(ChatHistory).filter(ChatHistory.user_id == user_id).first()
-
-        if not chat_history:
-            chat_history = ChatHistory(user_id=user_id, messages=[])
-            db.add(chat_history)
+        chat_history = _get_or_add_chat_history(db, user_id)
+        if chat_history.id is None:
             db.commit()
-            db.refresh(chat_history)
 
         return chat_history
     except ProgrammingError as exc:
@@ -46,16 +53,25 @@ def get_user_chat_history(db: Session, user_id: int) -> Optional[ChatHistory]:
         raise
 
 
+async def get_user_chat_history_async(db: AsyncSession, user_id: int) -> Optional[ChatHistory]:
+    """Get chat history for user"""
+    try:
+        return await db.scalar(select(ChatHistory).where(ChatHistory.user_id == user_id).limit(1))
+    except ProgrammingError as exc:
+        await db.rollback()
+        if _is_missing_chat_history_table(exc):
+            logger.warning("chat_history table is missing; returning no history")
+            return None
+        raise
+
+
 def update_chat_history(db: Session, user_id: int, messages: List[Dict[str, Any]]) -> Optional[ChatHistory]:
     """Update chat history with new messages"""
     try:
-        chat_history = get_or_create_user_chat_history(db, user_id)
-        if chat_history is None:
-            return None
+        chat_history = _get_or_add_chat_history(db, user_id)
         chat_history.messages = messages
         chat_history.updated_at = datetime.utcnow()
         db.commit()
-        db.refresh(chat_history)
         return chat_history
     except ProgrammingError as exc:
         db.rollback()
@@ -68,19 +84,16 @@ def update_chat_history(db: Session, user_id: int, messages: List[Dict[str, Any]
 def append_to_chat_history(db: Session, user_id: int, new_messages: List[Dict[str, Any]]) -> Optional[ChatHistory]:
     """Append new messages to existing chat history"""
     try:
-        chat_history = get_or_create_user_chat_history(db, user_id)
-        if chat_history is None:
-            return None
+        chat_history = _get_or_add_chat_history(db, user_id)
 
         # Ensure messages is a list
         if not isinstance(chat_history.messages, list):
             chat_history.messages = []
 
         # Append new messages
-        chat_history.messages.extend(new_messages)
+        chat_history.messages = chat_history.messages + new_messages  # a new list, so the JSON column sees the change
         chat_history.updated_at = datetime.utcnow()
         db.commit()
-        db.refresh(chat_history)
         return chat_history
     except ProgrammingError as exc:
         db.rollback()
@@ -99,7 +112,6 @@ def clear_chat_history(db: Session, user_id: int) -> Optional[ChatHistory]:
             chat_history.messages = []
             chat_history.updated_at = datetime.utcnow()
             db.commit()
-            db.refresh(chat_history)
 
         return chat_history
     except ProgrammingError as exc:
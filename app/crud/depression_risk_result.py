@@ -1,11 +1,36 @@
 from fastapi.params import Depends, Annotated
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.depression_risk_result import DepressionRiskResult
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime, timedelta, date
 from collections import defaultdict
 
 from app.services import prediction_service
+from app.utils.pagination import keyset_page
+
+
+def current_risk_results_filter(user_id: int):
+    """
+    Filter to each of a user's depression tests' newest result
+    
+    A test gets a new result every time it is re-scored by a new model version;
+    user-facing reads show only the newest one. Results without a test are kept.
+    """
+    newest_per_test = (
+        select(func.max(DepressionRiskResult.result_id))
+        .where(
+            DepressionRiskResult.user_id == user_id,
+            DepressionRiskResult.depression_test_id.is_not(None),
+        )
+        .group_by(DepressionRiskResult.depression_test_id)
+    )
+    return or_(
+        DepressionRiskResult.depression_test_id.is_(None),
+        DepressionRiskResult.result_id.in_(newest_per_test),
+    )
 
 
 def create_risk_result(
@@ -14,6 +39,7 @@ def create_risk_result(
     risk_level: str,
     risk_score: float,
     depression_test_id: Optional[int] = None,
+    model_version: Optional[str] = None,
 ) -> DepressionRiskResult:
     """
     Create a new depression risk result in the database.
@@ -24,6 +50,7 @@ def create_risk_result(
         risk_level: Risk level (Low, Medium, High)
         risk_score: Risk score (0.0 to 1.0)
         depression_test_id: Optional ID of the related depression test
+        model_version: Version of the model that produced the score
     
     Returns:
         The created DepressionRiskResult object
@@ -33,13 +60,78 @@ def create_risk_result(
         depression_test_id=depression_test_id,
         risk_level=risk_level,
         risk_score=risk_score,
+        model_version=model_version,
     )
     db.add(db_result)
     db.commit()
-    db.refresh(db_result)
     return db_result
 
 
+def get_or_create_risk_result(
+    db: Session,
+    user_id: int,
+    risk_level: str,
+    risk_score: float,
+    depression_test_id: int,
+    model_version: str,
+) -> Tuple[DepressionRiskResult, bool]:
+    """
+    Create a depression risk result unless the test already has one from model_version.
+    
+    The unique index on (depression_test_id, model_version) decides: if another
+    request inserted the result first, its row is returned instead.
+    
+    Returns:
+        (result, created)
+    """
+    try:
+        return create_risk_result(
+            db=db,
+            user_id=user_id,
+            depression_test_id=depression_test_id,
+            risk_level=risk_level,
+            risk_score=risk_score,
+            model_version=model_version,
+        ), True
+    except IntegrityError:
+        db.rollback()
+        existing = get_risk_result_for_test(db, depression_test_id, model_version)
+        if existing is None:
+            raise
+        return existing, False
+
+
+def create_risk_results_bulk(db: Session, results: List[Dict]) -> List:
+    """
+    Insert many depression risk results with a single multi-row INSERT and one commit.
+    
+    Args:
+        db: Database session
+        results: List of dicts with user_id, depression_test_id, risk_level, risk_score
+            and model_version
+    
+    Returns:
+        Inserted rows (result_id, user_id, depression_test_id, risk_level, risk_score,
+        model_version, created_at) in the same order as results
+    """
+    if not results:
+        return []
+    
+    stmt = insert(DepressionRiskResult).returning(
+        DepressionRiskResult.result_id,
+        DepressionRiskResult.user_id,
+        DepressionRiskResult.depression_test_id,
+        DepressionRiskResult.risk_level,
+        DepressionRiskResult.risk_score,
+        DepressionRiskResult.model_version,
+        DepressionRiskResult.created_at,
+        sort_by_parameter_order=True,
+    )
+    rows = db.execute(stmt, results).all()
+    db.commit()
+    return rows
+
+
 def get_risk_result_by_id(db: Session, result_id: int):
     return (
         db.query(DepressionRiskResult)
@@ -48,10 +140,36 @@ def get_risk_result_by_id(db: Session, result_id: int):
     )
 
 
+def get_risk_result_for_test(db: Session, depression_test_id: int, model_version: str):
+    """The result of a depression test from one model version, if it was scored"""
+    return (
+        db.query(DepressionRiskResult)
+        .filter(
+            DepressionRiskResult.depression_test_id == depression_test_id,
+            DepressionRiskResult.model_version == model_version,
+        )
+        .first()
+    )
+
+
+def get_risk_results_for_tests(db: Session, depression_test_ids: List[int], model_version: str) -> List:
+    """The results of many depression tests from one model version (tests not scored are skipped)"""
+    if not depression_test_ids:
+        return []
+    return (
+        db.query(DepressionRiskResult)
+        .filter(
+            DepressionRiskResult.depression_test_id.in_(depression_test_ids),
+            DepressionRiskResult.model_version == model_version,
+        )
+        .all()
+    )
+
+
 def get_risk_results_by_user(db: Session, user_id: int):
     return (
         db.query(DepressionRiskResult)
-        .filter(DepressionRiskResult.user_id == user_id)
+        .filter(DepressionRiskResult.user_id == user_id, current_risk_results_filter(user_id))
         .order_by(DepressionRiskResult.created_at.desc())
         .all()
     )
@@ -60,12 +178,21 @@ def get_risk_results_by_user(db: Session, user_id: int):
 def get_latest_risk_result_by_user(db: Session, user_id: int):
     return (
         db.query(DepressionRiskResult)
-        .filter(DepressionRiskResult.user_id == user_id)
+        .filter(DepressionRiskResult.user_id == user_id, current_risk_results_filter(user_id))
         .order_by(DepressionRiskResult.created_at.desc())
         .first()
     )
 
 
+async def get_latest_risk_result_by_user_async(db: AsyncSession, user_id: int):
+    return await db.scalar(
+        select(DepressionRiskResult)
+        .where(DepressionRiskResult.user_id == user_id, current_risk_results_filter(user_id))
+        .order_by(DepressionRiskResult.created_at.desc())
+        .limit(1)
+    )
+
+
 def get_weekly_risk_scores(db: Session, user_id: int) -> List[Dict]:
     """
     Get risk scores aggregated by week for a user.
@@ -80,7 +207,7 @@ def get_weekly_risk_scores(db: Session, user_id: int) -> List[Dict]:
     # Get all risk results for the user, ordered by date
     risk_results = (
         db.query(DepressionRiskResult)
-        .filter(DepressionRiskResult.user_id == user_id)
+        .filter(DepressionRiskResult.user_id == user_id, current_risk_results_filter(user_id))
         .order_by(DepressionRiskResult.created_at.asc())
         .all()
     )
@@ -179,27 +306,41 @@ def get_daily_risk_results(db: Session, user_id: int, days: int = 7) -> List[Dic
     Returns:
         List of daily risk results with date, risk_level, and risk_score
     """
-    # Calculate the date threshold
-    cutoff_date = datetime.now() - timedelta(days=days)
-    
-    # Query risk results from the last N days
     risk_results = (
-        db.query(DepressionRiskResult)
-        .filter(
-            DepressionRiskResult.user_id == user_id,
-            DepressionRiskResult.created_at >= cutoff_date
-        )
+        _daily_risk_results_query(db, user_id, days)
         .order_by(DepressionRiskResult.created_at.desc())
         .all()
     )
-    
-    # Format results
-    daily_results = []
-    for result in risk_results:
-        daily_results.append({
-            'date': result.created_at.date().isoformat(),
-            'risk_level': result.risk_level,
-            'risk_score': result.risk_score
-        })
-    
-    return daily_results
+    return [_daily_risk_result(result) for result in risk_results]
+
+
+def get_daily_risk_results_page(
+    db: Session, user_id: int, days: int, cursor: Optional[str], limit: int
+) -> Tuple[List[Dict], Optional[str]]:
+    """A page of get_daily_risk_results, newest first, and the next page's cursor"""
+    risk_results, next_cursor = keyset_page(
+        _daily_risk_results_query(db, user_id, days),
+        DepressionRiskResult.created_at,
+        DepressionRiskResult.result_id,
+        cursor,
+        limit,
+    )
+    return [_daily_risk_result(result) for result in risk_results], next_cursor
+
+
+def _daily_risk_results_query(db: Session, user_id: int, days: int):
+    # Risk results from the last N days
+    cutoff_date = datetime.now() - timedelta(days=days)
+    return db.query(DepressionRiskResult).filter(
+        DepressionRiskResult.user_id == user_id,
+        DepressionRiskResult.created_at >= cutoff_date,
+        current_risk_results_filter(user_id),
+    )
+
+
+def _daily_risk_result(result: DepressionRiskResult) -> Dict:
+    return {
+        'date': result.created_at.date().isoformat(),
+        'risk_level': result.risk_level,
+        'risk_score': result.risk_score
+    }
@@ -1,30 +1,81 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List
 from zoneinfo import ZoneInfo
 
-from app.crud.depression_risk_result import create_risk_result
+from app.models.depression_risk_result import DepressionRiskResult
 from app.models.depression_test import DepressionTest
 from app.schemas.depression_test import DepressionTestCreate
-from app.services.prediction_service import prediction_service
-
-
-def create_depression_test(db: Session, depression_test: DepressionTestCreate):
-    db_test = DepressionTest(**depression_test.model_dump())
-    db.add(db_test)
-    db.commit()
-    db.refresh(db_test)
-    risk_score, risk_level = prediction_service.predict_depression_risk(depression_test.model_dump())
-    print("result from prediction service:", risk_level, risk_score)
-    risk_result = create_risk_result(
-        db=db,
-        user_id=db_test.user_id,
-        depression_test_id=db_test.depression_test_id,
-        risk_level=risk_level,
-        risk_score=risk_score,
-    )
+from app.services.metrics import PREDICTION_STAGE_SECONDS
+from app.services.prediction_batcher import prediction_batcher
+
+
+def create_depression_test(db: Session, depression_test: DepressionTestCreate) -> DepressionRiskResult:
+    """
+    Score a depression test and store it with its risk result in one transaction
+    
+    Scoring needs only the answers, so it runs before any database work; the
+    test and the result are then inserted (each with RETURNING for its ids and
+    created_at) and committed together.
+    """
+    answers = depression_test.model_dump()
+    with PREDICTION_STAGE_SECONDS.time("predict"):
+        prediction = prediction_batcher.predict(answers)
+    with PREDICTION_STAGE_SECONDS.time("insert"):
+        db_test = DepressionTest(**answers)
+        risk_result = DepressionRiskResult(
+            user_id=db_test.user_id,
+            risk_level=prediction.risk_level,
+            risk_score=prediction.risk_score,
+            model_version=prediction.model_version,
+        )
+        db_test.depression_risk_results.append(risk_result)
+        db.add(db_test)
+        db.commit()
     return risk_result
 
 
+def insert_depression_tests(db: Session, depression_tests: List[DepressionTestCreate]) -> List[int]:
+    """
+    Insert many depression tests with a single multi-row INSERT.
+    
+    The caller is responsible for committing the transaction.
+    
+    Returns:
+        The new depression_test_ids in the same order as depression_tests
+    """
+    if not depression_tests:
+        return []
+    
+    stmt = insert(DepressionTest).returning(
+        DepressionTest.depression_test_id,
+        sort_by_parameter_order=True,
+    )
+    return list(db.scalars(stmt, [test.model_dump() for test in depression_tests]))
+
+
+def depression_test_to_dict(test: DepressionTest) -> Dict:
+    """Convert a DepressionTest row into the answer dict used by the prediction service"""
+    return {
+        'mood': test.mood,
+        'sleep_hour': test.sleep_hour,
+        'appetite': test.appetite,
+        'exercise': test.exercise,
+        'screen_time': test.screen_time,
+        'academic_work': test.academic_work,
+        'socialize': test.socialize,
+        'energy_level': test.energy_level,
+        'trouble_concentrating': test.trouble_concentrating,
+        'negative_thoughts': test.negative_thoughts,
+        'decision_making': test.decision_making,
+        'bothered_things': test.bothered_things,
+        'sleepy_tired': test.sleepy_tired,
+        'stressful_events': test.stressful_events,
+        'future_hope': test.future_hope,
+    }
+
+
 def get_depression_test_by_id(db: Session, test_id: int):
     return (
         db.query(DepressionTest)
@@ -33,6 +84,16 @@ def get_depression_test_by_id(db: Session, test_id: int):
     )
 
 
+def get_depression_tests_by_ids(db: Session, test_ids: List[int]) -> List[DepressionTest]:
+    if not test_ids:
+        return []
+    return (
+        db.query(DepressionTest)
+        .filter(DepressionTest.depression_test_id.in_(test_ids))
+        .all()
+    )
+
+
 def get_depression_tests_by_user(db: Session, user_id: int):
     return (
         db.query(DepressionTest)
@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.emergency_contact import EmergencyContact
 from app.schemas.emergency_contact import EmergencyContactCreate, EmergencyContactUpdate
@@ -19,7 +21,6 @@ def create_emergency_contact(db: Session, contact: EmergencyContactCreate) -> Em
     )
     db.add(db_contact)
     db.commit()
-    db.refresh(db_contact)
     return db_contact
 
 
@@ -41,7 +42,6 @@ def update_emergency_contact(
         setattr(db_contact, field, value)
 
     db.commit()
-    db.refresh(db_contact)
     return db_contact
 
 
@@ -54,3 +54,54 @@ def delete_emergency_contact(db: Session, user_id: int) -> bool:
     db.delete(db_contact)
     db.commit()
     return True
+
+
+async def get_emergency_contact_by_user_id_async(db: AsyncSession, user_id: int) -> Optional[EmergencyContact]:
+    """Get emergency contact by user ID"""
+    result = await db.execute(select(EmergencyContact).where(EmergencyContact.user_id == user_id).limit(1))
+    return result.scalars().first()
+
+
+async def create_emergency_contact_async(db: AsyncSession, contact: EmergencyContactCreate) -> EmergencyContact:
+    """Create new emergency contact"""
+    db_contact = EmergencyContact(
+        user_id=contact.user_id,
+        contact_name=contact.contact_name,
+        contact_email=contact.contact_email,
+        contact_relationship=contact.relationship,
+    )
+    db.add(db_contact)
+    await db.commit()
+    return db_contact
+
+
+async def update_emergency_contact_async(
+    db: AsyncSession, user_id: int, contact_update: EmergencyContactUpdate
+) -> Optional[EmergencyContact]:
+    """Update emergency contact"""
+    db_contact = await get_emergency_contact_by_user_id_async(db, user_id)
+    if not db_contact:
+        return None
+
+    update_data = contact_update.model_dump(exclude_unset=True)
+    
+    # Map relationship field to contact_relationship column
+    if "relationship" in update_data:
+        update_data["contact_relationship"] = update_data.pop("relationship")
+
+    for field, value in update_data.items():
+        setattr(db_contact, field, value)
+
+    await db.commit()
+    return db_contact
+
+
+async def delete_emergency_contact_async(db: AsyncSession, user_id: int) -> bool:
+    """Delete emergency contact"""
+    db_contact = await get_emergency_contact_by_user_id_async(db, user_id)
+    if not db_contact:
+        return False
+
+    await db.delete(db_contact)
+    await db.commit()
+    return True
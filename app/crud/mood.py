@@ -1,7 +1,11 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 from app.models.mood import MoodJournaling
 from app.schemas.mood import MoodCreate
+from app.crud.sync import record_deletions
+from app.utils.pagination import keyset_page
 
 
 def _as_utc(dt: datetime) -> datetime:
@@ -10,16 +14,17 @@ def _as_utc(dt: datetime) -> datetime:
         return dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc)
 
-def create_mood(db: Session, user_id: int, mood: MoodCreate):
+def _mood_created_at(mood: MoodCreate) -> datetime:
+    """created_at if given, else the start of selected_date, else now"""
     if mood.created_at is not None:
-        created_at = _as_utc(mood.created_at)
-    elif mood.selected_date is not None:
-        created_at = datetime.combine(mood.selected_date, datetime.min.time(), tzinfo=timezone.utc)
-    else:
-        created_at = datetime.now(timezone.utc)
+        return _as_utc(mood.created_at)
+    if mood.selected_date is not None:
+        return datetime.combine(mood.selected_date, datetime.min.time(), tzinfo=timezone.utc)
+    return datetime.now(timezone.utc)
 
+def create_mood(db: Session, user_id: int, mood: MoodCreate):
     new_mood = MoodJournaling(
-        created_at=created_at,
+        created_at=_mood_created_at(mood),
         user_id=user_id,
         mood_type=mood.mood_type,
         activities=mood.activities,
@@ -27,15 +32,46 @@ def create_mood(db: Session, user_id: int, mood: MoodCreate):
     )
     db.add(new_mood)
     db.commit()
-    db.refresh(new_mood)
     return new_mood
 
+def create_moods_bulk(db: Session, user_id: int, moods: List[MoodCreate]) -> List[int]:
+    """
+    Insert many mood entries of one user with a single multi-row INSERT and commit.
+
+    Returns:
+        The new mood_ids in the same order as moods
+    """
+    if not moods:
+        return []
+
+    stmt = insert(MoodJournaling).returning(MoodJournaling.mood_id, sort_by_parameter_order=True)
+    mood_ids = list(db.scalars(stmt, [
+        {
+            "user_id": user_id,
+            "created_at": _mood_created_at(mood),
+            "mood_type": mood.mood_type,
+            "activities": mood.activities,
+            "note": mood.note,
+        }
+        for mood in moods
+    ]))
+    db.commit()
+    return mood_ids
+
 def get_user_moods(db: Session, user_id: int):
     return db.query(MoodJournaling)\
         .filter(MoodJournaling.user_id == user_id)\
         .order_by(MoodJournaling.created_at.desc())\
         .all()
 
+
+def get_user_moods_page(
+    db: Session, user_id: int, cursor: Optional[str], limit: int
+) -> Tuple[List[MoodJournaling], Optional[str]]:
+    """A page of the user's mood entries, newest first, and the next page's cursor"""
+    query = db.query(MoodJournaling).filter(MoodJournaling.user_id == user_id)
+    return keyset_page(query, MoodJournaling.created_at, MoodJournaling.mood_id, cursor, limit)
+
 def get_daily_moods(db: Session, user_id: int, selected_date: datetime):
     selected_date = _as_utc(selected_date)
     start_date = selected_date.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -64,5 +100,6 @@ def delete_daily_moods(db: Session, user_id: int, mood_id: int, selected_date: d
         return 0
 
     db.delete(entry)
+    record_deletions(db, user_id, MoodJournaling.__tablename__, [entry.mood_id])
     db.commit()
     return 1
\ No newline at end of file
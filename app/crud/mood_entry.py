@@ -9,6 +9,8 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import List, Optional
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models.mood import MoodJournaling
@@ -48,21 +50,34 @@ def get_user_mood_entries(
     - days: last N days
     """
 
-    query = db.query(MoodJournaling).filter(
+    journals = db.scalars(_mood_entries_query(user_id, limit=limit, days=days)).all()
+    return [_adapt(journal) for journal in journals]
+
+async def get_user_mood_entries_async(
+    db: AsyncSession,
+    user_id: int,
+    limit: Optional[int] = None,
+    days: Optional[int] = None,
+) -> List[MoodEntryAdapter]:
+    """Async variant of get_user_mood_entries"""
+    journals = (await db.scalars(_mood_entries_query(user_id, limit=limit, days=days))).all()
+    return [_adapt(journal) for journal in journals]
+
+def _mood_entries_query(user_id: int, limit: Optional[int], days: Optional[int]):
+    query = select(MoodJournaling).where(
         MoodJournaling.user_id == user_id
     )
 
     if days and days > 0:
         cutoff = datetime.utcnow() - timedelta(days=days)
-        query = query.filter(MoodJournaling.created_at >= cutoff)
+        query = query.where(MoodJournaling.created_at >= cutoff)
 
     query = query.order_by(MoodJournaling.created_at.desc())
 
     if limit and limit > 0:
         query = query.limit(limit)
 
-    journals = query.all()
-    return [_adapt(journal) for journal in journals]
+    return query
 
 def get_mood_statistics(
     db: Session,
@@ -78,7 +93,22 @@ def get_mood_statistics(
         user_id=user_id,
         days=days,
     )
+    return _mood_statistics(entries)
+
+async def get_mood_statistics_async(
+    db: AsyncSession,
+    user_id: int,
+    days: int = 30,
+) -> dict:
+    """Async variant of get_mood_statistics"""
+    entries = await get_user_mood_entries_async(
+        db=db,
+        user_id=user_id,
+        days=days,
+    )
+    return _mood_statistics(entries)
 
+def _mood_statistics(entries: List[MoodEntryAdapter]) -> dict:
     mood_scores = [
         helpers.map_mood_to_numeric(entry.mood_level)
         for entry in entries
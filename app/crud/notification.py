@@ -1,7 +1,10 @@
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.models.notification import Notification
 from app.schemas.notification import NotificationCreate
+from app.crud.sync import record_deletions
+from app.utils.pagination import keyset_page
 
 
 def create_notification(db: Session, user_id: int, notification: NotificationCreate) -> Notification:
@@ -14,7 +17,6 @@ def create_notification(db: Session, user_id: int, notification: NotificationCre
     )
     db.add(new_notification)
     db.commit()
-    db.refresh(new_notification)
     return new_notification
 
 
@@ -28,6 +30,14 @@ def get_notifications(db: Session, user_id: int, skip: int = 0, limit: int = 100
         .all()
 
 
+def get_notifications_page(
+    db: Session, user_id: int, cursor: Optional[str], limit: int
+) -> Tuple[List[Notification], Optional[str]]:
+    """A page of the user's notifications, newest first, and the next page's cursor"""
+    query = db.query(Notification).filter(Notification.user_id == user_id)
+    return keyset_page(query, Notification.created_at, Notification.id, cursor, limit)
+
+
 def get_notification_by_id(db: Session, notification_id: int, user_id: int) -> Optional[Notification]:
     """Get a specific notification by ID for a user"""
     return db.query(Notification)\
@@ -49,7 +59,6 @@ def mark_notification_as_read(db: Session, notification_id: int, user_id: int) -
     if notification:
         notification.is_read = True
         db.commit()
-        db.refresh(notification)
     return notification
 
 
@@ -67,6 +76,7 @@ def delete_notification(db: Session, notification_id: int, user_id: int) -> bool
     notification = get_notification_by_id(db, notification_id, user_id)
     if notification:
         db.delete(notification)
+        record_deletions(db, user_id, Notification.__tablename__, [notification.id])
         db.commit()
         return True
     return False
@@ -74,8 +84,9 @@ def delete_notification(db: Session, notification_id: int, user_id: int) -> bool
 
 def delete_all_notifications(db: Session, user_id: int) -> int:
     """Delete all notifications for a user"""
-    result = db.query(Notification)\
-        .filter(Notification.user_id == user_id)\
-        .delete()
+    deleted_ids = list(db.scalars(
+        delete(Notification).where(Notification.user_id == user_id).returning(Notification.id)
+    ))
+    record_deletions(db, user_id, Notification.__tablename__, deleted_ids)
     db.commit()
-    return result
+    return len(deleted_ids)
@@ -0,0 +1,86 @@
+"""
+Change tracking for GET /sync
+
+Synced rows carry an updated_at set on every insert and update; deletes leave a
+SyncTombstone. A client passes the watermark of its previous sync and gets only
+what changed after it, read through the (user_id, updated_at) and
+(user_id, deleted_at) indexes.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.depression_risk_result import DepressionRiskResult
+from app.models.mood import MoodJournaling
+from app.models.notification import Notification
+from app.models.sync_tombstone import SyncTombstone
+from app.utils.helpers import utcnow
+
+# Response key -> synced model
+SYNCED_MODELS = {
+    "moods": MoodJournaling,
+    "notifications": Notification,
+    "risk_results": DepressionRiskResult,
+}
+_KEY_BY_TABLE = {model.__tablename__: key for key, model in SYNCED_MODELS.items()}
+
+
+def tombstone_cutoff(now: Optional[datetime] = None) -> datetime:
+    """Tombstones older than this are pruned, so watermarks older than it need a full sync"""
+    return (now or utcnow()) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def record_deletions(db: Session, user_id: int, table_name: str, row_ids: Iterable[int]) -> None:
+    """
+    Add tombstones for rows of one user deleted from table_name.
+    
+    The caller commits them together with the delete. The user's tombstones past
+    the retention window are pruned at the same time.
+    """
+    now = utcnow()
+    db.add_all(
+        SyncTombstone(user_id=user_id, table_name=table_name, row_id=row_id, deleted_at=now)
+        for row_id in row_ids
+    )
+    db.execute(
+        delete(SyncTombstone).where(
+            SyncTombstone.user_id == user_id,
+            SyncTombstone.deleted_at < tombstone_cutoff(now),
+        )
+    )
+
+
+def get_changes(db: Session, user_id: int, since: Optional[datetime]) -> Dict:
+    """
+    A user's synced rows created or updated after since, and the ids of those deleted after it
+    
+    Args:
+        since: Watermark of the previous sync; None for every row (and no deletions)
+    
+    Returns:
+        {"moods": [...], "notifications": [...], "risk_results": [...],
+         "deleted": {"moods": [ids], "notifications": [ids], "risk_results": [ids]}}
+    """
+    if since is not None:
+        since = since.astimezone(timezone.utc) if since.tzinfo else since.replace(tzinfo=timezone.utc)
+
+    changes: Dict = {}
+    for key, model in SYNCED_MODELS.items():
+        query = db.query(model).filter(model.user_id == user_id)
+        if since is not None:
+            query = query.filter(model.updated_at > since)
+        changes[key] = query.order_by(model.updated_at).all()
+
+    deleted: Dict[str, List[int]] = {key: [] for key in SYNCED_MODELS}
+    if since is not None:
+        tombstones = db.query(SyncTombstone.table_name, SyncTombstone.row_id)\
+            .filter(SyncTombstone.user_id == user_id, SyncTombstone.deleted_at > since)\
+            .order_by(SyncTombstone.deleted_at)
+        for table_name, row_id in tombstones:
+            if table_name in _KEY_BY_TABLE:
+                deleted[_KEY_BY_TABLE[table_name]].append(row_id)
+    changes["deleted"] = deleted
+    return changes
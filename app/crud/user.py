@@ -1,6 +1,11 @@
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models.user import User, UserCreate, UserUpdate
-from app.utils.security import get_password_hash
+from app.services.user_cache import user_cache
+from app.utils.security import get_password_hash, verify_password
 from typing import Optional
 
 
@@ -9,6 +14,28 @@ def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
 
 
+def get_user_by_id_cached(db: Session, user_id: int) -> Optional[User]:
+    """
+    Get user by ID, without a query while user_cache has a fresh copy
+    
+    The cached columns are merged into db as an unchanged, persistent user, so
+    changing and committing it or lazy loading its relationships work as usual.
+    """
+    columns = user_cache.get(user_id)
+    if columns is not None:
+        user = User()
+        for key, value in columns.items():
+            set_committed_value(user, key, value)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+    
+    generation = user_cache.generation
+    user = get_user_by_id(db, user_id)
+    if user is not None:
+        user_cache.put(user_id, {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}, generation)
+    return user
+
+
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """Get user by email"""
     return db.query(User).filter(User.email == email).first()
@@ -27,7 +54,6 @@ def create_user(db: Session, user: UserCreate) -> User:
     )
     db.add(db_user)
     db.commit()
-    db.refresh(db_user)
     return db_user
 
 
@@ -47,7 +73,7 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate) -> Optional[
         setattr(db_user, field, value)
     
     db.commit()
-    db.refresh(db_user)
+    user_cache.invalidate(user_id)
     return db_user
 
 
@@ -59,16 +85,90 @@ def delete_user(db: Session, user_id: int) -> bool:
     
     db.delete(db_user)
     db.commit()
+    user_cache.invalidate(user_id)
     return True
 
 
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     """Authenticate user with email and password"""
-    from app.utils.security import verify_password
-    
     user = get_user_by_email(db, email)
     if not user:
         return None
     if not verify_password(password, user.hashed_password):
         return None
     return user
+
+
+# Async variants for async def routes. Relationships cannot lazy load under an
+# AsyncSession, so the emergency contact that UserResponse reads is loaded up
+# front. Password hashing is CPU-bound, so it runs in the threadpool instead of
+# on the event loop.
+
+async def get_user_by_id_async(db: AsyncSession, user_id: int) -> Optional[User]:
+    """Get user by ID"""
+    return await db.get(User, user_id, options=[joinedload(User.emergency_contact)])
+
+
+async def get_user_by_email_async(db: AsyncSession, email: str) -> Optional[User]:
+    """Get user by email"""
+    return await db.scalar(
+        select(User).options(joinedload(User.emergency_contact)).where(User.email == email).limit(1)
+    )
+
+
+async def create_user_async(db: AsyncSession, user: UserCreate) -> User:
+    """Create new user"""
+    hashed_password = await run_in_threadpool(get_password_hash, user.password)
+    db_user = User(
+        email=user.email,
+        full_name=user.full_name,
+        hashed_password=hashed_password,
+        is_notify_enabled=user.is_notify_enabled if user.is_notify_enabled is not None else False,
+        is_risk_alert_enabled=user.is_risk_alert_enabled if user.is_risk_alert_enabled is not None else False,
+        is_push_reminder_enabled=user.is_push_reminder_enabled if user.is_push_reminder_enabled is not None else True,
+    )
+    db.add(db_user)
+    await db.commit()
+    return db_user
+
+
+async def update_user_async(db: AsyncSession, user_id: int, user_update: UserUpdate) -> Optional[User]:
+    """Update user information"""
+    db_user = await get_user_by_id_async(db, user_id)
+    if not db_user:
+        return None
+    
+    update_data = user_update.model_dump(exclude_unset=True)
+    
+    # Hash password if it's being updated
+    if "password" in update_data:
+        update_data["hashed_password"] = await run_in_threadpool(get_password_hash, update_data.pop("password"))
+    
+    for field, value in update_data.items():
+        setattr(db_user, field, value)
+    
+    await db.commit()
+    user_cache.invalidate(user_id)
+    return db_user
+
+
+async def delete_user_async(db: AsyncSession, user_id: int) -> bool:
+    """Delete user (related rows are removed by the relationship cascades)"""
+    db_user = await get_user_by_id_async(db, user_id)
+    if not db_user:
+        return False
+    
+    await db.delete(db_user)
+    await db.commit()
+    user_cache.invalidate(user_id)
+    return True
+
+
+async def authenticate_user_async(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    """Authenticate user with email and password"""
+    user = await get_user_by_email_async(db, email)
+    if not user:
+        return None
+    if not await run_in_threadpool(verify_password, password, user.hashed_password):
+        return None
+    return user
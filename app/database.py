@@ -1,15 +1,187 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from fastapi import Depends, Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 from app.config import Settings
 
 settings = Settings()
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
-
 Base = declarative_base()
 
+# Imported after Base: importing app.services loads the models, which import Base from here
+from app.services.pool_metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, pool_monitor  # noqa: E402
+
+
+def pool_options(url: str, is_async: bool = False) -> Dict:
+    """create_engine pool arguments from settings; SQLite keeps SQLAlchemy's default pool"""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING, "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS}
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        )
+    return options
+
+
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL))
+pool_monitor.watch("sync", engine)
+# Writers return their rows right after commit; keeping them loaded saves a SELECT per write.
+# Server defaults (created_at) come back with the INSERT through RETURNING.
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+# Replica for read-only routes; None when READ_DATABASE_URL is unset and reads use the primary
+READ_DATABASE_URL = settings.READ_DATABASE_URL
+read_engine = None
+ReadSessionLocal = None
+if READ_DATABASE_URL:
+    read_engine = create_engine(READ_DATABASE_URL, **pool_options(READ_DATABASE_URL))
+    pool_monitor.watch("sync_read", read_engine)
+    ReadSessionLocal = sessionmaker(bind=read_engine, expire_on_commit=False)
+
+# Request header with which a client asks for a read from the primary
+CONSISTENT_READ_HEADER = "X-Consistent-Read"
+
+# Async drivers for the sync drivers DATABASE_URL may name
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_async_engine = None
+_AsyncSessionLocal = None
+_async_read_engine = None
+_AsyncReadSessionLocal = None
+
+
+class RecentWrites:
+    """
+    Users who wrote within the last window seconds, whose reads must see their own writes
+
+    Kept per worker process. Clients served by several workers can send the
+    X-Consistent-Read header after a write to read from the primary anyway.
+    """
+
+    def __init__(self, window: float, max_users: int = 10000):
+        self.window = window
+        self.max_users = max_users
+        self._last_write: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, user_id: int):
+        now = time.monotonic()
+        with self._lock:
+            self._last_write[user_id] = now
+            if len(self._last_write) > self.max_users:
+                # Forget users whose window has passed
+                self._last_write = {
+                    user: written for user, written in self._last_write.items() if now - written < self.window
+                }
+
+    def is_recent(self, user_id: int) -> bool:
+        written = self._last_write.get(user_id)
+        return written is not None and time.monotonic() - written < self.window
+
+    def clear(self):
+        with self._lock:
+            self._last_write.clear()
+
+
+recent_writes = RecentWrites(settings.READ_YOUR_WRITES_SECONDS)
+
+
+def request_user_id(request: Request) -> Optional[int]:
+    """User id of the request's bearer token, or None when it has no valid one"""
+    from app.utils.security import decode_access_token
+
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    token_data = decode_access_token(token)
+    return token_data.user_id if token_data else None
+
+
+def reads_from_primary(request: Request) -> bool:
+    """Whether a read-only request must see the primary: asked for, or its user wrote recently"""
+    if request.headers.get(CONSISTENT_READ_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    user_id = request_user_id(request)
+    return user_id is not None and recent_writes.is_recent(user_id)
+
+
 def get_db():
     with SessionLocal() as session:
         yield session
+
+
+def get_read_db(request: Request, primary: Session = Depends(get_db)):
+    """
+    Session for read-only routes: the replica, unless reads_from_primary
+
+    The primary session is only opened (and connects) when it is used, so
+    depending on it costs nothing for replica reads.
+    """
+    if ReadSessionLocal is None or reads_from_primary(request):
+        yield primary
+        return
+    with ReadSessionLocal() as session:
+        yield session
+
+
+def to_async_database_url(url: str) -> str:
+    """DATABASE_URL with its driver swapped for the matching async driver (asyncpg, aiosqlite)"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} databases")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    """The async engine, created on first use so the sync-only tools never need an async driver"""
+    global _async_engine
+    if _async_engine is None:
+        async_url = to_async_database_url(DATABASE_URL)
+        _async_engine = create_async_engine(async_url, **pool_options(async_url, is_async=True))
+        pool_monitor.watch("async", _async_engine)
+    return _async_engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is None:
+        # Attributes cannot be lazily refreshed outside an await, so keep them loaded after commit
+        _AsyncSessionLocal = async_sessionmaker(bind=get_async_engine(), expire_on_commit=False)
+    return _AsyncSessionLocal
+
+
+async def get_async_db():
+    """AsyncSession dependency for async def routes, so database round-trips never block the event loop"""
+    async with get_async_sessionmaker()() as session:
+        yield session
+
+
+def get_async_read_sessionmaker() -> async_sessionmaker:
+    global _async_read_engine, _AsyncReadSessionLocal
+    if _AsyncReadSessionLocal is None:
+        async_url = to_async_database_url(READ_DATABASE_URL)
+        _async_read_engine = create_async_engine(async_url, **pool_options(async_url, is_async=True))
+        pool_monitor.watch("async_read", _async_read_engine)
+        _AsyncReadSessionLocal = async_sessionmaker(bind=_async_read_engine, expire_on_commit=False)
+    return _AsyncReadSessionLocal
+
+
+async def get_async_read_db(request: Request, primary: AsyncSession = Depends(get_async_db)):
+    """AsyncSession counterpart of get_read_db for async def read-only routes"""
+    if READ_DATABASE_URL is None or reads_from_primary(request):
+        yield primary
+        return
+    async with get_async_read_sessionmaker()() as session:
+        yield session
@@ -6,8 +6,15 @@ from contextlib import asynccontextmanager
 import logging
 
 from app.config import settings
-from app.api import auth, user, mood, chatbot, emergency_contact, depression_test, depression_risk_result, notification, email, emergency_alert, push_notification
+from app.database import READ_DATABASE_URL, recent_writes, request_user_id
+from app.api import auth, user, mood, chatbot, emergency_contact, depression_test, depression_risk_result, notification, email, emergency_alert, push_notification, model_registry, sync
 from app.services.push_reminder_scheduler import start_push_reminder_scheduler, stop_push_reminder_scheduler
+from app.services.prediction_service import prediction_service
+from app.services.metrics import render_metrics
+from app.services.model_registry import model_registry as prediction_model_registry
+from app.services.prediction_batcher import prediction_batcher
+from app.services.prediction_executor import prediction_executor
+from app.services.shadow_evaluator import shadow_evaluator
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,10 +27,29 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Lumora Mental Health API...")
     start_push_reminder_scheduler()
+    if settings.MODEL_WARMUP_ON_STARTUP:
+        prediction_service.start_background_warmup()
+    prediction_executor.start_background()
+    if settings.MODEL_WATCH_ENABLED:
+        prediction_model_registry.start_watching()
+    if prediction_service.drift_monitor is not None:
+        prediction_service.drift_monitor.start_persisting()
+    if settings.SHADOW_MODEL_PATH:
+        try:
+            shadow_evaluator.load_candidate(settings.SHADOW_MODEL_PATH)
+            shadow_evaluator.attach(prediction_service)
+        except Exception as e:
+            logger.error("Could not load shadow model %s: %s", settings.SHADOW_MODEL_PATH, e)
     
     yield
     
     # Shutdown
+    prediction_model_registry.stop_watching()
+    prediction_batcher.stop()
+    shadow_evaluator.stop()
+    prediction_executor.shutdown()
+    if prediction_service.drift_monitor is not None:
+        prediction_service.drift_monitor.stop_persisting()
     stop_push_reminder_scheduler()
     logger.info("Shutting down Lumora Mental Health API...")
 
@@ -72,6 +98,21 @@ app.add_middleware(
 )
 
 
+async def track_user_writes(request: Request, call_next):
+    """Send a user's reads to the primary for READ_YOUR_WRITES_SECONDS after each of their writes"""
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        user_id = request_user_id(request)
+        if user_id is not None:
+            recent_writes.record(user_id)
+    return response
+
+
+# Only needed when reads can go to a replica
+if READ_DATABASE_URL:
+    app.middleware("http")(track_user_writes)
+
+
 # Exception handlers
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -95,6 +136,8 @@ app.include_router(depression_risk_result.router)
 app.include_router(notification.router)
 app.include_router(push_notification.router)
 app.include_router(email.router)
+app.include_router(model_registry.router)
+app.include_router(sync.router)
 
 
 # Root endpoint
@@ -129,6 +172,32 @@ async def health_check():
     }
 
 
+# Readiness check endpoint
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness check endpoint - 503 until the prediction model is loaded"""
+    if prediction_service.is_ready:
+        return {
+            "status": "ready",
+            "model_version": prediction_service.model_version
+        }
+    
+    if prediction_service.load_error:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "error", "detail": prediction_service.load_error}
+        )
+    
+    return JSONResponse(status_code=503, content={"status": "loading"})
+
+
+# Metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prediction stage latency histograms in the Prometheus text format"""
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # API info endpoint
 @app.get("/api/info")
 async def api_info():
@@ -6,6 +6,7 @@ from .depression_test import DepressionTest
 from .depression_risk_result import DepressionRiskResult
 from .notification import Notification
 from .chat_history import ChatHistory
+from .sync_tombstone import SyncTombstone
 
 
 __all__ = [
@@ -22,6 +23,8 @@ __all__ = [
     "ChatMessage", "ChatRequest", "ChatResponse", "ConversationContext",
     # Chat History
     "ChatHistory",
+    # Sync
+    "SyncTombstone",
 
     # Depression Test
     "DepressionTestCreate", "DepressionTestResponse",
@@ -1,12 +1,17 @@
-from sqlalchemy import Column, Integer, String, Float, JSON, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, JSON, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.utils.helpers import utcnow
 
 
 class DepressionRiskResult(Base):
     """Depression risk assessment result ORM model"""
     __tablename__ = "depression_risk_results"
+    __table_args__ = (
+        # At most one result per test per model version, so retried predictions cannot duplicate rows
+        Index("uq_depression_risk_results_test_model_version", "depression_test_id", "model_version", unique=True),
+    )
     
     result_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -15,12 +20,22 @@ class DepressionRiskResult(Base):
     # Risk assessment results
     risk_level = Column(String, nullable=False)  # Low, Medium, High
     risk_score = Column(Float, nullable=False)  # 0.0 to 1.0
+    model_version = Column(String(64), nullable=True)  # Version of the model that scored the test
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, server_default=func.now(), nullable=False)  # see GET /sync
     
     # Relationships
     user = relationship("User", back_populates="depression_risk_results")
     depression_test = relationship("DepressionTest", back_populates="depression_risk_results")
 
 
+# Per-user reads filter by user_id and order or range by created_at
+Index(
+    "ix_depression_risk_results_user_id_created_at",
+    DepressionRiskResult.user_id,
+    DepressionRiskResult.created_at.desc(),
+)
+# GET /sync range-scans a user's rows changed since a watermark
+Index("ix_depression_risk_results_user_id_updated_at", DepressionRiskResult.user_id, DepressionRiskResult.updated_at)
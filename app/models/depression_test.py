@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -30,4 +30,9 @@ class DepressionTest(Base):
 
     # relationship
     user = relationship("User", back_populates="depression_tests")
-    depression_risk_results = relationship("DepressionRiskResult", back_populates="depression_test", uselist=False, cascade="all, delete-orphan")
\ No newline at end of file
+    # One result per model version that scored the test (see app/tools/rescore.py)
+    depression_risk_results = relationship("DepressionRiskResult", back_populates="depression_test", cascade="all, delete-orphan")
+
+
+# Per-user reads filter by user_id and order or range by created_at
+Index("ix_depression_tests_user_id_created_at", DepressionTest.user_id, DepressionTest.created_at.desc())
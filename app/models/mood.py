@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
+from app.utils.helpers import utcnow
 
 
 class MoodJournaling(Base):
@@ -34,5 +35,21 @@ class MoodJournaling(Base):
         nullable=False
     )
 
+    # Set by the application, so GET /sync watermarks and rows share one clock;
+    # the server default only covers rows written outside it
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=utcnow,
+        onupdate=utcnow,
+        server_default=func.now(),
+        nullable=False
+    )
+
     # Relationship with User
     user = relationship("User", back_populates="mood_journals")
+
+
+# Per-user reads filter by user_id and order or range by created_at
+Index("ix_mood_journaling_user_id_created_at", MoodJournaling.user_id, MoodJournaling.created_at.desc())
+# GET /sync range-scans a user's rows changed since a watermark
+Index("ix_mood_journaling_user_id_updated_at", MoodJournaling.user_id, MoodJournaling.updated_at)
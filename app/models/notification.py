@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Text, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.utils.helpers import utcnow
 
 
 class Notification(Base):
@@ -21,6 +22,21 @@ class Notification(Base):
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, server_default=func.now(), nullable=False)  # see GET /sync
 
     # Relationship
     user = relationship("User", back_populates="notifications")
+
+
+# Per-user reads filter by user_id and order or range by created_at
+Index("ix_notifications_user_id_created_at", Notification.user_id, Notification.created_at.desc())
+# GET /sync range-scans a user's rows changed since a watermark
+Index("ix_notifications_user_id_updated_at", Notification.user_id, Notification.updated_at)
+# Unread notifications are a small, hot subset: index only those rows
+Index(
+    "ix_notifications_unread_user_id_created_at",
+    Notification.user_id,
+    Notification.created_at.desc(),
+    postgresql_where=text("is_read = false"),
+    sqlite_where=text("is_read = 0"),
+)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+from app.utils.helpers import utcnow
+
+
+class SyncTombstone(Base):
+    """Record of a deleted row, so GET /sync can tell clients to drop their copy"""
+    __tablename__ = "sync_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    # The deleted row: its table name and primary key
+    table_name = Column(String(64), nullable=False)
+    row_id = Column(Integer, nullable=False)
+
+    deleted_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), nullable=False)
+
+
+# GET /sync range-scans a user's deletions since a watermark
+Index("ix_sync_tombstones_user_id_deleted_at", SyncTombstone.user_id, SyncTombstone.deleted_at)
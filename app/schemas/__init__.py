@@ -43,6 +43,12 @@ from app.schemas.depression_risk_result import (
 
 
 
+# ---------- Pagination ----------
+from app.schemas.pagination import Page
+
+# ---------- Sync ----------
+from app.schemas.sync import SyncDeleted, SyncResponse
+
 # ---------- Chatbot ----------
 from app.models.chatbot import (
     ChatMessage,
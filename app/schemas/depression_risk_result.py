@@ -1,7 +1,10 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Union
 from datetime import datetime, date
 
+from app.config import settings
+from app.schemas.depression_test import DepressionTestCreate
+
 
 class DepressionRiskResultCreate(BaseModel):
     """Schema for creating a new depression risk result"""
@@ -9,6 +12,24 @@ class DepressionRiskResultCreate(BaseModel):
     depression_test_id: Optional[int] = Field(None, description="ID of the related depression test")
     risk_level: str = Field(..., description="Risk level: Low, Medium, or High")
     risk_score: float = Field(..., ge=0.0, le=1.0, description="Risk score between 0.0 and 1.0")
+    model_version: Optional[str] = Field(None, description="Version of the model that produced the score")
+
+    class Config:
+        protected_namespaces = ()
+
+
+class FeatureContribution(BaseModel):
+    """Schema for one answer's contribution to a risk score"""
+    feature: str = Field(..., description="Depression test field, e.g. sleep_hour")
+    answer: Optional[Union[int, str]] = Field(None, description="The answer given")
+    contribution: float = Field(..., description="Contribution to the log-odds; positive raises the risk")
+
+
+class RiskExplanation(BaseModel):
+    """Schema for a risk score explanation"""
+    baseline: float = Field(..., description="Log-odds before any answer is counted (the model intercept)")
+    log_odds: float = Field(..., description="baseline plus every contribution; the risk score is its sigmoid")
+    contributions: List[FeatureContribution] = Field(..., description="Per-answer contributions, largest effect first")
 
 
 class DepressionRiskResultResponse(BaseModel):
@@ -18,11 +39,67 @@ class DepressionRiskResultResponse(BaseModel):
 
     risk_level: str
     risk_score: float
+    model_version: Optional[str] = None
 
     created_at: datetime
 
+    explanation: Optional[RiskExplanation] = None
+
     class Config:
         from_attributes = True
+        protected_namespaces = ()
+
+    @classmethod
+    def with_explanation(cls, result, explanation: Optional[dict]) -> "DepressionRiskResultResponse":
+        """Response for a stored result (ORM object or row) plus its explanation"""
+        response = cls.model_validate(result)
+        response.explanation = RiskExplanation.model_validate(explanation) if explanation else None
+        return response
+
+
+class DepressionRiskBatchRequest(BaseModel):
+    """Schema for scoring many depression tests in one request"""
+    depression_test_ids: List[int] = Field(
+        default_factory=list,
+        max_length=settings.PREDICT_BATCH_MAX_SIZE,
+        description="IDs of stored depression tests to score",
+    )
+    tests: List[DepressionTestCreate] = Field(
+        default_factory=list,
+        max_length=settings.PREDICT_BATCH_MAX_SIZE,
+        description="Raw depression test payloads to store and score",
+    )
+
+    @model_validator(mode="after")
+    def check_batch_size(self):
+        total = len(self.depression_test_ids) + len(self.tests)
+        if total == 0:
+            raise ValueError("Provide at least one depression_test_id or test payload")
+        if total > settings.PREDICT_BATCH_MAX_SIZE:
+            raise ValueError(f"A batch may contain at most {settings.PREDICT_BATCH_MAX_SIZE} tests")
+        return self
+
+
+class WhatIfAlternative(BaseModel):
+    """Schema for the risk score after changing one answer"""
+    feature: str = Field(..., description="Depression test field that was changed, e.g. sleep_hour")
+    current_answer: Optional[Union[int, str]] = Field(None, description="The answer given in the test")
+    answer: Union[int, str] = Field(..., description="The alternative answer")
+    risk_score: float = Field(..., description="Risk score with the alternative answer (0.0 to 1.0)")
+    risk_level: str = Field(..., description="Risk level with the alternative answer")
+    change: float = Field(..., description="risk_score minus the test's risk score; negative lowers the risk")
+
+
+class WhatIfResponse(BaseModel):
+    """Schema for what-if scoring of a depression test"""
+    depression_test_id: int
+    model_version: Optional[str] = None
+    risk_score: float = Field(..., description="Risk score of the test as answered")
+    risk_level: str = Field(..., description="Risk level of the test as answered")
+    alternatives: List[WhatIfAlternative] = Field(..., description="Every single-answer change, biggest risk reduction first")
+
+    class Config:
+        protected_namespaces = ()
 
 
 class DailyRisk(BaseModel):
@@ -56,6 +133,7 @@ class DailyRiskResultItem(BaseModel):
 class DailyRiskResultsResponse(BaseModel):
     """Schema for daily risk results response"""
     results: List[DailyRiskResultItem] = Field(..., description="List of daily risk results")
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= for the next page; null on the last page")
 
 
 class EmergencyAlertRequest(BaseModel):
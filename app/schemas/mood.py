@@ -1,6 +1,6 @@
 from datetime import date, datetime
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from app.config import settings
 
 
@@ -22,3 +22,27 @@ class MoodResponse(MoodBase):
     timezone: str = Field(default=settings.TIMEZONE, description="Timezone reference for created_at")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class MoodBulkRequest(BaseModel):
+    """Schema for uploading many mood entries at once, e.g. those logged offline"""
+    entries: List[Dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.MOOD_BULK_MAX_SIZE,
+        description="MoodCreate payloads; each is validated on its own, so one bad entry does not reject the others",
+    )
+
+
+class MoodBulkItemResult(BaseModel):
+    """Outcome of one entry of a bulk upload"""
+    index: int = Field(..., description="Position of the entry in the request")
+    mood_id: Optional[int] = Field(None, description="ID of the stored entry; None if it was rejected")
+    error: Optional[str] = Field(None, description="Why the entry was rejected")
+
+
+class MoodBulkResponse(BaseModel):
+    """Schema for the result of a bulk upload, one item per entry in request order"""
+    created: int
+    failed: int
+    results: List[MoodBulkItemResult]
@@ -0,0 +1,31 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List
+
+from app.schemas.depression_risk_result import DepressionRiskResultResponse
+from app.schemas.mood import MoodResponse
+from app.schemas.notification import NotificationResponse
+
+
+class SyncDeleted(BaseModel):
+    """IDs of rows deleted since the watermark"""
+    moods: List[int] = Field(default_factory=list, description="Deleted mood_ids")
+    notifications: List[int] = Field(default_factory=list, description="Deleted notification ids")
+    risk_results: List[int] = Field(default_factory=list, description="Deleted result_ids")
+
+
+class SyncResponse(BaseModel):
+    """Schema for the rows changed since a client's previous sync"""
+    watermark: datetime = Field(..., description="Pass as since on the next sync")
+    full: bool = Field(
+        ...,
+        description="Every row rather than changes: replace local data instead of merging into it",
+    )
+    moods: List[MoodResponse] = Field(..., description="Entries created or updated since the watermark")
+    notifications: List[NotificationResponse] = Field(..., description="Notifications created or updated since the watermark")
+    risk_results: List[DepressionRiskResultResponse] = Field(
+        ...,
+        description="Results created since the watermark; one for an already known depression_test_id "
+                    "is a re-score by a newer model and replaces the known one",
+    )
+    deleted: SyncDeleted
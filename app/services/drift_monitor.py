@@ -0,0 +1,319 @@
+"""
+Streaming drift monitor for the risk model's inputs and scores
+
+Every scored test adds its answers and risk score to fixed-size counters: one
+count per answer of each feature and a histogram of risk scores. Memory does not
+grow with traffic, and drift statistics never need a scan of depression_tests.
+The counters live in each worker's memory; when settings.DRIFT_STATE_PATH is set
+they are also written there periodically and restored at startup, which is only
+safe with one worker per file.
+
+Drift is reported as the population stability index (PSI) of each distribution
+against a reference snapshot in the same format (settings.DRIFT_REFERENCE_PATH),
+e.g. the counters frozen over a period the model was known to behave well.
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STATE_FORMAT_VERSION = 1
+
+MISSING = "(missing)"
+OTHER = "(other)"  # answers beyond MAX_ANSWERS_PER_FEATURE distinct values
+MAX_ANSWERS_PER_FEATURE = 32
+SCORE_BINS = 20  # equal-width risk score bins over [0, 1]
+
+# Answers and scores are buffered and counted FLUSH_ROWS at a time
+FLUSH_ROWS = 1024
+
+# Common PSI reading: below 0.1 stable, below 0.25 moderate shift, above that significant
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+PSI_EPSILON = 1e-4  # floor for empty bins, which would make the log undefined
+
+
+def population_stability_index(expected: Sequence[float], actual: Sequence[float]) -> Optional[float]:
+    """
+    PSI of two aligned count vectors: sum((a - e) * ln(a / e)) over bin shares
+
+    Returns:
+        The PSI, or None when either side has no observations
+    """
+    expected = np.asarray(expected, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+    if expected.sum() == 0 or actual.sum() == 0:
+        return None
+    expected = np.clip(expected / expected.sum(), PSI_EPSILON, None)
+    actual = np.clip(actual / actual.sum(), PSI_EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def drift_status(psi: Optional[float]) -> Optional[str]:
+    if psi is None:
+        return None
+    if psi < PSI_MODERATE:
+        return "stable"
+    if psi < PSI_SIGNIFICANT:
+        return "moderate"
+    return "significant"
+
+
+class _AnswerCounts:
+    """Counts of one feature's answers in a fixed-size array, indexed by first appearance"""
+
+    def __init__(self):
+        self.labels = [MISSING, OTHER]
+        self.codes: Dict = {None: 0, MISSING: 0, OTHER: 1}
+        self.counts = np.zeros(MAX_ANSWERS_PER_FEATURE + 2, dtype=np.int64)
+
+    def code(self, answer) -> int:
+        code = self.codes.get(answer)
+        if code is None:
+            label = str(answer)
+            code = self.codes.get(label)
+            if code is None:
+                if len(self.labels) == len(self.counts):
+                    # Not remembered, so junk answers cannot grow the lookup table
+                    return 1
+                code = self.codes[label] = len(self.labels)
+                self.labels.append(label)
+            self.codes[answer] = code
+        return code
+
+    def add(self, answers: Sequence):
+        try:
+            # Every answer seen before: plain dict lookups
+            codes = np.fromiter(map(self.codes.__getitem__, answers), dtype=np.int64, count=len(answers))
+        except KeyError:
+            codes = np.fromiter(map(self.code, answers), dtype=np.int64, count=len(answers))
+        self.counts += np.bincount(codes, minlength=len(self.counts))
+
+    def to_dict(self) -> Dict[str, int]:
+        return {label: int(count) for label, count in zip(self.labels, self.counts) if count}
+
+    def update(self, counts: Dict[str, int]):
+        for label, count in counts.items():
+            self.counts[self.code(label)] += count
+
+
+class DriftMonitor:
+    """
+    Constant-memory answer and score distributions, with PSI against a reference
+
+    observe only appends to a buffer under a lock; the buffer is counted with one
+    bincount per feature once it holds FLUSH_ROWS tests (or when stats are read).
+    """
+
+    def __init__(
+        self,
+        features: List[str],
+        state_path: Optional[str] = None,
+        reference_path: Optional[str] = None,
+        persist_interval: float = 60.0,
+    ):
+        """
+        Args:
+            features: Name of each position of the answer tuples passed to observe
+            state_path: JSON file the counters are saved to and restored from
+            reference_path: JSON snapshot the counters are compared with
+            persist_interval: Seconds between saves by start_persisting
+        """
+        self.features = features
+        self.state_path = state_path
+        self.reference_path = reference_path
+        self.persist_interval = persist_interval
+        self._pending_answers: List[Tuple] = []
+        self._pending_scores: List[float] = []
+        self._pending_lock = threading.Lock()
+        self._lock = threading.Lock()  # guards the counters
+        self._stop_event = threading.Event()
+        self._persist_thread: Optional[threading.Thread] = None
+        self.reset()
+        if state_path and os.path.exists(state_path):
+            try:
+                self.restore(load_drift_state(state_path))
+            except Exception as e:
+                logger.error("Could not restore drift state from %s: %s", state_path, e)
+
+    def reset(self):
+        """Drop all counts and start a new window"""
+        with self._pending_lock:
+            self._pending_answers, self._pending_scores = [], []
+        with self._lock:
+            self._answers = [_AnswerCounts() for _ in self.features]
+            self._scores = np.zeros(SCORE_BINS, dtype=np.int64)
+            self.observations = 0
+            self.started_at = datetime.now(timezone.utc)
+            self.updated_at: Optional[datetime] = None
+
+    def observe(self, answers: List[Tuple], scores: Sequence[float]):
+        """
+        Record scored tests
+
+        Args:
+            answers: One tuple of answers per test, in the order of features
+            scores: Risk score of each test
+        """
+        with self._pending_lock:
+            self._pending_answers.extend(answers)
+            self._pending_scores.extend(scores)
+            if len(self._pending_answers) < FLUSH_ROWS:
+                return
+            answers, scores = self._take_pending()
+        self._count(answers, scores)
+
+    def flush(self):
+        """Count everything still buffered"""
+        with self._pending_lock:
+            answers, scores = self._take_pending()
+        if answers:
+            self._count(answers, scores)
+
+    def _take_pending(self) -> Tuple[List[Tuple], List[float]]:
+        answers, scores = self._pending_answers, self._pending_scores
+        self._pending_answers, self._pending_scores = [], []
+        return answers, scores
+
+    def _count(self, answers: List[Tuple], scores: List[float]):
+        bins = np.clip((np.asarray(scores, dtype=float) * SCORE_BINS).astype(np.int64), 0, SCORE_BINS - 1)
+        with self._lock:
+            for counts, column in zip(self._answers, zip(*answers)):
+                counts.add(column)
+            self._scores += np.bincount(bins, minlength=SCORE_BINS)
+            self.observations += len(answers)
+            self.updated_at = datetime.now(timezone.utc)
+
+    def state(self) -> Dict:
+        """The counters as a JSON-serializable snapshot (the format of the state and reference files)"""
+        self.flush()
+        with self._lock:
+            return {
+                "format_version": STATE_FORMAT_VERSION,
+                "started_at": self.started_at.isoformat(),
+                "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+                "observations": self.observations,
+                "features": {
+                    feature: counts.to_dict() for feature, counts in zip(self.features, self._answers)
+                },
+                "score_histogram": [int(count) for count in self._scores],
+            }
+
+    def restore(self, state: Dict):
+        """Add the counts of a saved snapshot, e.g. after a restart"""
+        if len(state["score_histogram"]) != SCORE_BINS:
+            raise ValueError(f"Expected {SCORE_BINS} score bins, got {len(state['score_histogram'])}")
+        with self._lock:
+            for feature, counts in zip(self.features, self._answers):
+                counts.update(state["features"].get(feature, {}))
+            self._scores += np.asarray(state["score_histogram"], dtype=np.int64)
+            self.observations += state["observations"]
+            self.started_at = datetime.fromisoformat(state["started_at"])
+            if state.get("updated_at"):
+                self.updated_at = datetime.fromisoformat(state["updated_at"])
+
+    def save(self, path: Optional[str] = None):
+        """Write the counters to path (default: the state file)"""
+        path = path or self.state_path
+        if path:
+            save_drift_state(path, self.state())
+
+    def save_reference(self):
+        """Make the current counters the reference and start a new window"""
+        if not self.reference_path:
+            raise ValueError("No drift reference path configured")
+        self.save(self.reference_path)
+        self.reset()
+        self.save()
+
+    def stats(self) -> Dict:
+        """
+        Current distributions and their PSI against the reference
+
+        Returns:
+            Dict with observations, the window, score and per-feature distributions,
+            each with psi and status (None without a reference), and max_psi
+        """
+        current = self.state()
+        reference = None
+        if self.reference_path and os.path.exists(self.reference_path):
+            reference = load_drift_state(self.reference_path)
+
+        score_psi = None
+        if reference is not None and len(reference["score_histogram"]) == SCORE_BINS:
+            score_psi = population_stability_index(reference["score_histogram"], current["score_histogram"])
+
+        features = {}
+        for feature, counts in current["features"].items():
+            psi = None
+            if reference is not None:
+                expected = reference["features"].get(feature, {})
+                labels = sorted(set(expected) | set(counts))
+                psi = population_stability_index(
+                    [expected.get(label, 0) for label in labels], [counts.get(label, 0) for label in labels]
+                )
+            features[feature] = {"counts": counts, "psi": psi, "status": drift_status(psi)}
+
+        all_psi = [item["psi"] for item in features.values() if item["psi"] is not None]
+        if score_psi is not None:
+            all_psi.append(score_psi)
+        return {
+            "observations": current["observations"],
+            "started_at": current["started_at"],
+            "updated_at": current["updated_at"],
+            "reference_observations": reference["observations"] if reference else None,
+            "max_psi": max(all_psi) if all_psi else None,
+            "score": {
+                "bins": SCORE_BINS,
+                "histogram": current["score_histogram"],
+                "psi": score_psi,
+                "status": drift_status(score_psi),
+            },
+            "features": features,
+        }
+
+    def start_persisting(self):
+        """Save the counters every persist_interval seconds in a background thread"""
+        if not self.state_path or (self._persist_thread is not None and self._persist_thread.is_alive()):
+            return
+        self._stop_event.clear()
+
+        def persist():
+            while not self._stop_event.wait(self.persist_interval):
+                try:
+                    self.save()
+                except Exception as e:
+                    logger.error("Could not save drift state to %s: %s", self.state_path, e)
+
+        self._persist_thread = threading.Thread(target=persist, name="drift-monitor-persist", daemon=True)
+        self._persist_thread.start()
+
+    def stop_persisting(self):
+        """Stop the background thread and save one last time"""
+        self._stop_event.set()
+        if self._persist_thread is not None:
+            self._persist_thread.join(timeout=5)
+            self._persist_thread = None
+        try:
+            self.save()
+        except Exception as e:
+            logger.error("Could not save drift state to %s: %s", self.state_path, e)
+
+
+def load_drift_state(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_drift_state(path: str, state: Dict):
+    """Write a snapshot atomically so a crash never leaves a torn file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
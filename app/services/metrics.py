@@ -0,0 +1,120 @@
+"""
+In-process latency histograms, exposed at GET /metrics in the Prometheus text format
+
+Usage:
+    with PREDICTION_STAGE_SECONDS.time("encode"):
+        ...
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+# Upper bounds in seconds, from 10us (cached scoring) to 10s (slow database commits)
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Everything rendered at GET /metrics: objects with a render() returning exposition lines
+_registry: List = []
+
+
+def register(collector):
+    """Add collector (anything with a render() method) to GET /metrics"""
+    _registry.append(collector)
+    return collector
+
+
+class Histogram:
+    """
+    Cumulative latency histogram with one series per label value
+
+    Observing takes a lock and a bisect, about a microsecond.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registered: bool = True,
+    ):
+        """
+        Args:
+            registered: Render this histogram at GET /metrics
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = tuple(buckets)
+        # label value -> (per-bucket counts with a final +Inf bucket, [sum, count])
+        self._series: Dict[str, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+        if registered:
+            register(self)
+
+    def observe(self, label_value: str, seconds: float):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+            series[0][index] += 1
+            series[1][0] += seconds
+            series[1][1] += 1
+
+    @contextmanager
+    def time(self, label_value: str):
+        """Observe the time spent in the with block (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(label_value, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Count, sum and mean per label value"""
+        with self._lock:
+            return {
+                label_value: {"count": int(count), "sum": total, "mean": total / count if count else 0.0}
+                for label_value, (_, (total, count)) in self._series.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> List[str]:
+        """Prometheus text exposition lines for this histogram"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {label_value: (list(counts), list(totals)) for label_value, (counts, totals) in self._series.items()}
+        for label_value in sorted(series):
+            counts, (total, count) = series[label_value]
+            labels = f'{self.label}="{label_value}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {int(count)}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total:.9f}")
+            lines.append(f"{self.name}_count{{{labels}}} {int(count)}")
+        return lines
+
+
+def render_metrics() -> str:
+    """All registered histograms and collectors in the Prometheus text exposition format"""
+    lines = []
+    for collector in _registry:
+        lines.extend(collector.render())
+    return "\n".join(lines) + "\n"
+
+
+PREDICTION_STAGE_SECONDS = Histogram(
+    "lumora_prediction_stage_seconds",
+    "Time spent in each stage of scoring a depression test",
+    label="stage",
+)
@@ -0,0 +1,129 @@
+"""
+Compact, sklearn-free model artifact for depression risk prediction
+
+The artifact is a small versioned JSON file with everything the prediction
+service needs to score the logistic model: feature order, answer vocabularies,
+raw-feature coefficients and intercept. Loading it only needs the standard
+library and NumPy, so workers start without importing scikit-learn.
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List
+
+ARTIFACT_FORMAT_VERSION = 1
+
+
+@dataclass
+class CompactModel:
+    model_version: str
+    feature_order: List[str]
+    vocabularies: Dict[str, List[str]]
+    coef: List[float]
+    intercept: float
+
+
+def compute_model_version(*paths: str) -> str:
+    """Short content hash of the given model files, used as the model version"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def export_model_artifact(model_path: str, encoders_path: str, output_path: str) -> CompactModel:
+    """
+    Convert the pickled sklearn model and label encoders into a compact artifact.
+    
+    Args:
+        model_path: Path to the pickled model (logistic regression, optionally scaled)
+        encoders_path: Path to the pickled dict of fitted LabelEncoders
+        output_path: Where to write the JSON artifact
+    
+    Returns:
+        The exported CompactModel
+    
+    Raises:
+        ValueError: If the model cannot be expressed in closed form
+    """
+    import joblib
+    from app.services.prediction_service import FEATURE_ORDER, LogisticScoringEngine, LookupTableEncoder
+
+    model = joblib.load(model_path)
+    encoders = joblib.load(encoders_path)
+
+    engine = LogisticScoringEngine(model)
+    if not engine.is_closed_form:
+        raise ValueError(
+            f"Only binary logistic regression models can be exported, got {type(model).__name__}"
+        )
+
+    compact = CompactModel(
+        model_version=compute_model_version(model_path, encoders_path),
+        feature_order=list(FEATURE_ORDER),
+        vocabularies=LookupTableEncoder.from_label_encoders(encoders).vocabularies,
+        coef=[float(value) for value in engine.coef],
+        intercept=float(engine.intercept),
+    )
+
+    payload = {
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "model_type": "logistic_regression",
+        "model_version": compact.model_version,
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+        "source": {
+            "model": os.path.basename(model_path),
+            "encoders": os.path.basename(encoders_path),
+        },
+        "feature_order": compact.feature_order,
+        "vocabularies": compact.vocabularies,
+        "coef": compact.coef,
+        "intercept": compact.intercept,
+    }
+
+    # Write to a temp file first so readers never see a half-written artifact
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, output_path)
+
+    return compact
+
+
+def load_model_artifact(path: str) -> CompactModel:
+    """
+    Load a compact model artifact.
+    
+    Coefficients are returned in the prediction service's FEATURE_ORDER, whatever
+    order the artifact stores them in.
+    
+    Raises:
+        ValueError: If the artifact format is unsupported or inconsistent
+    """
+    from app.services.prediction_service import FEATURE_ORDER
+
+    with open(path, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+
+    format_version = payload.get("format_version")
+    if format_version != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported model artifact format version: {format_version}")
+
+    feature_order = payload["feature_order"]
+    coef = payload["coef"]
+    if len(coef) != len(feature_order) or set(feature_order) != set(FEATURE_ORDER):
+        raise ValueError("Model artifact features do not match the depression test features")
+
+    coef_by_feature = dict(zip(feature_order, coef))
+
+    return CompactModel(
+        model_version=payload["model_version"],
+        feature_order=list(FEATURE_ORDER),
+        vocabularies=payload["vocabularies"],
+        coef=[float(coef_by_feature[feature]) for feature in FEATURE_ORDER],
+        intercept=float(payload["intercept"]),
+    )
@@ -0,0 +1,230 @@
+"""
+Versioned model registry with hot reload
+
+Watches the model files in saved_models/ (or is triggered through the admin
+endpoint), loads a new version off to the side, validates it against the golden
+set and swaps it into the prediction service atomically. Predictions already in
+flight finish on the version they started with; nothing waits on a reload.
+"""
+import json
+import logging
+import math
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.prediction_service import (
+    LoadedModel,
+    PredictionService,
+    build_model,
+    prediction_service,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ModelValidationError(Exception):
+    """Raised when a candidate model fails golden-set validation"""
+
+    def __init__(self, message: str, report: Dict):
+        super().__init__(message)
+        self.report = report
+
+
+def load_golden_set(path: str) -> Tuple[List[Dict], float]:
+    """
+    Load the golden set used to validate candidate models
+
+    Returns:
+        (cases, min_agreement); each case has a "test" dict and "expected_risk_level"
+    """
+    with open(path) as f:
+        data = json.load(f)
+    return data["cases"], float(data.get("min_agreement", 1.0))
+
+
+def validate_model(candidate: LoadedModel, golden_set_path: Optional[str] = None) -> Dict:
+    """
+    Check a candidate model before it is activated
+
+    Every golden case must score to a finite probability in [0, 1], and the share
+    of cases whose risk level matches the expected level must reach the golden
+    set's min_agreement. Without a golden set only the probability checks run.
+
+    Returns:
+        Validation report (cases, agreement, min_agreement, mismatches)
+
+    Raises:
+        ModelValidationError: If the candidate fails any check
+    """
+    golden_set_path = golden_set_path or settings.MODEL_GOLDEN_SET_PATH
+    if os.path.exists(golden_set_path):
+        cases, min_agreement = load_golden_set(golden_set_path)
+    else:
+        logger.warning("Golden set %s not found; only checking probabilities are valid", golden_set_path)
+        cases, min_agreement = [], 0.0
+
+    tests = [case["test"] for case in cases] or [{}]
+    scores = candidate.scoring_engine.predict_proba(candidate.lookup_encoder.transform(tests))
+
+    report = {
+        "cases": len(cases),
+        "agreement": None,
+        "min_agreement": min_agreement,
+        "mismatches": [],
+    }
+    if len(scores) != len(tests) or not all(math.isfinite(score) and 0.0 <= score <= 1.0 for score in scores):
+        raise ModelValidationError("Candidate model produced invalid probabilities", report)
+
+    if cases:
+        for index, (case, score) in enumerate(zip(cases, scores)):
+            risk_level = PredictionService.get_risk_level(score)
+            if risk_level != case["expected_risk_level"]:
+                report["mismatches"].append(
+                    {"case": index, "expected": case["expected_risk_level"], "actual": risk_level}
+                )
+        report["agreement"] = 1.0 - len(report["mismatches"]) / len(cases)
+        if report["agreement"] < min_agreement:
+            raise ModelValidationError(
+                f"Candidate model agrees with {report['agreement']:.0%} of the golden set "
+                f"(minimum {min_agreement:.0%})",
+                report,
+            )
+
+    return report
+
+
+class ModelRegistry:
+    """
+    Hot-reloads new model versions into a PredictionService
+
+    Reloads are serialised by a lock; predictions never take it.
+    """
+
+    def __init__(
+        self,
+        service: PredictionService,
+        golden_set_path: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.service = service
+        self.golden_set_path = golden_set_path
+        self.poll_interval = poll_interval or settings.MODEL_WATCH_INTERVAL_SECONDS
+        self.last_reload: Optional[Dict] = None
+        self.history: List[Dict] = []
+        self._reload_lock = threading.Lock()
+        self._fingerprint = None
+        self._stop_event = threading.Event()
+        self._watch_thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _model_files_fingerprint():
+        """(path, mtime, size) of every model file, to notice when any of them change"""
+        fingerprint = []
+        for path in (settings.MODEL_ARTIFACT_PATH, settings.MODEL_PATH, settings.ENCODERS_PATH):
+            try:
+                stat = os.stat(path)
+                fingerprint.append((path, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                fingerprint.append((path, None, None))
+        return tuple(fingerprint)
+
+    def reload(self, force: bool = False) -> Dict:
+        """
+        Load the model on disk, validate it and activate it if it is a new version
+
+        Args:
+            force: Re-validate and re-activate even if the version is unchanged
+
+        Returns:
+            Reload report with status "activated" or "unchanged"
+
+        Raises:
+            ModelValidationError: If the candidate fails validation (the active model is kept)
+        """
+        with self._reload_lock:
+            self._fingerprint = self._model_files_fingerprint()
+            started_at = datetime.now(timezone.utc)
+            active = self.service.active_model
+            try:
+                candidate = build_model()
+                if not force and active is not None and candidate.model_version == active.model_version:
+                    result = {"status": "unchanged", "model_version": active.model_version}
+                else:
+                    validation = validate_model(candidate, self.golden_set_path)
+                    previous = self.service.activate(candidate)
+                    result = {
+                        "status": "activated",
+                        "model_version": candidate.model_version,
+                        "previous_version": previous.model_version if previous else None,
+                        "validation": validation,
+                    }
+                    self.history.append(
+                        {"model_version": candidate.model_version, "activated_at": candidate.loaded_at.isoformat()}
+                    )
+                    logger.info(
+                        "Activated model version %s (was %s)", candidate.model_version, result["previous_version"]
+                    )
+            except Exception as e:
+                self.last_reload = {
+                    "status": "failed",
+                    "detail": str(e),
+                    "started_at": started_at.isoformat(),
+                }
+                logger.error("Model reload failed, keeping version %s: %s", active.model_version if active else None, e)
+                raise
+
+            self.last_reload = dict(result, started_at=started_at.isoformat())
+            return result
+
+    def check_for_changes(self) -> bool:
+        """Reload if any model file changed since the last check; returns True if it did"""
+        if self._model_files_fingerprint() == self._fingerprint:
+            return False
+        try:
+            self.reload()
+        except Exception:
+            # Already logged; the next file change triggers another attempt
+            pass
+        return True
+
+    def start_watching(self):
+        """Poll the model files in a background thread and hot-reload on change"""
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            return
+        self._fingerprint = self._model_files_fingerprint()
+        self._stop_event.clear()
+
+        def watch():
+            while not self._stop_event.wait(self.poll_interval):
+                self.check_for_changes()
+
+        self._watch_thread = threading.Thread(target=watch, name="model-registry-watcher", daemon=True)
+        self._watch_thread.start()
+        logger.info("Watching model files every %ss", self.poll_interval)
+
+    def stop_watching(self):
+        """Stop the background watcher"""
+        self._stop_event.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join(timeout=5)
+            self._watch_thread = None
+
+    def status(self) -> Dict:
+        """Active version, last reload outcome and activation history"""
+        active = self.service.active_model
+        return {
+            "model_version": active.model_version if active else None,
+            "source": active.source if active else None,
+            "loaded_at": active.loaded_at.isoformat() if active else None,
+            "watching": self._watch_thread is not None and self._watch_thread.is_alive(),
+            "last_reload": self.last_reload,
+            "history": list(self.history),
+            "cache": self.service.cache.stats(),
+        }
+
+
+# Create singleton instance
+model_registry = ModelRegistry(prediction_service)
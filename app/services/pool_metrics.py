@@ -0,0 +1,140 @@
+"""
+Connection pool statistics, exposed at GET /metrics next to the latency histograms
+
+Engines created through app.database use the pool classes below, which time how
+long each checkout waits for a free connection. Pool events count connections
+opened, checked out, invalidated (e.g. stale after a failover and caught by
+pre-ping) and checkout timeouts; checked-out and overflow are read from the
+pool itself when the metrics are rendered.
+"""
+import threading
+import time
+from typing import Dict, List
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.services.metrics import Histogram, register
+
+DB_POOL_WAIT_SECONDS = Histogram(
+    "lumora_db_pool_wait_seconds",
+    "Time spent waiting for a database connection from the pool",
+    label="pool",
+)
+
+# Event counters, in the order they are rendered
+COUNTERS = {
+    "connects": "Database connections opened",
+    "checkouts": "Database connections checked out of the pool",
+    "invalidations": "Database connections invalidated, e.g. found stale by pre-ping",
+    "timeouts": "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS",
+}
+
+
+class _TimedCheckout:
+    """Pool mixin observing how long _do_get waits for a connection into DB_POOL_WAIT_SECONDS"""
+
+    metrics_name = "default"
+    monitor = None  # the PoolMonitor watching this pool, which counts timeouts
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.monitor is not None:
+                self.monitor.count(self.metrics_name, "timeouts")
+            raise
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(self.metrics_name, time.perf_counter() - start)
+
+    def recreate(self):
+        # engine.dispose() replaces the pool; keep reporting under the same name
+        pool = super().recreate()
+        pool.metrics_name, pool.monitor = self.metrics_name, self.monitor
+        return pool
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+class PoolMonitor:
+    """Event counters and live state of the pools of the engines it watches"""
+
+    def __init__(self):
+        self._pools: Dict[str, object] = {}  # name -> engine (its pool is replaced on dispose)
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def watch(self, name: str, engine):
+        """Count pool events of engine (sync or async) and report its pool as name"""
+        sync_engine = getattr(engine, "sync_engine", engine)
+        sync_engine.pool.metrics_name, sync_engine.pool.monitor = name, self
+        with self._lock:
+            self._pools[name] = sync_engine
+            self._counts.setdefault(name, dict.fromkeys(COUNTERS, 0))
+
+        # Listening on the engine also covers the pools it creates after dispose()
+        event.listen(sync_engine, "connect", lambda *args: self.count(name, "connects"))
+        event.listen(sync_engine, "checkout", lambda *args: self.count(name, "checkouts"))
+        event.listen(sync_engine, "invalidate", lambda *args: self.count(name, "invalidations"))
+        event.listen(sync_engine, "soft_invalidate", lambda *args: self.count(name, "invalidations"))
+
+    def count(self, name: str, counter: str):
+        with self._lock:
+            counts = self._counts.setdefault(name, dict.fromkeys(COUNTERS, 0))
+            counts[counter] += 1
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Per watched pool: its size, connections checked out, overflow in use and the event counts
+
+        Pools without a queue (e.g. the NullPool used for aiosqlite) report only the counts.
+        """
+        with self._lock:
+            pools = dict(self._pools)
+            counts = {name: dict(values) for name, values in self._counts.items()}
+        stats = {}
+        for name, engine in pools.items():
+            pool = engine.pool
+            item = {}
+            if isinstance(pool, QueuePool):
+                item.update(
+                    checked_out=pool.checkedout(),
+                    size=pool.size(),
+                    overflow=max(0, pool.overflow()),
+                    idle=pool.checkedin(),
+                )
+            item.update(counts.get(name, {}))
+            stats[name] = item
+        return stats
+
+    def render(self) -> List[str]:
+        """Prometheus text exposition lines for the gauges and counters"""
+        stats = self.stats()
+        lines = []
+        gauges = {
+            "checked_out": "Database connections currently checked out",
+            "overflow": "Connections open beyond DB_POOL_SIZE",
+            "size": "Connections the pool keeps open (DB_POOL_SIZE)",
+            "idle": "Connections open and waiting in the pool",
+        }
+        for gauge, documentation in gauges.items():
+            metric = f"lumora_db_pool_{gauge}"
+            lines += [f"# HELP {metric} {documentation}", f"# TYPE {metric} gauge"]
+            lines += [f'{metric}{{pool="{name}"}} {item[gauge]}' for name, item in sorted(stats.items()) if gauge in item]
+        for counter, documentation in COUNTERS.items():
+            metric = f"lumora_db_pool_{counter}_total"
+            lines += [f"# HELP {metric} {documentation}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{pool="{name}"}} {item[counter]}' for name, item in sorted(stats.items())]
+        return lines
+
+
+# Create singleton instance
+pool_monitor = PoolMonitor()
+register(pool_monitor)
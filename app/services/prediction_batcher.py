@@ -0,0 +1,137 @@
+"""
+Micro-batching in front of the prediction service
+
+Concurrent requests each used to run their own encode + predict_proba. The
+batcher queues them instead: a worker thread takes the first waiting request,
+gathers more for up to PREDICT_MICROBATCH_MAX_WAIT_MS or until
+PREDICT_MICROBATCH_MAX_SIZE are queued, scores them as one matrix and hands each
+caller its own result.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.prediction_executor import PredictionExecutor, prediction_executor
+from app.services.prediction_service import PredictionService, RiskPrediction, prediction_service
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionBatcher:
+    """
+    Coalesces concurrent predict calls into batched predict_depression_risk_batch calls
+
+    The worker thread starts on the first call. Cache hits are answered without
+    queueing. Batches are scored through executor when given (see
+    PREDICTION_EXECUTOR_MODE), else by the service in the worker thread. When
+    disabled, predict scores each call directly.
+    """
+
+    def __init__(
+        self,
+        service: PredictionService,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        executor: Optional[PredictionExecutor] = None,
+    ):
+        self.service = service
+        self.score_batch = executor.predict_batch if executor else service.predict_depression_risk_batch
+        self.max_batch_size = max_batch_size or settings.PREDICT_MICROBATCH_MAX_SIZE
+        self.max_wait = (settings.PREDICT_MICROBATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000
+        self.enabled = settings.PREDICT_MICROBATCH_ENABLED if enabled is None else enabled
+        self.batches = 0
+        self.requests = 0
+        self._queue: "queue.SimpleQueue[Optional[Tuple[Dict, Future]]]" = queue.SimpleQueue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    def predict(self, test_data: Dict) -> RiskPrediction:
+        """Predict depression risk for one test, scored together with concurrent callers"""
+        if not self.enabled:
+            return self.score_batch([test_data])[0]
+        cached = self.service.get_cached_prediction(test_data)
+        if cached is not None:
+            return cached
+        return self.submit(test_data).result()
+
+    def submit(self, test_data: Dict) -> "Future[RiskPrediction]":
+        """Queue one test for scoring and return a future for its RiskPrediction"""
+        self._ensure_worker()
+        future: "Future[RiskPrediction]" = Future()
+        self._queue.put((test_data, future))
+        return future
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="prediction-batcher", daemon=True)
+                self._worker.start()
+
+    def stop(self):
+        """Stop the worker thread once the requests already queued are scored"""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join(timeout=5)
+        self._worker = None
+
+    def _collect_batch(self, first: Tuple[Dict, Future]) -> Tuple[List[Tuple[Dict, Future]], bool]:
+        """Gather queued requests behind first; returns (batch, stop_requested)"""
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stop_requested = self._collect_batch(first)
+            self._score(batch)
+            if stop_requested:
+                return
+
+    def _score(self, batch: List[Tuple[Dict, Future]]):
+        # Skip callers that gave up waiting
+        batch = [(test_data, future) for test_data, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+        try:
+            predictions = self.score_batch([test_data for test_data, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # Score one by one so only the offending request sees the error
+            logger.warning("Batched prediction of %d tests failed; retrying individually", len(batch))
+            for test_data, future in batch:
+                try:
+                    future.set_result(self.score_batch([test_data])[0])
+                except Exception as e:
+                    future.set_exception(e)
+            return
+
+        for (_, future), prediction in zip(batch, predictions):
+            future.set_result(prediction)
+
+
+# Create singleton instance
+prediction_batcher = PredictionBatcher(prediction_service, executor=prediction_executor)
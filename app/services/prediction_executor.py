@@ -0,0 +1,167 @@
+"""
+Where prediction scoring runs
+
+settings.PREDICTION_EXECUTOR_MODE selects one of:
+- "inline": score in the calling thread (the default)
+- "thread": score in a dedicated thread pool
+- "process": score in a process pool whose children preload the model, so
+  encoding and scoring never hold the GIL of the worker serving requests
+
+The sync API blocks the caller until the scores are ready. The async API returns
+awaitables for async endpoints.
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.services.prediction_service import (
+    PredictionService,
+    RiskPrediction,
+    build_model,
+    prediction_service,
+)
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+
+def _init_process_worker():
+    """Preload the model when a child process starts"""
+    # The parent records drift and shadows every batch; children would only duplicate that work
+    prediction_service.drift_monitor = None
+    prediction_service.shadow_evaluator = None
+    prediction_service.ensure_loaded()
+
+
+def _warm_up_process_worker() -> Optional[str]:
+    return prediction_service.model_version
+
+
+def _predict_in_process(tests: List[Dict], model_version: Optional[str]) -> List[RiskPrediction]:
+    """Score tests in a child process, first catching up with the parent's model version"""
+    active = prediction_service.ensure_loaded()
+    if model_version is not None and active.model_version != model_version:
+        candidate = build_model()
+        if candidate.model_version == model_version:
+            prediction_service.activate(candidate)
+        else:
+            logger.warning(
+                "Process worker loaded model version %s, but the parent uses %s",
+                candidate.model_version,
+                model_version,
+            )
+    return prediction_service.predict_depression_risk_batch(tests)
+
+
+class PredictionExecutor:
+    """Runs predict_depression_risk_batch inline, in a thread pool or in a process pool"""
+
+    def __init__(self, service: PredictionService, mode: Optional[str] = None, max_workers: Optional[int] = None):
+        mode = mode or settings.PREDICTION_EXECUTOR_MODE
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown prediction executor mode {mode!r}; expected one of {EXECUTOR_MODES}")
+        self.service = service
+        self.mode = mode
+        self.max_workers = max_workers or settings.PREDICTION_EXECUTOR_WORKERS
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.mode == "inline":
+            return None
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = self._create_executor()
+        return self._executor
+
+    def _create_executor(self) -> Executor:
+        if self.mode == "thread":
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="prediction")
+        # spawn, not fork: forking a server process that already runs threads can deadlock the child
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_process_worker,
+        )
+
+    def start(self):
+        """Create the pool and, in process mode, start every child so the model is loaded before traffic"""
+        executor = self._get_executor()
+        if self.mode == "process":
+            futures = [executor.submit(_warm_up_process_worker) for _ in range(self.max_workers)]
+            for future in futures:
+                future.result()
+            logger.info("Started %d prediction processes", self.max_workers)
+
+    def start_background(self):
+        """Run start in a background thread (e.g. at app startup); failures are logged"""
+        if self.mode == "inline":
+            return
+
+        def start():
+            try:
+                self.start()
+            except Exception as e:
+                logger.error("Could not start prediction %s pool: %s", self.mode, e)
+
+        threading.Thread(target=start, name="prediction-executor-start", daemon=True).start()
+
+    def submit_batch(self, tests: List[Dict]) -> "Future[List[RiskPrediction]]":
+        """Schedule scoring of tests and return a future for their RiskPredictions"""
+        executor = self._get_executor()
+        if executor is None:
+            future: "Future[List[RiskPrediction]]" = Future()
+            try:
+                future.set_result(self.service.predict_depression_risk_batch(tests))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        if self.mode == "process":
+            future = executor.submit(_predict_in_process, tests, self.service.model_version)
+            future.add_done_callback(lambda done: self._observe_predictions(tests, done))
+            return future
+        return executor.submit(self.service.predict_depression_risk_batch, tests)
+
+    def _observe_predictions(self, tests: List[Dict], future: "Future[List[RiskPrediction]]"):
+        if future.cancelled() or future.exception() is not None:
+            return
+        try:
+            self.service.observe_predictions(tests, future.result())
+        except Exception as e:
+            logger.error("Could not record drift or shadow a process-scored batch: %s", e)
+
+    def predict_batch(self, tests: List[Dict]) -> List[RiskPrediction]:
+        """Score tests and block until the predictions are ready"""
+        if self.mode == "inline":
+            return self.service.predict_depression_risk_batch(tests)
+        return self.submit_batch(tests).result()
+
+    def predict(self, test_data: Dict) -> RiskPrediction:
+        return self.predict_batch([test_data])[0]
+
+    async def predict_batch_async(self, tests: List[Dict]) -> List[RiskPrediction]:
+        """Score tests without blocking the event loop (inline mode runs in the default thread pool)"""
+        if self.mode == "inline":
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.service.predict_depression_risk_batch, tests)
+        return await asyncio.wrap_future(self.submit_batch(tests))
+
+    async def predict_async(self, test_data: Dict) -> RiskPrediction:
+        return (await self.predict_batch_async([test_data]))[0]
+
+    def shutdown(self):
+        """Stop the pool, waiting for scoring already in progress"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+# Create singleton instance
+prediction_executor = PredictionExecutor(prediction_service)
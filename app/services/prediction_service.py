@@ -1,34 +1,581 @@
 """
 Service for depression risk prediction using ML model
 """
-import joblib
+import logging
 import numpy as np
-from typing import Dict, Tuple
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
 import os
 from app.config import settings
+from app.services.drift_monitor import DriftMonitor
+from app.services.metrics import PREDICTION_STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+# Map database column names to model feature names
+FEATURE_MAPPING = {
+    'mood': 'Mood',
+    'sleep_hour': 'SleepHour',
+    'appetite': 'Appetite',
+    'exercise': 'Exercise',
+    'screen_time': 'ScreenTime',
+    'academic_work': 'AcademicWork',
+    'socialize': 'Social',
+    'energy_level': 'Energy',
+    'trouble_concentrating': 'TroubleConcentration',
+    'negative_thoughts': 'NegativeThought',
+    'decision_making': 'DecisionMaking',
+    'bothered_things': 'BotherStatus',
+    'stressful_events': 'StressfulEvent',
+    'future_hope': 'FutureHope',
+    'sleepy_tired': 'SleepyTired'
+}
+
+# Feature order (must match training order)
+FEATURE_ORDER = [
+    'Mood', 'SleepHour', 'Appetite', 'Exercise', 'ScreenTime',
+    'AcademicWork', 'Social', 'Energy', 'TroubleConcentration',
+    'NegativeThought', 'DecisionMaking', 'BotherStatus',
+    'StressfulEvent','SleepyTired', 'FutureHope'
+]
+
+# Allowed values of numeric features, which have no encoder vocabulary (Energy is a 1-5 rating)
+NUMERIC_FEATURE_VALUES = {
+    'Energy': [1, 2, 3, 4, 5],
+}
+
+
+class LookupTableEncoder:
+    """
+    Fitted label encoders compiled into plain lookup tables
+    
+    Each LabelEncoder becomes an {answer: code} dict at load time, so encoding a
+    batch of N tests is one dict lookup per answer plus a few array operations,
+    instead of one sklearn transform call per feature per test.
+    """
+    
+    def __init__(self, vocabularies: Dict[str, List[str]]):
+        """
+        Args:
+            vocabularies: Sorted answer labels per model feature (LabelEncoder.classes_)
+        """
+        self.vocabularies = vocabularies
+        self.tables = {
+            feature: {label: code for code, label in enumerate(labels)}
+            for feature, labels in vocabularies.items()
+        }
+        db_fields = {model_feature: db_field for db_field, model_feature in FEATURE_MAPPING.items()}
+        # (column, db field, lookup table) in model feature order; None table = numeric feature
+        self.columns = [
+            (column, db_fields.get(feature), self.tables.get(feature))
+            for column, feature in enumerate(FEATURE_ORDER)
+        ]
+        # (column, db field, answer, encoded value) for every allowed answer of every feature
+        self.answer_options = [
+            (column, db_field, answer, float(code))
+            for column, db_field, table in self.columns
+            if db_field is not None
+            for answer, code in (
+                table.items() if table is not None
+                else ((value, value) for value in NUMERIC_FEATURE_VALUES.get(FEATURE_ORDER[column], []))
+            )
+        ]
+    
+    def transform(self, tests: List[Dict]) -> np.ndarray:
+        """
+        Encode depression tests into an (N, n_features) matrix
+        
+        Unknown or missing categorical answers and missing numeric answers are
+        encoded as 0, matching the original per-feature LabelEncoder path.
+        """
+        X = np.zeros((len(tests), len(FEATURE_ORDER)))
+        
+        for column, db_field, table in self.columns:
+            if db_field is None:
+                continue
+            values = [test_data.get(db_field) for test_data in tests]
+            
+            if table is None:
+                # For numeric features (Energy)
+                X[:, column] = [0 if value is None else value for value in values]
+                continue
+            
+            codes = np.fromiter(
+                (0 if value is None else table.get(str(value), -1) for value in values),
+                dtype=np.int64,
+                count=len(values),
+            )
+            unknown = codes < 0
+            if unknown.any():
+                logger.warning(
+                    "Could not encode %s for %d test(s), using default=0: %s",
+                    FEATURE_ORDER[column],
+                    int(unknown.sum()),
+                    sorted({str(value) for value, bad in zip(values, unknown) if bad}),
+                )
+                codes[unknown] = 0
+            X[:, column] = codes
+        
+        return X
+    
+    def normalize(self, test_data: Dict) -> Tuple:
+        """
+        The answers of one test as a hashable tuple in model feature order
+        
+        Categorical answers are compared as strings, like in transform, so two
+        tests with the same tuple always encode to the same row.
+        """
+        return tuple(
+            None if value is None else (value if table is None else str(value))
+            for value, table in (
+                (test_data.get(db_field) if db_field else None, table)
+                for _, db_field, table in self.columns
+            )
+        )
+    
+    @classmethod
+    def from_label_encoders(cls, encoders: Dict) -> "LookupTableEncoder":
+        """Build lookup tables from a dict of fitted sklearn LabelEncoders"""
+        return cls({
+            feature: [str(label) for label in encoder.classes_]
+            for feature, encoder in encoders.items()
+        })
+
+
+class LogisticScoringEngine:
+    """
+    Closed-form scorer for a fitted logistic regression
+    
+    The coefficients and intercept are pulled out of the model at load time, with
+    any StandardScaler steps folded into them, so scoring a single row or an
+    (N, n_features) matrix is one dot product plus a sigmoid in pure NumPy.
+    Models that are not a binary logistic regression fall back to sklearn's
+    predict_proba.
+    """
+    
+    def __init__(self, model=None, coef: Optional[np.ndarray] = None, intercept: Optional[float] = None):
+        """
+        Args:
+            model: Fitted sklearn model, or None when coef/intercept are given directly
+            coef: Raw-feature coefficients (e.g. from a compact model artifact)
+            intercept: Raw-feature intercept
+        """
+        self.model = model
+        self.coef = None if coef is None else np.asarray(coef, dtype=float)
+        self.intercept = intercept
+        
+        if self.coef is None:
+            linear_terms = self._extract_linear_terms(model)
+            if linear_terms is not None:
+                self.coef, self.intercept = linear_terms
+            else:
+                logger.info("Model %s is not a binary logistic regression, using predict_proba", type(model).__name__)
+    
+    @property
+    def is_closed_form(self) -> bool:
+        return self.coef is not None
+    
+    @staticmethod
+    def _extract_linear_terms(model):
+        """Return (coef, intercept) for a scaler + logistic regression pipeline, else None"""
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+        
+        steps = [step for _, step in model.steps] if isinstance(model, Pipeline) else [model]
+        classifier = steps[-1]
+        if not isinstance(classifier, LogisticRegression) or len(classifier.classes_) != 2:
+            return None
+        
+        coef = np.asarray(classifier.coef_, dtype=float).ravel()
+        intercept = float(np.asarray(classifier.intercept_, dtype=float)[0])
+        
+        # Binary multinomial models take a softmax over [-z, z], i.e. sigmoid(2z)
+        if getattr(classifier, "multi_class", None) == "multinomial":
+            coef, intercept = 2 * coef, 2 * intercept
+        
+        # Fold scalers into the linear terms, last step first: w.((x - mean) / scale) + b
+        for step in reversed(steps[:-1]):
+            if step is None or step == "passthrough":
+                continue
+            if not isinstance(step, StandardScaler):
+                return None
+            if step.with_std:
+                coef = coef / step.scale_
+            if step.with_mean:
+                intercept -= float(coef @ step.mean_)
+        
+        return coef, intercept
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Probability of the positive class for each row of X
+        
+        Args:
+            X: Encoded (N, n_features) matrix
+            
+        Returns:
+            Array of N probabilities between 0.0 and 1.0
+        """
+        if not self.is_closed_form:
+            return self.model.predict_proba(X)[:, 1]
+        
+        z = X @ self.coef + self.intercept
+        # Numerically stable sigmoid: 1 / (1 + exp(-z))
+        return np.exp(-np.logaddexp(0.0, -z))
+
+
+class RiskExplainer:
+    """
+    Per-answer contributions to the log-odds of a linear model
+    
+    The log-odds are intercept + sum(coef * encoded answer), so each answer
+    contributes coef * code. These products are precomputed into one
+    {answer: contribution} table per categorical feature at load time, so
+    explaining a test is one dict lookup per answer and needs no encoding.
+    The contributions plus the baseline (intercept) add up to the log-odds.
+    """
+    
+    def __init__(self, lookup_encoder: LookupTableEncoder, coef: np.ndarray, intercept: float):
+        self.baseline = float(intercept)
+        # (db field, coefficient, {answer: contribution}); None table = numeric feature
+        self.columns = [
+            (
+                db_field,
+                float(coef[column]),
+                None if table is None else {label: float(coef[column] * code) for label, code in table.items()},
+            )
+            for column, db_field, table in lookup_encoder.columns
+            if db_field is not None
+        ]
+    
+    def explain(self, test_data: Dict) -> Dict:
+        """
+        Explain one test's score
+        
+        Returns:
+            Dict with baseline, log_odds and contributions: one
+            {feature, answer, contribution} per answer, largest effect first.
+            Missing and unknown answers encode as 0 and contribute nothing.
+        """
+        contributions = []
+        for db_field, coefficient, table in self.columns:
+            answer = test_data.get(db_field)
+            if answer is None:
+                contribution = 0.0
+            elif table is None:
+                contribution = coefficient * float(answer)
+            else:
+                contribution = table.get(str(answer), 0.0)
+            contributions.append({"feature": db_field, "answer": answer, "contribution": contribution})
+        
+        contributions.sort(key=lambda item: abs(item["contribution"]), reverse=True)
+        return {
+            "baseline": self.baseline,
+            "log_odds": self.baseline + sum(item["contribution"] for item in contributions),
+            "contributions": contributions,
+        }
+    
+    @classmethod
+    def for_model(cls, lookup_encoder: LookupTableEncoder, scoring_engine: "LogisticScoringEngine") -> Optional["RiskExplainer"]:
+        """Explainer for a closed-form model; None when the model is not linear"""
+        if not scoring_engine.is_closed_form:
+            return None
+        return cls(lookup_encoder, scoring_engine.coef, scoring_engine.intercept)
+
+
+class RiskPrediction(NamedTuple):
+    """A risk prediction and the model version that produced it"""
+    risk_score: float
+    risk_level: str
+    model_version: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """
+    One fully loaded model version
+    
+    Instances are never mutated: a new version is built off to the side and swapped
+    in by PredictionService.activate, so a prediction that took a snapshot keeps
+    scoring with one consistent encoder/engine pair.
+    """
+    model_version: str
+    source: str
+    lookup_encoder: LookupTableEncoder
+    scoring_engine: LogisticScoringEngine
+    explainer: Optional[RiskExplainer] = None  # None for non-linear models
+    model: object = None  # sklearn model, only when loaded from the pickles
+    encoders: Optional[Dict] = None  # LabelEncoders, only when loaded from the pickles
+    loaded_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of risk scores
+    
+    Keys are (model_version, normalized answers), so a cached score is never
+    served for a different model version.
+    """
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple, float]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_many(self, keys: List[Tuple], count_misses: bool = True) -> List[Optional[float]]:
+        """Look up many keys under one lock; None for every miss"""
+        scores = []
+        with self._lock:
+            for key in keys:
+                score = self._entries.get(key)
+                if score is None:
+                    self.misses += count_misses
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                scores.append(score)
+        return scores
+    
+    def put_many(self, items: List[Tuple[Tuple, float]]):
+        """Store many scores, evicting the least recently used entries beyond max_size"""
+        with self._lock:
+            for key, score in items:
+                self._entries[key] = score
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        """Size and hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def resolve_model_source() -> Tuple[str, Tuple[str, ...]]:
+    """
+    Pick the files the model should be loaded from
+    
+    The compact artifact (settings.MODEL_ARTIFACT_PATH) is preferred because it
+    loads without importing scikit-learn. The pickles (settings.MODEL_PATH and
+    settings.ENCODERS_PATH) are used when the artifact is missing or was
+    exported from different pickles.
+    
+    Returns:
+        ("artifact", (artifact_path,)) or ("pickles", (model_path, encoders_path))
+    """
+    from app.services.model_artifact import compute_model_version, load_model_artifact
+    
+    pickles = (settings.MODEL_PATH, settings.ENCODERS_PATH)
+    pickles_exist = all(os.path.exists(path) for path in pickles)
+    
+    if os.path.exists(settings.MODEL_ARTIFACT_PATH):
+        artifact = load_model_artifact(settings.MODEL_ARTIFACT_PATH)
+        pickles_version = compute_model_version(*pickles) if pickles_exist else None
+        if pickles_version in (None, artifact.model_version):
+            return "artifact", (settings.MODEL_ARTIFACT_PATH,)
+        logger.warning(
+            "Model artifact %s (version %s) is stale for pickles version %s; "
+            "loading the pickles. Re-run python -m app.tools.export_model",
+            settings.MODEL_ARTIFACT_PATH,
+            artifact.model_version,
+            pickles_version,
+        )
+        return "pickles", pickles
+    if pickles_exist:
+        return "pickles", pickles
+    raise FileNotFoundError(
+        f"No model found: expected {settings.MODEL_ARTIFACT_PATH} or "
+        f"{settings.MODEL_PATH} and {settings.ENCODERS_PATH}"
+    )
+
+
+def build_compact_model(artifact_path: str) -> LoadedModel:
+    """Load a model version from a compact artifact without importing scikit-learn"""
+    from app.services.model_artifact import load_model_artifact
+    
+    artifact = load_model_artifact(artifact_path)
+    lookup_encoder = LookupTableEncoder(artifact.vocabularies)
+    scoring_engine = LogisticScoringEngine(coef=artifact.coef, intercept=artifact.intercept)
+    return LoadedModel(
+        model_version=artifact.model_version,
+        source=artifact_path,
+        lookup_encoder=lookup_encoder,
+        scoring_engine=scoring_engine,
+        explainer=RiskExplainer.for_model(lookup_encoder, scoring_engine),
+    )
+
+
+def build_sklearn_model(model_path: str, encoders_path: str) -> LoadedModel:
+    """Load a model version from the pickled sklearn model and label encoders"""
+    import joblib
+    from app.services.model_artifact import compute_model_version
+    
+    model = joblib.load(model_path)
+    encoders = joblib.load(encoders_path)
+    lookup_encoder = LookupTableEncoder.from_label_encoders(encoders)
+    scoring_engine = LogisticScoringEngine(model)
+    return LoadedModel(
+        model_version=compute_model_version(model_path, encoders_path),
+        source=model_path,
+        lookup_encoder=lookup_encoder,
+        scoring_engine=scoring_engine,
+        explainer=RiskExplainer.for_model(lookup_encoder, scoring_engine),
+        model=model,
+        encoders=encoders,
+    )
+
+
+def build_model() -> LoadedModel:
+    """Load the model version currently on disk (see resolve_model_source)"""
+    kind, paths = resolve_model_source()
+    if kind == "artifact":
+        return build_compact_model(*paths)
+    return build_sklearn_model(*paths)
 
 
 class PredictionService:
-    """Service for predicting depression risk from test data"""
+    """
+    Service for predicting depression risk from test data
+    
+    Models are loaded lazily on first use (or by start_background_warmup), guarded
+    by a lock so concurrent first requests load them only once. The loaded model is
+    held as one immutable LoadedModel; activate swaps in a new version by reference,
+    so in-flight predictions finish on the version they started with.
+    
+    Repeat answer combinations are served from an LRU cache of
+    settings.PREDICTION_CACHE_SIZE entries (0 disables it), which is emptied
+    whenever a new model version is activated.
+    
+    With a drift_monitor, the answers and score of every scored test are also
+    recorded there. A shadow_evaluator (see app.services.shadow_evaluator), once
+    attached, is handed every scored batch to re-score with a candidate model.
+    """
+    
+    def __init__(self, cache_size: Optional[int] = None, drift_monitor: Optional[DriftMonitor] = None):
+        self.cache = PredictionCache(settings.PREDICTION_CACHE_SIZE if cache_size is None else cache_size)
+        self.drift_monitor = drift_monitor
+        self.shadow_evaluator = None
+        self.load_error: Optional[str] = None
+        self._active: Optional[LoadedModel] = None
+        self._load_lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
     
-    def __init__(self):
-        self.model = None
-        self.encoders = None
-        self.load_models()
+    @property
+    def is_ready(self) -> bool:
+        """True once the model and encoders are loaded and predictions can be served"""
+        return self._active is not None
+    
+    @property
+    def active_model(self) -> Optional[LoadedModel]:
+        """The active model version, or None before the first load"""
+        return self._active
+    
+    @property
+    def model(self):
+        return self._active.model if self._active else None
+    
+    @property
+    def encoders(self) -> Optional[Dict]:
+        return self._active.encoders if self._active else None
+    
+    @property
+    def lookup_encoder(self) -> Optional[LookupTableEncoder]:
+        return self._active.lookup_encoder if self._active else None
+    
+    @property
+    def scoring_engine(self) -> Optional[LogisticScoringEngine]:
+        return self._active.scoring_engine if self._active else None
+    
+    @property
+    def model_version(self) -> Optional[str]:
+        return self._active.model_version if self._active else None
+    
+    def ensure_loaded(self) -> LoadedModel:
+        """Load the model and encoders on first use; later calls return immediately"""
+        active = self._active
+        if active is not None:
+            return active
+        with self._load_lock:
+            if self._active is None:
+                self.load_models()
+            return self._active
+    
+    def activate(self, loaded_model: LoadedModel) -> Optional[LoadedModel]:
+        """
+        Make loaded_model the active version
+        
+        The swap is a single reference assignment, so it never blocks predictions.
+        
+        Returns:
+            The previously active version, or None
+        """
+        previous, self._active = self._active, loaded_model
+        self.load_error = None
+        if previous is not None and previous.model_version != loaded_model.model_version:
+            # Old-version entries can never be hit again; free them
+            self.cache.clear()
+        return previous
+    
+    def start_background_warmup(self):
+        """Load the model and encoders in a background thread (e.g. at app startup)"""
+        if self.is_ready or (self._warmup_thread is not None and self._warmup_thread.is_alive()):
+            return
+        
+        def warm_up():
+            try:
+                self.ensure_loaded()
+            except Exception:
+                # Already logged by load_models; requests retry the load on first use
+                pass
+        
+        self._warmup_thread = threading.Thread(target=warm_up, name="prediction-model-warmup", daemon=True)
+        self._warmup_thread.start()
     
     def load_models(self):
-        """Load the trained model and label encoders"""
+        """Load the trained model and label encoders (see resolve_model_source)"""
         try:
-            model_path = os.path.join(os.getcwd(), "saved_models", "logistic_model.pkl")
-            encoders_path = os.path.join(os.getcwd(), "saved_models", "label_encoders.pkl")
+            with PREDICTION_STAGE_SECONDS.time("load_model"):
+                kind, paths = resolve_model_source()
+                if kind == "artifact":
+                    self.load_compact_model(*paths)
+                else:
+                    self.load_sklearn_models(*paths)
             
-            self.model = joblib.load(model_path)
-            self.encoders = joblib.load(encoders_path)
-            print(f"✓ Model and encoders loaded successfully")
+            logger.info("Model and encoders loaded successfully (version %s)", self.model_version)
         except Exception as e:
-            print(f"Error loading model: {e}")
+            self.load_error = str(e)
+            logger.error("Error loading model: %s", e)
             raise
     
+    def load_compact_model(self, artifact_path: str):
+        """Load the model from a compact artifact without importing scikit-learn"""
+        self.activate(build_compact_model(artifact_path))
+    
+    def load_sklearn_models(self, model_path: Optional[str] = None, encoders_path: Optional[str] = None):
+        """Load the pickled sklearn model and label encoders"""
+        self.activate(build_sklearn_model(model_path or settings.MODEL_PATH, encoders_path or settings.ENCODERS_PATH))
+    
     def preprocess_depression_test(self, test_data: Dict) -> np.ndarray:
         """
         Preprocess depression test data for model prediction
@@ -39,92 +586,217 @@ class PredictionService:
         Returns:
             Preprocessed numpy array ready for prediction
         """
-        # Map database column names to model feature names
-        feature_mapping = {
-            'mood': 'Mood',
-            'sleep_hour': 'SleepHour',
-            'appetite': 'Appetite',
-            'exercise': 'Exercise',
-            'screen_time': 'ScreenTime',
-            'academic_work': 'AcademicWork',
-            'socialize': 'Social',
-            'energy_level': 'Energy',
-            'trouble_concentrating': 'TroubleConcentration',
-            'negative_thoughts': 'NegativeThought',
-            'decision_making': 'DecisionMaking',
-            'bothered_things': 'BotherStatus',
-            'stressful_events': 'StressfulEvent',
-            'future_hope': 'FutureHope',
-            'sleepy_tired': 'SleepyTired'
+        return self.ensure_loaded().lookup_encoder.transform([test_data])
+    
+    def preprocess_depression_tests(self, tests: List[Dict]) -> np.ndarray:
+        """
+        Preprocess many depression tests for model prediction in one pass
+        
+        Args:
+            tests: List of dictionaries containing depression test responses
             
-        }
+        Returns:
+            Preprocessed (N, n_features) numpy array ready for prediction
+        """
+        return self.ensure_loaded().lookup_encoder.transform(tests)
+    
+    def predict_depression_risk(self, test_data: Dict) -> RiskPrediction:
+        """
+        Predict depression risk from test data
         
-        # Create processed data dict
-        processed_data = {}
+        Args:
+            test_data: Dictionary containing depression test responses
+            
+        Returns:
+            RiskPrediction of (risk_score, risk_level, model_version)
+            - risk_score: Probability between 0.0 and 1.0
+            - risk_level: "Low", "Medium", or "High"
+            - model_version: Version of the model that made the prediction
+        """
+        return self.predict_depression_risk_batch([test_data])[0]
+    
+    def predict_depression_risk_batch(self, tests: List[Dict]) -> List[RiskPrediction]:
+        """
+        Predict depression risk for many tests with a single model call
         
-        for db_field, model_feature in feature_mapping.items():
-            value = test_data.get(db_field)
+        Args:
+            tests: List of dictionaries containing depression test responses
             
-            # Encode categorical features
-            if model_feature in self.encoders and value is not None:
-                try:
-                    encoded_value = self.encoders[model_feature].transform([str(value)])[0]
-                    processed_data[model_feature] = encoded_value
-                except Exception as e:
-                    print(f"Warning: Could not encode {model_feature}={value}: {e}")
-                    processed_data[model_feature] = 0  # Default value
-            else:
-                # For numeric features (Energy)
-                print(f"Processing feature {model_feature} with value {value}")
-                processed_data[model_feature] = value if value is not None else 0
-        
-        # Check if model expects additional features not in database
-        # and set defaults for them
-        for feature_name in self.encoders.keys():
-            if feature_name not in processed_data:
-                print(f"Warning: Feature {feature_name} not found in test data, using default=0")
-                processed_data[feature_name] = 0
-        
-        # Define feature order (must match training order)
-        # Get feature order from encoders or use the standard order
-        feature_order = [
-            'Mood', 'SleepHour', 'Appetite', 'Exercise', 'ScreenTime',
-            'AcademicWork', 'Social', 'Energy', 'TroubleConcentration',
-            'NegativeThought', 'DecisionMaking', 'BotherStatus',
-            'StressfulEvent','SleepyTired', 'FutureHope'
+        Returns:
+            List of RiskPrediction in the same order as tests
+        """
+        if not tests:
+            return []
+        
+        # Take one snapshot so a concurrent model swap cannot mix versions
+        active = self.ensure_loaded()
+        
+        answers = None
+        if self.cache.max_size > 0:
+            risk_scores, answers = self._predict_cached(active, tests)
+        else:
+            risk_scores = self._predict_uncached(active, tests)
+        
+        self._observe(active, tests, risk_scores, answers)
+        
+        return [
+            RiskPrediction(float(score), self.get_risk_level(score), active.model_version)
+            for score in risk_scores
         ]
+    
+    def explain_depression_risk(self, test_data: Dict, model_version: Optional[str] = None) -> Optional[Dict]:
+        """
+        Explain a test's risk score as per-answer log-odds contributions
         
-        # Create ordered feature array
-        ordered_values = [processed_data.get(feat, 0) for feat in feature_order]
+        Args:
+            test_data: Dictionary containing depression test responses
+            model_version: Version that produced the score being explained; no
+                explanation is given if another version is active by now
         
-        return np.array([ordered_values])
+        Returns:
+            See RiskExplainer.explain, or None when the model is not linear
+        """
+        active = self.ensure_loaded()
+        if active.explainer is None or (model_version is not None and model_version != active.model_version):
+            return None
+        return active.explainer.explain(test_data)
     
-    def predict_depression_risk(self, test_data: Dict) -> Tuple[float, str]:
+    def what_if(self, test_data: Dict) -> Dict:
         """
-        Predict depression risk from test data
+        Score every single-answer change to a test in one vectorized call
+        
+        Each alternative copies the test's encoded row with one answer moved to
+        another allowed value; the original row and all alternatives are scored
+        as one matrix.
         
         Args:
             test_data: Dictionary containing depression test responses
             
         Returns:
-            Tuple of (risk_score, risk_level)
-            - risk_score: Probability between 0.0 and 1.0
-            - risk_level: "Low", "Medium", or "High"
+            Dict with model_version, the test's risk_score and risk_level, and
+            alternatives: {feature, current_answer, answer, risk_score,
+            risk_level, change} for every other allowed answer, biggest risk
+            reduction first
         """
-        # Preprocess the input
-        X_processed = self.preprocess_depression_test(test_data)
-        # Make prediction (probability of positive class)
-        risk_score = float(self.model.predict_proba(X_processed)[:, 1][0])
+        active = self.ensure_loaded()
+        encoder = active.lookup_encoder
+        X_base = encoder.transform([test_data])
+        current_answers = encoder.normalize(test_data)
+        
+        options = [
+            (column, db_field, answer, code)
+            for column, db_field, answer, code in encoder.answer_options
+            if answer != current_answers[column]
+        ]
+        X = np.repeat(X_base, len(options) + 1, axis=0)
+        rows = np.arange(1, len(options) + 1)
+        X[rows, [column for column, _, _, _ in options]] = [code for _, _, _, code in options]
+        
+        with PREDICTION_STAGE_SECONDS.time("what_if_score"):
+            risk_scores = active.scoring_engine.predict_proba(X)
+        base_score = float(risk_scores[0])
         
-        # Determine risk level based on score
+        alternatives = [
+            {
+                "feature": db_field,
+                "current_answer": test_data.get(db_field),
+                "answer": answer,
+                "risk_score": float(score),
+                "risk_level": self.get_risk_level(score),
+                "change": float(score) - base_score,
+            }
+            for (_, db_field, answer, _), score in zip(options, risk_scores[1:])
+        ]
+        alternatives.sort(key=lambda item: item["change"])
+        return {
+            "model_version": active.model_version,
+            "risk_score": base_score,
+            "risk_level": self.get_risk_level(base_score),
+            "alternatives": alternatives,
+        }
+    
+    def observe_predictions(self, tests: List[Dict], predictions: List[RiskPrediction]):
+        """Record tests scored elsewhere (e.g. by a process worker) in the drift monitor"""
+        active = self._active
+        if active is None or not tests:
+            return
+        self._observe(active, tests, [prediction.risk_score for prediction in predictions])
+    
+    def get_cached_prediction(self, test_data: Dict) -> Optional[RiskPrediction]:
+        """
+        The cached prediction for test_data under the active model, or None
+        
+        Never loads or scores anything; a miss here is counted when the test is scored.
+        A hit is recorded in the drift monitor and shadowed like a scored test.
+        """
+        active = self._active
+        if active is None or self.cache.max_size <= 0:
+            return None
+        key = (active.model_version, active.lookup_encoder.normalize(test_data))
+        score = self.cache.get_many([key], count_misses=False)[0]
+        if score is None:
+            return None
+        self._observe(active, [test_data], [score], [key[1]])
+        return RiskPrediction(score, self.get_risk_level(score), active.model_version)
+    
+    def _observe(
+        self,
+        active: LoadedModel,
+        tests: List[Dict],
+        risk_scores,
+        answers: Optional[List[Tuple]] = None,
+    ):
+        """Hand scored tests to the drift monitor and the shadow evaluator"""
+        if self.drift_monitor is not None:
+            with PREDICTION_STAGE_SECONDS.time("drift"):
+                if answers is None:
+                    answers = [active.lookup_encoder.normalize(test_data) for test_data in tests]
+                self.drift_monitor.observe(answers, risk_scores)
+        if self.shadow_evaluator is not None:
+            with PREDICTION_STAGE_SECONDS.time("shadow_submit"):
+                self.shadow_evaluator.submit(tests, risk_scores, active.model_version)
+    
+    @staticmethod
+    def _predict_uncached(active: LoadedModel, tests: List[Dict]) -> np.ndarray:
+        # Encode every test into one (N, n_features) matrix
+        with PREDICTION_STAGE_SECONDS.time("encode"):
+            X_processed = active.lookup_encoder.transform(tests)
+        with PREDICTION_STAGE_SECONDS.time("score"):
+            return active.scoring_engine.predict_proba(X_processed)
+    
+    def _predict_cached(self, active: LoadedModel, tests: List[Dict]) -> Tuple[List[float], List[Tuple]]:
+        """Serve cached scores and score only the misses, in one model call; also returns the normalized answers"""
+        with PREDICTION_STAGE_SECONDS.time("cache_lookup"):
+            answers = [active.lookup_encoder.normalize(test_data) for test_data in tests]
+            keys = [(active.model_version, test_answers) for test_answers in answers]
+            risk_scores = self.cache.get_many(keys)
+        
+        missing = [index for index, score in enumerate(risk_scores) if score is None]
+        if missing:
+            new_scores = self._predict_uncached(active, [tests[index] for index in missing])
+            for index, score in zip(missing, new_scores):
+                risk_scores[index] = float(score)
+            self.cache.put_many([(keys[index], risk_scores[index]) for index in missing])
+        
+        return risk_scores, answers
+    
+    @staticmethod
+    def get_risk_level(risk_score: float) -> str:
+        """Map a risk score (0.0 to 1.0) to its risk level: Low, Medium or High"""
         if risk_score <= 0.3:
-            risk_level = "Low"
+            return "Low"
         elif risk_score <= 0.65:
-            risk_level = "Medium"
-        else:
-            risk_level = "High"
-        
-        return risk_score, risk_level
+            return "Medium"
+        return "High"
 
-# Create singleton instance
-prediction_service = PredictionService()
+# Create singleton instance (models load on first use)
+prediction_service = PredictionService(
+    drift_monitor=DriftMonitor(
+        [{model_feature: db_field for db_field, model_feature in FEATURE_MAPPING.items()}[feature] for feature in FEATURE_ORDER],
+        state_path=settings.DRIFT_STATE_PATH,
+        reference_path=settings.DRIFT_REFERENCE_PATH,
+        persist_interval=settings.DRIFT_PERSIST_INTERVAL_SECONDS,
+    )
+    if settings.DRIFT_MONITOR_ENABLED
+    else None
+)
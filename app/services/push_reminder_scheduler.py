@@ -11,6 +11,7 @@ from app.crud.depression_test import has_user_submitted_test_on_date
 from app.database import SessionLocal
 from app.models.user import User
 from app.services.push_notification_service import PushSendResult, send_push_notification
+from app.services.user_cache import user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +43,7 @@ def run_daily_depression_test_push_job() -> None:
         }
 
         users = db.query(User).all()
+        updated_user_ids = []
 
         for user in users:
             if not user.is_push_reminder_enabled:
@@ -80,10 +82,12 @@ def run_daily_depression_test_push_job() -> None:
 
             if result == PushSendResult.SENT:
                 user.last_push_reminder_date = today_local
+                updated_user_ids.append(user.id)
                 counters["sent"] += 1
                 logger.info("push_reminder user_id=%s status=sent", user.id)
             elif result == PushSendResult.INVALID_TOKEN:
                 user.fcm_token = None
+                updated_user_ids.append(user.id)
                 counters["invalid_token"] += 1
                 logger.info("push_reminder user_id=%s status=invalid_token", user.id)
             else:
@@ -91,6 +95,8 @@ def run_daily_depression_test_push_job() -> None:
                 logger.info("push_reminder user_id=%s status=failed_send", user.id)
 
         db.commit()
+        for user_id in updated_user_ids:
+            user_cache.invalidate(user_id)
         logger.info(
             "push_reminder_summary date=%s sent=%s skipped_completed_today=%s skipped_no_token=%s "
             "skipped_push_disabled=%s skipped_already_sent_today=%s invalid_token=%s failed_send=%s",
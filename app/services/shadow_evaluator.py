@@ -0,0 +1,275 @@
+"""
+Shadow evaluation of a candidate model on live traffic
+
+Tests scored by the primary model are queued, with the primary scores, for a
+worker thread that scores them again with the candidate model. Users only ever
+see the primary result; the candidate's scores are appended to a JSON-lines log
+and summarized in an agreement report (score deltas and risk level flips).
+
+Queueing is a non-blocking put, so shadowing adds no latency to the request.
+When the worker falls behind and the queue is full, tests are dropped (and
+counted) rather than making requests wait.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.config import settings
+from app.services.prediction_service import LoadedModel, PredictionService, build_compact_model
+
+logger = logging.getLogger(__name__)
+
+RISK_LEVELS = ("Low", "Medium", "High")
+# Upper bounds of the |candidate - primary| score delta buckets
+DELTA_BUCKETS = (0.01, 0.05, 0.1, 0.25, 1.0)
+
+_STOP = object()
+
+
+class ShadowEvaluator:
+    """
+    Scores primary-model traffic with a candidate model in a background thread
+
+    PredictionService calls submit for every scored batch once the evaluator is
+    attached as its shadow_evaluator.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: Optional[int] = None,
+        max_batch_size: int = 256,
+        max_wait_ms: float = 50.0,
+        log_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            max_queue_size: Primary batches waiting for the worker before new ones are dropped
+            max_batch_size: Tests scored by the candidate per model call
+            max_wait_ms: How long the worker collects tests before scoring them; waking
+                up less often leaves the GIL to request threads
+            log_path: JSON-lines file each comparison is appended to (None: no log)
+        """
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.log_path = log_path
+        self.candidate: Optional[LoadedModel] = None
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size or settings.SHADOW_QUEUE_SIZE)
+        self._lock = threading.Lock()  # guards the report counters
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._reset_report()
+
+    def _reset_report(self):
+        with self._lock:
+            self.compared = 0
+            self.dropped = 0
+            self.errors = 0
+            self.primary_versions: Dict[str, int] = {}
+            self._delta_sum = 0.0
+            self._abs_delta_sum = 0.0
+            self._max_abs_delta = 0.0
+            self._delta_buckets = np.zeros(len(DELTA_BUCKETS), dtype=np.int64)
+            # [primary level, candidate level] -> count
+            self._levels = np.zeros((len(RISK_LEVELS), len(RISK_LEVELS)), dtype=np.int64)
+            self.started_at = datetime.now(timezone.utc)
+
+    def set_candidate(self, candidate: LoadedModel):
+        """Shadow with candidate from now on, starting a fresh report"""
+        self.candidate = candidate
+        self._reset_report()
+        logger.info("Shadow evaluating candidate model version %s", candidate.model_version)
+
+    def load_candidate(self, artifact_path: str) -> LoadedModel:
+        """Load a compact model artifact (see app.tools.export_model) as the candidate"""
+        candidate = build_compact_model(artifact_path)
+        self.set_candidate(candidate)
+        return candidate
+
+    def attach(self, service: PredictionService):
+        """Start the worker and shadow every batch the service scores"""
+        self._ensure_worker()
+        service.shadow_evaluator = self
+
+    def submit(self, tests: List[Dict], primary_scores: Sequence[float], primary_version: str) -> bool:
+        """
+        Queue tests scored by the primary model for comparison; never blocks
+
+        Returns:
+            False if there is no candidate or the queue is full (the tests are dropped)
+        """
+        if self.candidate is None:
+            return False
+        try:
+            self._queue.put_nowait((tests, primary_scores, primary_version))
+        except queue.Full:
+            with self._lock:
+                self.dropped += len(tests)
+            return False
+        return True
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="shadow-evaluator", daemon=True)
+                self._worker.start()
+
+    def wait(self):
+        """Block until every queued test has been compared"""
+        self._queue.join()
+
+    def stop(self):
+        """Stop the worker once the tests already queued are compared"""
+        with self._worker_lock:
+            worker, self._worker = self._worker, None
+        if worker is not None and worker.is_alive():
+            self._queue.put(_STOP)
+            worker.join(timeout=5)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            items = [item]
+            rows = len(item[0])
+            stopping = False
+            deadline = time.monotonic() + self.max_wait
+            # Compare everything arriving within max_wait in one candidate model call
+            while rows < self.max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                items.append(item)
+                rows += len(item[0])
+            try:
+                self._compare(items)
+            except Exception as e:
+                with self._lock:
+                    self.errors += sum(len(tests) for tests, _, _ in items)
+                logger.error("Shadow evaluation failed for %d test(s): %s", rows, e)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+            if stopping:
+                return
+
+    def _compare(self, items: List):
+        candidate = self.candidate
+        if candidate is None:
+            return
+        tests = [test_data for batch, _, _ in items for test_data in batch]
+        primary = np.fromiter(
+            (float(score) for _, scores, _ in items for score in scores), dtype=float, count=len(tests)
+        )
+        scores = np.asarray(
+            candidate.scoring_engine.predict_proba(candidate.lookup_encoder.transform(tests)), dtype=float
+        )
+
+        deltas = scores - primary
+        abs_deltas = np.abs(deltas)
+        primary_levels = [PredictionService.get_risk_level(score) for score in primary]
+        candidate_levels = [PredictionService.get_risk_level(score) for score in scores]
+
+        with self._lock:
+            if candidate is not self.candidate:
+                return  # Replaced while scoring; these results belong to no report
+            self.compared += len(tests)
+            for _, batch_scores, version in items:
+                self.primary_versions[version] = self.primary_versions.get(version, 0) + len(batch_scores)
+            self._delta_sum += float(deltas.sum())
+            self._abs_delta_sum += float(abs_deltas.sum())
+            self._max_abs_delta = max(self._max_abs_delta, float(abs_deltas.max()))
+            self._delta_buckets += np.bincount(
+                np.searchsorted(DELTA_BUCKETS, abs_deltas), minlength=len(DELTA_BUCKETS)
+            )[: len(DELTA_BUCKETS)]
+            np.add.at(
+                self._levels,
+                ([RISK_LEVELS.index(level) for level in primary_levels],
+                 [RISK_LEVELS.index(level) for level in candidate_levels]),
+                1,
+            )
+
+        if self.log_path:
+            self._log(items, scores, primary_levels, candidate_levels, candidate.model_version)
+
+    def _log(
+        self,
+        items: List,
+        scores: np.ndarray,
+        primary_levels: List[str],
+        candidate_levels: List[str],
+        candidate_version: str,
+    ):
+        compared_at = datetime.now(timezone.utc).isoformat()
+        records = zip(
+            ((version, float(score)) for _, batch_scores, version in items for score in batch_scores),
+            scores,
+            primary_levels,
+            candidate_levels,
+        )
+        with open(self.log_path, "a") as f:
+            for (primary_version, primary_score), candidate_score, primary_level, candidate_level in records:
+                f.write(json.dumps({
+                    "compared_at": compared_at,
+                    "primary_version": primary_version,
+                    "primary_score": primary_score,
+                    "primary_level": primary_level,
+                    "candidate_version": candidate_version,
+                    "candidate_score": float(candidate_score),
+                    "candidate_level": candidate_level,
+                }) + "\n")
+
+    def report(self) -> Dict:
+        """
+        Agreement between the candidate and the primary model since the candidate was set
+
+        Returns:
+            Dict with counts (compared, dropped, errors, queued batches), score
+            deltas (candidate - primary), level agreement and level flips
+        """
+        with self._lock:
+            compared = self.compared
+            level_flips = {
+                f"{primary}->{candidate}": int(self._levels[i, j])
+                for i, primary in enumerate(RISK_LEVELS)
+                for j, candidate in enumerate(RISK_LEVELS)
+                if i != j and self._levels[i, j]
+            }
+            agreed = int(np.trace(self._levels))
+            return {
+                "candidate_version": self.candidate.model_version if self.candidate else None,
+                "primary_versions": dict(self.primary_versions),
+                "started_at": self.started_at.isoformat(),
+                "compared": compared,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "queued_batches": self._queue.qsize(),
+                "score_delta": {
+                    "mean": self._delta_sum / compared if compared else None,
+                    "mean_abs": self._abs_delta_sum / compared if compared else None,
+                    "max_abs": self._max_abs_delta if compared else None,
+                    "abs_buckets": {
+                        f"<={bound:g}": int(count) for bound, count in zip(DELTA_BUCKETS, self._delta_buckets)
+                    },
+                },
+                "level_agreement": agreed / compared if compared else None,
+                "level_flips": level_flips,
+            }
+
+
+# Create singleton instance (attached to prediction_service at startup when SHADOW_MODEL_PATH is set)
+shadow_evaluator = ShadowEvaluator(log_path=settings.SHADOW_LOG_PATH)
@@ -0,0 +1,120 @@
+"""
+Short-lived, bounded cache of user rows for get_current_user
+
+Nearly every request authenticates, and without the cache each one adds a
+SELECT on users. Entries are snapshots of the user's columns keyed by user id;
+app.crud.user.get_user_by_id_cached merges a hit into the request's session
+without a query, so routes can still change and commit the user (and lazy load
+its relationships) as before.
+
+Entries live for USER_CACHE_TTL_SECONDS, at most USER_CACHE_SIZE of them (least
+recently used evicted first). Writes to a user invalidate its entry in this
+worker; other workers see the change once their entry expires. Users that were
+not found are never cached, so a deleted user is rejected as soon as its entry
+is invalidated.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.metrics import register
+
+
+class UserCache:
+    """LRU cache of user column snapshots with a time to live"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[int, Tuple[float, Dict]]" = OrderedDict()  # user id -> (expires at, columns)
+        # Bumped by every invalidation; a row read before it must not be stored after it
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Take before reading a user from the database, and pass to put()"""
+        return self._generation
+
+    def get(self, user_id: int) -> Optional[Dict]:
+        """The user's cached columns, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id: int, columns: Dict, generation: int):
+        """Store a user's columns, unless an invalidation happened since generation was taken"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[user_id] = (time.monotonic() + self.ttl, columns)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int):
+        """Forget a user after a write to its row; call once the write is committed"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Size and hit/miss/eviction/invalidation counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def render(self) -> List[str]:
+        """Prometheus text exposition lines for the counters and size"""
+        stats = self.stats()
+        lines = []
+        for counter, documentation in (
+            ("hits", "get_current_user lookups answered from the user cache"),
+            ("misses", "get_current_user lookups that queried the users table"),
+            ("evictions", "User cache entries evicted beyond USER_CACHE_SIZE"),
+            ("invalidations", "User cache entries dropped after a write to the user"),
+        ):
+            metric = f"lumora_user_cache_{counter}_total"
+            lines += [f"# HELP {metric} {documentation}", f"# TYPE {metric} counter", f"{metric} {stats[counter]}"]
+        lines += [
+            "# HELP lumora_user_cache_size Users currently cached",
+            "# TYPE lumora_user_cache_size gauge",
+            f"lumora_user_cache_size {stats['size']}",
+        ]
+        return lines
+
+
+# Create singleton instance
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
+register(user_cache)
@@ -0,0 +1 @@
+"""Command-line tools for maintenance tasks"""
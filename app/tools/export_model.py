@@ -0,0 +1,30 @@
+"""
+Export the pickled model and label encoders to the compact artifact format.
+
+Usage:
+    python -m app.tools.export_model
+    python -m app.tools.export_model --model saved_models/logistic_model.pkl \\
+        --encoders saved_models/label_encoders.pkl --output saved_models/risk_model.json
+"""
+import argparse
+
+from app.config import settings
+from app.services.model_artifact import export_model_artifact
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the depression risk model to a compact artifact")
+    parser.add_argument("--model", default=settings.MODEL_PATH, help="Pickled sklearn model")
+    parser.add_argument("--encoders", default=settings.ENCODERS_PATH, help="Pickled dict of LabelEncoders")
+    parser.add_argument("--output", default=settings.MODEL_ARTIFACT_PATH, help="Artifact to write")
+    args = parser.parse_args(argv)
+
+    compact = export_model_artifact(args.model, args.encoders, args.output)
+    print(
+        f"Exported model version {compact.model_version} "
+        f"({len(compact.feature_order)} features, {len(compact.vocabularies)} vocabularies) to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Re-score stored depression tests with the active model.
+
+Tests are read in primary-key order, one bounded chunk at a time, scored with a
+single vectorized call per chunk and written back with one executemany INSERT
+per chunk. Each chunk is committed and checkpointed, so an interrupted run
+resumes after the last committed test. Tests that already have a result from
+the active model version are skipped. Historical tests are scored by a service
+of their own, so they never reach the live drift monitor's counters.
+
+Usage:
+    python -m app.tools.rescore
+    python -m app.tools.rescore --chunk-size 5000 --checkpoint rescore_checkpoint.json
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Engine
+
+from app.models.depression_risk_result import DepressionRiskResult
+from app.models.depression_test import DepressionTest
+from app.services.prediction_service import FEATURE_MAPPING, PredictionService
+
+ANSWER_COLUMNS = [getattr(DepressionTest, db_field) for db_field in FEATURE_MAPPING]
+
+
+def load_checkpoint(path: str, model_version: str) -> Dict:
+    """Load the checkpoint for model_version; a checkpoint from another version starts over"""
+    fresh = {"model_version": model_version, "last_depression_test_id": 0, "rows_scored": 0}
+    if not path or not os.path.exists(path):
+        return fresh
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("model_version") != model_version:
+        return fresh
+    return checkpoint
+
+
+def save_checkpoint(path: str, checkpoint: Dict):
+    """Write the checkpoint atomically so a crash never leaves a torn file"""
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(dict(checkpoint, updated_at=datetime.now(timezone.utc).isoformat()), f)
+    os.replace(tmp_path, path)
+
+
+def rescore_tests(
+    engine: Engine,
+    service: Optional[PredictionService] = None,
+    chunk_size: int = 1000,
+    checkpoint_path: Optional[str] = None,
+    progress: Callable[[str], None] = print,
+) -> Dict:
+    """
+    Score every depression test without a result from the active model version
+
+    Args:
+        engine: Database engine to read tests from and write results to
+        service: Prediction service whose active model scores the tests
+            (default: a new one without a drift monitor)
+        chunk_size: Tests read, scored and committed per chunk
+        checkpoint_path: JSON file recording the last committed test id, or None
+        progress: Called with one progress line per chunk
+
+    Returns:
+        The final checkpoint (model_version, last_depression_test_id, rows_scored)
+    """
+    if service is None:
+        service = PredictionService()
+    model_version = service.ensure_loaded().model_version
+    checkpoint = load_checkpoint(checkpoint_path, model_version)
+    if checkpoint["last_depression_test_id"]:
+        progress(f"Resuming after depression_test_id {checkpoint['last_depression_test_id']}")
+
+    already_scored = (
+        select(DepressionRiskResult.result_id)
+        .where(
+            DepressionRiskResult.depression_test_id == DepressionTest.depression_test_id,
+            DepressionRiskResult.model_version == model_version,
+        )
+        .exists()
+    )
+    started = time.perf_counter()
+    rows_this_run = 0
+
+    with engine.connect() as conn:
+        while True:
+            # Keyset pagination: every chunk is an index range scan, however far in we are
+            rows = conn.execute(
+                select(
+                    DepressionTest.depression_test_id,
+                    DepressionTest.user_id,
+                    DepressionTest.created_at,
+                    *ANSWER_COLUMNS,
+                )
+                .where(
+                    DepressionTest.depression_test_id > checkpoint["last_depression_test_id"],
+                    ~already_scored,
+                )
+                .order_by(DepressionTest.depression_test_id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+
+            predictions = service.predict_depression_risk_batch([row._asdict() for row in rows])
+            conn.execute(
+                insert(DepressionRiskResult),
+                [
+                    {
+                        "user_id": row.user_id,
+                        "depression_test_id": row.depression_test_id,
+                        "risk_level": prediction.risk_level,
+                        "risk_score": prediction.risk_score,
+                        "model_version": prediction.model_version,
+                        # Keep the result on the day the test was taken
+                        "created_at": row.created_at,
+                    }
+                    for row, prediction in zip(rows, predictions)
+                ],
+            )
+            conn.commit()
+
+            checkpoint["last_depression_test_id"] = rows[-1].depression_test_id
+            checkpoint["rows_scored"] += len(rows)
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            rows_this_run += len(rows)
+            elapsed = time.perf_counter() - started
+            progress(
+                f"Scored {checkpoint['rows_scored']} tests "
+                f"(through depression_test_id {checkpoint['last_depression_test_id']}, "
+                f"{rows_this_run / elapsed:.0f} rows/s)"
+            )
+
+    return checkpoint
+
+
+def main(argv=None):
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="Re-score stored depression tests with the active model")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Tests per chunk (and per commit)")
+    parser.add_argument(
+        "--checkpoint", default="rescore_checkpoint.json", help="Checkpoint file used to resume an interrupted run"
+    )
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and scan from the first test")
+    args = parser.parse_args(argv)
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    started = time.perf_counter()
+    checkpoint = rescore_tests(engine, chunk_size=args.chunk_size, checkpoint_path=args.checkpoint)
+    print(
+        f"Done: {checkpoint['rows_scored']} tests scored with model version "
+        f"{checkpoint['model_version']} in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any
 import json
 
@@ -13,6 +13,11 @@ def format_datetime(dt: datetime, format: str = "%Y-%m-%d %H:%M:%S") -> str:
     return dt.strftime(format)
 
 
+def utcnow() -> datetime:
+    """Current time as a timezone-aware UTC datetime"""
+    return datetime.now(timezone.utc)
+
+
 def get_date_range(days: int) -> tuple[datetime, datetime]:
     """Get date range from today going back specified days"""
     end_date = datetime.utcnow()
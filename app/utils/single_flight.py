@@ -0,0 +1,33 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Hashable, List
+
+
+class SingleFlight:
+    """
+    Per-key locks: concurrent callers with the same key run one at a time
+
+    Used to collapse concurrent retries of the same request within one worker;
+    the second caller waits for the first and then sees its result. Locks are
+    dropped once no caller holds or waits for them.
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, List] = {}  # key -> [lock, callers holding or waiting]
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def lock(self, key: Hashable):
+        with self._guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
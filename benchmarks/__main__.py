@@ -0,0 +1,64 @@
+"""
+Run the prediction pipeline benchmark suite
+
+Usage:
+    python -m benchmarks
+    python -m benchmarks --filter score_batch
+    python -m benchmarks --json results.json --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.bench_pipeline import CASES
+from benchmarks.utils import report
+
+from app.services.metrics import PREDICTION_STAGE_SECONDS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prediction pipeline benchmark suite")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --json run")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Mean slowdown vs the baseline that counts as a regression"
+    )
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, run_case in CASES.items():
+        if args.filter not in name:
+            continue
+        PREDICTION_STAGE_SECONDS.reset()
+        stats, rows = run_case()
+        report(name, stats, rows)
+        stages = PREDICTION_STAGE_SECONDS.snapshot()
+        for stage, stage_stats in sorted(stages.items()):
+            print(f"    stage {stage:<32} mean={stage_stats['mean'] * 1e6:>10.1f}us  count={stage_stats['count']}")
+        results[name] = dict(stats, rows=rows)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = []
+        print()
+        for name, stats in results.items():
+            if name not in baseline:
+                continue
+            change = stats["mean"] / baseline[name]["mean"] - 1
+            flag = "REGRESSION" if change > args.threshold else ""
+            print(f"{name:<40} {baseline[name]['mean']:>10.1f}us -> {stats['mean']:>10.1f}us  {change:+7.1%}  {flag}")
+            if flag:
+                regressions.append(name)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
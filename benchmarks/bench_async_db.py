@@ -0,0 +1,117 @@
+"""
+Load benchmark: does concurrent database work stall the event loop?
+
+CONCURRENCY coroutines each look up users by id and email, as the async auth
+dependency and routes do, while a heartbeat coroutine asks to wake up every
+millisecond. How late it wakes up is how long any other request on the same
+worker would have waited. With the sync CRUD functions every query blocks the
+loop; the async variants await the driver (aiosqlite here, asyncpg on PostgreSQL).
+
+Run from the repository root:
+    python -m benchmarks.bench_async_db
+"""
+
+import asyncio
+import os
+import time
+
+import benchmarks.utils  # noqa: F401  (sets a default DATABASE_URL)
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import user as user_crud
+from app.database import to_async_database_url
+from app.models.emergency_contact import EmergencyContact
+from app.models.user import User
+
+DB_PATH = "bench_async.db"
+DB_URL = f"sqlite:///./{DB_PATH}"
+
+USERS = 1000
+CONCURRENCY = 50
+LOOKUPS_PER_TASK = 40
+HEARTBEAT_SECONDS = 0.001
+
+
+def create_database():
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    engine = create_engine(DB_URL)
+    User.__table__.create(bind=engine)
+    EmergencyContact.__table__.create(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all(User(email=f"user{i}@example.com", full_name=f"User {i}", hashed_password="x") for i in range(USERS))
+        db.commit()
+    return engine
+
+
+async def heartbeat(stop: asyncio.Event, samples: list):
+    """Record how late each HEARTBEAT_SECONDS sleep wakes up, in us"""
+    while not stop.is_set():
+        scheduled = time.perf_counter() + HEARTBEAT_SECONDS
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        samples.append((time.perf_counter() - scheduled) * 1e6)
+
+
+def lag_stats(samples: list):
+    samples.sort()
+    return {
+        "mean": sum(samples) / len(samples),
+        "p50": samples[len(samples) // 2],
+        "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        "max": samples[-1],
+    }
+
+
+async def run(lookup):
+    """Heartbeat lag while CONCURRENCY tasks each run LOOKUPS_PER_TASK lookups"""
+    stop = asyncio.Event()
+    samples = []
+    beat = asyncio.create_task(heartbeat(stop, samples))
+
+    async def task(seed: int):
+        for i in range(LOOKUPS_PER_TASK):
+            await lookup((seed * LOOKUPS_PER_TASK + i) % USERS + 1)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(task(seed) for seed in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    return lag_stats(samples), CONCURRENCY * LOOKUPS_PER_TASK / elapsed
+
+
+async def main():
+    engine = create_database()
+    async_engine = create_async_engine(to_async_database_url(DB_URL))
+    SessionLocal = sessionmaker(bind=engine)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    async def sync_lookup(user_id: int):
+        with SessionLocal() as db:
+            user = user_crud.get_user_by_id(db, user_id)
+            user_crud.get_user_by_email(db, user.email)
+
+    async def async_lookup(user_id: int):
+        async with AsyncSessionLocal() as db:
+            user = await user_crud.get_user_by_id_async(db, user_id)
+            await user_crud.get_user_by_email_async(db, user.email)
+
+    try:
+        for name, lookup in (("sync crud", sync_lookup), ("async crud", async_lookup)):
+            await lookup(1)  # warm up connections and statement caches
+            stats, lookups_per_sec = await run(lookup)
+            print(
+                f"{'event loop lag, ' + name:<40} mean={stats['mean']:>10.1f}us  p99={stats['p99']:>10.1f}us  "
+                f"max={stats['max']:>10.1f}us  lookups/s={lookups_per_sec:>8.0f}"
+            )
+    finally:
+        await async_engine.dispose()
+        engine.dispose()
+        os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+Load benchmark: does a burst of predictions slow down unrelated requests?
+
+A "victim" thread repeatedly runs the work of a GET /moods response (validating
+and serializing 50 MoodResponse rows) while burst threads score batches of
+random tests through PredictionExecutor. Inline and thread modes encode and score
+under the worker's GIL; process mode moves that work to child processes.
+
+Run from the repository root:
+    python -m benchmarks.bench_executor
+"""
+
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from typing import List
+
+# Score every test for real: random answers would mostly miss anyway, repeats would hit
+os.environ.setdefault("PREDICTION_CACHE_SIZE", "0")
+
+from benchmarks.utils import report  # noqa: E402
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.schemas.mood import MoodResponse  # noqa: E402
+from app.services.prediction_executor import PredictionExecutor  # noqa: E402
+from app.services.prediction_service import FEATURE_MAPPING, prediction_service  # noqa: E402
+
+
+BURST_THREADS = 4
+BATCH_SIZE = 2000
+DURATION_SECONDS = 3.0
+
+MOODS = [
+    {
+        "mood_id": mood_id,
+        "user_id": 1,
+        "mood_type": "Happy",
+        "activities": ["Exercise", "Reading"],
+        "note": "Felt good today",
+        "created_at": datetime(2026, 1, 1, 12, 0),
+    }
+    for mood_id in range(50)
+]
+MOODS_ADAPTER = TypeAdapter(List[MoodResponse])
+
+
+def moods_response():
+    """The CPU work of serving GET /moods for 50 rows"""
+    return MOODS_ADAPTER.dump_json(MOODS_ADAPTER.validate_python(MOODS))
+
+
+def random_tests(count: int, seed: int):
+    rng = random.Random(seed)
+    vocabularies = prediction_service.ensure_loaded().lookup_encoder.vocabularies
+    tests = []
+    for _ in range(count):
+        test = {}
+        for db_field, feature in FEATURE_MAPPING.items():
+            test[db_field] = rng.choice(vocabularies[feature]) if feature in vocabularies else rng.randint(1, 5)
+        tests.append(test)
+    return tests
+
+
+def victim_latencies(stop: threading.Event):
+    """
+    Run moods_response every 2ms until stop; returns latency stats in us
+
+    Latency is measured from the scheduled start, so time spent waiting for the
+    GIL after waking up counts, as it would for a real request.
+    """
+    samples = []
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        scheduled += 0.002
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        moods_response()
+        samples.append((time.perf_counter() - scheduled) * 1e6)
+    samples.sort()
+    return {
+        "mean": sum(samples) / len(samples),
+        "p50": samples[len(samples) // 2],
+        "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def run(executor):
+    """Victim latency while BURST_THREADS score batches through executor (none = no burst)"""
+    stop = threading.Event()
+    batches = [random_tests(BATCH_SIZE, seed) for seed in range(BURST_THREADS)]
+    scored = []
+
+    def burst(tests):
+        count = 0
+        while not stop.is_set():
+            executor.predict_batch(tests)
+            count += len(tests)
+        scored.append(count)
+
+    threads = [threading.Thread(target=burst, args=(tests,)) for tests in batches] if executor else []
+    for thread in threads:
+        thread.start()
+
+    result = {}
+    victim = threading.Thread(target=lambda: result.update(victim_latencies(stop)))
+    victim.start()
+    time.sleep(DURATION_SECONDS)
+    stop.set()
+    victim.join()
+    for thread in threads:
+        thread.join()
+    return result, sum(scored) / DURATION_SECONDS
+
+
+def main():
+    stats, _ = run(None)
+    report("GET /moods work, idle", stats)
+
+    for mode in ("inline", "thread", "process"):
+        executor = PredictionExecutor(prediction_service, mode=mode, max_workers=BURST_THREADS)
+        executor.start()
+        stats, rows_per_sec = run(executor)
+        executor.shutdown()
+        report(f"GET /moods work, burst ({mode})", stats)
+        print(f"{'':<40} burst scored {rows_per_sec:>10.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Load benchmark: micro-batched vs direct single predictions
+
+Each of N threads scores tests back to back (a closed loop, like N request
+threads), first calling predict_depression_risk directly, then going through
+PredictionBatcher with different max waits. Prints throughput and per-request
+latency at each concurrency level.
+
+Run from the repository root:
+    python -m benchmarks.bench_microbatch
+"""
+
+import threading
+import time
+
+from benchmarks.bench_scoring import SAMPLE_TEST
+from benchmarks.utils import report
+
+from app.services.prediction_batcher import PredictionBatcher
+from app.services.prediction_service import prediction_service
+
+
+CONCURRENCY_LEVELS = (1, 4, 16, 64)
+REQUESTS_PER_THREAD = 300
+
+
+def run_load(predict, concurrency: int):
+    """Run concurrency threads of REQUESTS_PER_THREAD calls; returns (latency stats, elapsed seconds)"""
+    samples = [[] for _ in range(concurrency)]
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(latencies):
+        barrier.wait()
+        for _ in range(REQUESTS_PER_THREAD):
+            start = time.perf_counter()
+            predict(SAMPLE_TEST)
+            latencies.append((time.perf_counter() - start) * 1e6)
+
+    threads = [threading.Thread(target=worker, args=(latencies,)) for latencies in samples]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(sample for thread_samples in samples for sample in thread_samples)
+    stats = {
+        "mean": sum(latencies) / len(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+    return stats, elapsed
+
+
+def main():
+    prediction_service.ensure_loaded()
+
+    for concurrency in CONCURRENCY_LEVELS:
+        total = concurrency * REQUESTS_PER_THREAD
+        stats, elapsed = run_load(prediction_service.predict_depression_risk, concurrency)
+        report(f"direct (c={concurrency})", stats)
+        print(f"{'':<40} throughput={total / elapsed:>10.0f} req/s")
+
+        for max_wait_ms in (0.5, 2.0):
+            batcher = PredictionBatcher(prediction_service, max_batch_size=64, max_wait_ms=max_wait_ms, enabled=True)
+            stats, elapsed = run_load(batcher.predict, concurrency)
+            batcher.stop()
+            report(f"batched wait={max_wait_ms}ms (c={concurrency})", stats)
+            print(
+                f"{'':<40} throughput={total / elapsed:>10.0f} req/s  "
+                f"avg batch={batcher.requests / max(batcher.batches, 1):.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
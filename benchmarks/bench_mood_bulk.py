@@ -0,0 +1,91 @@
+"""
+Benchmark: uploading a backlog of offline mood entries, per-entry vs bulk
+
+A phone that was offline for a while syncs ENTRIES mood entries. Posting them
+one by one to POST /moods/ pays for a request, a token check, a user lookup and
+a commit per entry; POST /moods/bulk pays for those once and stores every entry
+in one transaction (one multi-row INSERT on PostgreSQL).
+
+SQLite has no ARRAY type, so this run stores mood_journaling.activities as JSON.
+
+Run from the repository root:
+    python -m benchmarks.bench_mood_bulk
+"""
+
+import os
+
+from benchmarks.utils import measure, report
+
+from fastapi.testclient import TestClient
+from sqlalchemy import JSON, create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import get_db
+from app.main import app
+from app.models.mood import MoodJournaling
+from app.models.user import User
+from app.utils.security import create_access_token
+
+DB_PATH = "bench_mood_bulk.db"
+ENTRIES = 100  # each per-entry POST commits, so thousands take minutes
+
+MoodJournaling.__table__.c.activities.type = JSON()
+
+
+def create_database():
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    engine = create_engine(f"sqlite:///./{DB_PATH}", connect_args={"check_same_thread": False})
+    User.__table__.create(bind=engine)
+    MoodJournaling.__table__.create(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(User(id=1, email="bench@example.com", full_name="Bench", hashed_password="x"))
+        db.commit()
+    return engine
+
+
+def main():
+    engine = create_database()
+    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+    def override_get_db():
+        with SessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': '1'})}"}
+
+    def make_entries(count):
+        return [
+            {"mood_type": "calm", "activities": ["walk", "music"], "note": f"entry {i}", "selected_date": "2026-10-01"}
+            for i in range(count)
+        ]
+
+    def per_entry(entries):
+        for entry in entries:
+            assert client.post("/moods/", json=entry, headers=headers).status_code == 200
+
+    def bulk(entries):
+        response = client.post("/moods/bulk", json={"entries": entries}, headers=headers)
+        assert response.json()["created"] == len(entries)
+
+    try:
+        entries = make_entries(ENTRIES)
+        report(f"{ENTRIES} entries, POST /moods/ each", measure(lambda: per_entry(entries), repeat=3, warmup=0), ENTRIES)
+        report(f"{ENTRIES} entries, POST /moods/bulk", measure(lambda: bulk(entries), repeat=10, warmup=1), ENTRIES)
+        entries = make_entries(settings.MOOD_BULK_MAX_SIZE)
+        report(
+            f"{len(entries)} entries, POST /moods/bulk",
+            measure(lambda: bulk(entries), repeat=5, warmup=1),
+            len(entries),
+        )
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+        os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
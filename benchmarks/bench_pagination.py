@@ -0,0 +1,77 @@
+"""
+Benchmark: page latency by depth, OFFSET vs keyset cursor, at 100k rows per user
+
+Reads one 50-row page of a user's notifications at increasing depths with the
+legacy skip/limit query and with the cursor query. OFFSET walks every skipped
+row, so it slows down linearly with depth; the cursor seeks straight to the page
+through the (user_id, created_at) index and stays flat.
+
+Run from the repository root:
+    python -m benchmarks.bench_pagination
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from benchmarks.utils import measure, report
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.notification import get_notifications, get_notifications_page
+from app.models.notification import Notification
+from app.models.user import User
+from app.utils.pagination import encode_cursor
+
+DB_PATH = "bench_pagination.db"
+ROWS = 100_000
+PAGE_SIZE = 50
+DEPTHS = (0, 1_000, 10_000, 50_000, ROWS - PAGE_SIZE)
+
+
+def create_database():
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    engine = create_engine(f"sqlite:///./{DB_PATH}")
+    User.__table__.create(bind=engine)
+    Notification.__table__.create(bind=engine)  # with its (user_id, created_at) indexes
+    start = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "bench@example.com", "full_name": "Bench", "hashed_password": "x"}])
+        conn.execute(insert(Notification), [
+            {
+                "user_id": 1,
+                "type": "reminder",
+                "title": f"Reminder {i}",
+                "message": "Time for your daily check-in",
+                "is_read": True,
+                "created_at": start + timedelta(minutes=i),
+            }
+            for i in range(ROWS)
+        ])
+        conn.exec_driver_sql("ANALYZE")
+    return engine
+
+
+def main():
+    engine = create_database()
+    db = sessionmaker(bind=engine)()
+    try:
+        # Cursor pointing just before each depth: the row at depth - 1, newest first
+        newest_first = db.query(Notification.created_at, Notification.id).order_by(
+            Notification.created_at.desc(), Notification.id.desc()
+        ).all()
+        for depth in DEPTHS:
+            cursor = encode_cursor(*newest_first[depth - 1]) if depth else None
+            offset = measure(lambda: get_notifications(db, user_id=1, skip=depth, limit=PAGE_SIZE), repeat=50, warmup=3)
+            keyset = measure(lambda: get_notifications_page(db, user_id=1, cursor=cursor, limit=PAGE_SIZE), repeat=50, warmup=3)
+            report(f"page at row {depth:>6}, offset", offset, PAGE_SIZE)
+            report(f"page at row {depth:>6}, cursor", keyset, PAGE_SIZE)
+    finally:
+        db.close()
+        engine.dispose()
+        os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Benchmark suite for the prediction pipeline on the shipped saved_models artifacts
+
+Each case returns latency statistics and the rows scored per call. Run them all
+with the suite runner, which can save and compare results between runs:
+    python -m benchmarks
+    python -m benchmarks --json results.json --compare baseline.json
+"""
+
+from typing import Callable, Dict, Tuple
+
+from benchmarks.bench_scoring import SAMPLE_TEST
+from benchmarks.utils import measure
+
+from app.services.prediction_service import PredictionService
+
+CASES: Dict[str, Callable[[], Tuple[Dict[str, float], int]]] = {}
+
+
+def case(name: str):
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+
+def _uncached_service() -> PredictionService:
+    service = PredictionService(cache_size=0)
+    service.ensure_loaded()
+    return service
+
+
+@case("score_single")
+def score_single():
+    service = _uncached_service()
+    return measure(lambda: service.predict_depression_risk(SAMPLE_TEST)), 1
+
+
+@case("score_single_cached")
+def score_single_cached():
+    service = PredictionService(cache_size=100)
+    return measure(lambda: service.predict_depression_risk(SAMPLE_TEST)), 1
+
+
+@case("explain_single")
+def explain_single():
+    service = _uncached_service()
+    version = service.model_version
+    return measure(lambda: service.explain_depression_risk(SAMPLE_TEST, version)), 1
+
+
+@case("what_if")
+def what_if():
+    """One test plus every single-answer change, scored in one call"""
+    service = _uncached_service()
+    return measure(lambda: service.what_if(SAMPLE_TEST)), len(service.lookup_encoder.answer_options)
+
+
+@case("score_batch_100")
+def score_batch_100():
+    service = _uncached_service()
+    tests = [SAMPLE_TEST] * 100
+    return measure(lambda: service.predict_depression_risk_batch(tests), repeat=500), 100
+
+
+@case("score_batch_5000")
+def score_batch_5000():
+    service = _uncached_service()
+    tests = [SAMPLE_TEST] * 5000
+    return measure(lambda: service.predict_depression_risk_batch(tests), repeat=30, warmup=3), 5000
+
+
+@case("score_batch_100_drift")
+def score_batch_100_drift():
+    """score_batch_100 with every test also recorded by a drift monitor"""
+    from app.services.drift_monitor import DriftMonitor
+    from app.services.prediction_service import FEATURE_MAPPING
+
+    service = PredictionService(cache_size=0, drift_monitor=DriftMonitor(list(FEATURE_MAPPING)))
+    tests = [SAMPLE_TEST] * 100
+    return measure(lambda: service.predict_depression_risk_batch(tests), repeat=500), 100
+
+
+@case("score_single_shadow")
+def score_single_shadow():
+    """score_single while a shadow evaluator re-scores every test with a candidate in the background"""
+    from app.services.shadow_evaluator import ShadowEvaluator
+
+    service = _uncached_service()
+    evaluator = ShadowEvaluator()
+    evaluator.set_candidate(service.active_model)
+    evaluator.attach(service)
+    try:
+        return measure(lambda: service.predict_depression_risk(SAMPLE_TEST)), 1
+    finally:
+        evaluator.stop()
+
+
+def _sqlite_session():
+    """In-memory SQLite session with a user; returns (session, user)"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.database import Base
+    from app.models.user import User
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[Base.metadata.tables[name] for name in ("users", "depression_tests", "depression_risk_results")],
+    )
+    db = sessionmaker(bind=engine)()
+    user = User(email="bench@example.com", full_name="Bench", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return db, user
+
+
+@case("create_depression_test_sqlite")
+def create_depression_test_sqlite():
+    """POST /depression-test minus HTTP: insert the test, score it, insert the result"""
+    from app.crud.depression_test import create_depression_test
+    from app.schemas.depression_test import DepressionTestCreate
+
+    db, user = _sqlite_session()
+    with db:
+        payload = DepressionTestCreate(user_id=user.id, **SAMPLE_TEST)
+        return measure(lambda: create_depression_test(db, payload), repeat=500), 1
+
+
+def _predict_and_save(explain: bool, repeat_calls: bool = False):
+    """
+    POST /depression-risk-results/predict/{id} minus HTTP, with or without ?explain
+
+    Each call scores a fresh stored test; with repeat_calls every call asks for the
+    same test, which already has a result after the first one.
+    """
+    from fastapi import Response
+
+    from app.api.depression_risk_result import predict_and_save_risk_result
+    from app.models.depression_test import DepressionTest
+
+    repeat, warmup = 500, 50
+    db, user = _sqlite_session()
+    with db:
+        tests = [DepressionTest(user_id=user.id, **SAMPLE_TEST) for _ in range(1 if repeat_calls else repeat + warmup)]
+        db.add_all(tests)
+        db.commit()
+        test_ids = iter([test.depression_test_id for test in tests])
+        first_id = tests[0].depression_test_id
+        return measure(
+            lambda: predict_and_save_risk_result(
+                first_id if repeat_calls else next(test_ids),
+                Response(),
+                explain=explain,
+                current_user=user,
+                db=db,
+            ),
+            repeat=repeat,
+            warmup=warmup,
+        ), 1
+
+
+@case("predict_and_save_sqlite")
+def predict_and_save_sqlite():
+    return _predict_and_save(explain=False)
+
+
+@case("predict_and_save_sqlite_explain")
+def predict_and_save_sqlite_explain():
+    return _predict_and_save(explain=True)
+
+
+@case("predict_and_save_sqlite_repeat")
+def predict_and_save_sqlite_repeat():
+    """A retried request: the stored result for the active model version is returned"""
+    return _predict_and_save(explain=False, repeat_calls=True)
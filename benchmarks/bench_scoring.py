@@ -0,0 +1,63 @@
+"""
+Microbenchmark: closed-form NumPy scoring vs sklearn predict_proba
+
+Run from the repository root:
+    python -m benchmarks.bench_scoring
+"""
+
+import warnings
+
+from benchmarks.utils import measure, report
+
+from app.services.prediction_service import PredictionService
+
+
+SAMPLE_TEST = {
+    "mood": "Sad",
+    "sleep_hour": "4-5 hours",
+    "appetite": "Less than usual",
+    "exercise": "None",
+    "screen_time": "7 or more hours",
+    "academic_work": "8 or more hours",
+    "socialize": "Very little",
+    "energy_level": 1,
+    "trouble_concentrating": "All day",
+    "negative_thoughts": "Yes",
+    "decision_making": "Foggy",
+    "bothered_things": "Yes",
+    "stressful_events": "Yes",
+    "sleepy_tired": "Very sleepy or tired",
+    "future_hope": "No hope at all",
+}
+
+
+def main():
+    # sklearn warns on every call that the ndarray has no feature names
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    # The pickles, so sklearn and the closed form score the same model
+    prediction_service = PredictionService()
+    prediction_service.load_sklearn_models()
+    engine = prediction_service.scoring_engine
+    model = prediction_service.model
+
+    for rows in (1, 100, 10000):
+        X = prediction_service.preprocess_depression_tests([SAMPLE_TEST] * rows)
+        repeat = 2000 if rows < 10000 else 200
+        report(f"sklearn predict_proba ({rows} rows)", measure(lambda: model.predict_proba(X), repeat), rows)
+        report(f"closed-form numpy ({rows} rows)", measure(lambda: engine.predict_proba(X), repeat), rows)
+
+    uncached_service = PredictionService(cache_size=0)
+    uncached_service.ensure_loaded()
+    report(
+        "predict_depression_risk (end to end)",
+        measure(lambda: uncached_service.predict_depression_risk(SAMPLE_TEST)),
+    )
+    report(
+        "predict_depression_risk (cache hit)",
+        measure(lambda: prediction_service.predict_depression_risk(SAMPLE_TEST)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Startup benchmark: compact JSON artifact vs pickled sklearn model
+
+Each case runs in a fresh interpreter so the cost of importing scikit-learn
+during unpickling is included, the way a new uvicorn worker pays it. App
+imports shared by both paths are done before the timer starts.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.utils import os  # noqa: F401  (sets a default DATABASE_URL)
+
+from app.config import settings
+
+
+LOADERS = {
+    "compact artifact (no sklearn)": f"service.load_compact_model({settings.MODEL_ARTIFACT_PATH!r})\n",
+    "sklearn pickles (joblib.load)": "service.load_sklearn_models()\n",
+}
+
+CHILD = (
+    "import time, sys, warnings\n"
+    "warnings.simplefilter('ignore')\n"
+    "from app.services.prediction_service import PredictionService\n"
+    "service = PredictionService()\n"
+    "start = time.perf_counter()\n"
+    "{loader}"
+    "service.predict_depression_risk({{}})\n"
+    "print((time.perf_counter() - start) * 1000, 'sklearn' in sys.modules)\n"
+)
+
+
+def main(runs: int = 5):
+    for name, loader in LOADERS.items():
+        in_process_ms = []
+        wall_ms = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            output = subprocess.run(
+                [sys.executable, "-c", CHILD.format(loader=loader)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout.split()
+            wall_ms.append((time.perf_counter() - start) * 1000)
+            in_process_ms.append(float(output[0]))
+            sklearn_imported = output[1]
+
+        print(
+            f"{name:<32} load+first score={statistics.median(in_process_ms):>8.1f}ms  "
+            f"process wall={statistics.median(wall_ms):>8.1f}ms  sklearn imported={sklearn_imported}"
+        )
+
+
+if __name__ == "__main__":
+    main()
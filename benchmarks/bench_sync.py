@@ -0,0 +1,91 @@
+"""
+Benchmark: refresh cost of a full download vs a delta sync, by history length
+
+A user has HISTORY notifications and moods, and CHANGES of each were written
+since their last sync. A full refresh reads the whole history; GET /sync with a
+watermark range-scans the (user_id, updated_at) indexes, so its cost follows the
+number of changes and stays flat as the history grows.
+
+SQLite has no ARRAY type, so this run stores mood_journaling.activities as JSON.
+
+Run from the repository root:
+    python -m benchmarks.bench_sync
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.utils import measure, report
+
+from sqlalchemy import JSON, create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.sync import get_changes
+from app.models.depression_risk_result import DepressionRiskResult
+from app.models.mood import MoodJournaling
+from app.models.notification import Notification
+from app.models.sync_tombstone import SyncTombstone
+from app.models.user import User
+
+DB_PATH = "bench_sync.db"
+HISTORIES = (1_000, 10_000, 100_000)
+CHANGES = 20
+
+MoodJournaling.__table__.c.activities.type = JSON()
+
+
+def create_database(history: int):
+    """One user with history notifications and moods, the newest CHANGES of each after the watermark"""
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    engine = create_engine(f"sqlite:///./{DB_PATH}")
+    for model in (User, MoodJournaling, Notification, DepressionRiskResult, SyncTombstone):
+        model.__table__.create(bind=engine)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "bench@example.com", "full_name": "Bench", "hashed_password": "x"}])
+        conn.execute(insert(Notification), [
+            {
+                "user_id": 1,
+                "type": "reminder",
+                "title": f"Reminder {i}",
+                "message": "Time for your daily check-in",
+                "created_at": start + timedelta(minutes=i),
+                "updated_at": start + timedelta(minutes=i),
+            }
+            for i in range(history)
+        ])
+        conn.execute(insert(MoodJournaling), [
+            {
+                "user_id": 1,
+                "mood_type": "calm",
+                "activities": ["walk"],
+                "created_at": start + timedelta(minutes=i),
+                "updated_at": start + timedelta(minutes=i),
+            }
+            for i in range(history)
+        ])
+        conn.exec_driver_sql("ANALYZE")
+    return engine, start + timedelta(minutes=history - CHANGES - 1)
+
+
+def main():
+    try:
+        for history in HISTORIES:
+            engine, watermark = create_database(history)
+            db = sessionmaker(bind=engine)()
+            try:
+                full = measure(lambda: get_changes(db, user_id=1, since=None), repeat=5, warmup=1)
+                delta = measure(lambda: get_changes(db, user_id=1, since=watermark), repeat=50, warmup=3)
+                report(f"history {history:>6}, full refresh", full, 2 * history)
+                report(f"history {history:>6}, delta since watermark", delta, 2 * CHANGES)
+            finally:
+                db.close()
+                engine.dispose()
+    finally:
+        if os.path.exists(DB_PATH):
+            os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
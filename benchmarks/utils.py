@@ -0,0 +1,37 @@
+"""Shared timing helpers for the benchmark scripts"""
+
+import os
+import statistics
+import time
+from typing import Callable, Dict
+
+# app.config requires a DATABASE_URL; benchmarks never need a real database by default
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+
+def measure(fn: Callable[[], object], repeat: int = 2000, warmup: int = 50) -> Dict[str, float]:
+    """Call fn repeatedly and return per-call latency statistics in microseconds"""
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+
+    samples.sort()
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def report(name: str, stats: Dict[str, float], rows: int = 1) -> None:
+    """Print one benchmark line in a stable, grep-friendly format"""
+    rows_per_sec = rows / (stats["mean"] / 1e6) if stats["mean"] else 0.0
+    print(
+        f"{name:<40} mean={stats['mean']:>10.1f}us  p50={stats['p50']:>10.1f}us  "
+        f"p99={stats['p99']:>10.1f}us  rows/s={rows_per_sec:>12.0f}"
+    )
@@ -1,12 +1,17 @@
 """Test configuration and fixtures"""
 
+from typing import Dict, Tuple
+
 import pytest
-from sqlalchemy import create_engine
+from fastapi.testclient import TestClient
+from sqlalchemy import JSON, create_engine
 from sqlalchemy.orm import sessionmaker
 from app.database import Base, get_db
 from app.main import app
 from app.utils.security import create_access_token
+from app.models.mood import MoodJournaling
 from app.models.user import User
+from app.services.user_cache import user_cache
 from datetime import datetime
 
 # Create test database
@@ -15,6 +20,14 @@ engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": Fal
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """Tests recreate their tables, so a cached user id may belong to another user in the next test"""
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database for each test"""
@@ -66,3 +79,48 @@ def auth_token(test_user):
     """Create an auth token for test user"""
     return create_access_token(data={"sub": str(test_user.id)})
 
+
+
+@pytest.fixture(scope="function")
+def api_tables(monkeypatch):
+    """Create every table on the test database for one test, then drop them
+
+    SQLite has no ARRAY type, so mood_journaling.activities is stored as JSON here.
+    """
+    monkeypatch.setattr(MoodJournaling.__table__.c.activities, "type", JSON())
+    Base.metadata.create_all(bind=engine)
+    try:
+        yield
+    finally:
+        Base.metadata.drop_all(bind=engine)
+
+
+def create_user(email: str = "user@example.com", **columns) -> Tuple[int, Dict[str, str]]:
+    """Add a user to the test database and return its id and an auth header"""
+    columns.setdefault("full_name", "Test User")
+    columns.setdefault("hashed_password", "x")
+    with TestingSessionLocal() as db:
+        user = User(email=email, **columns)
+        db.add(user)
+        db.commit()
+        return user.id, {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+
+
+@pytest.fixture(scope="function")
+def api_client(api_tables):
+    """Test client whose routes open their own sessions on the test database"""
+    def override_get_db():
+        with TestingSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def api_user(api_tables):
+    """Id and auth header of a user in the test database"""
+    return create_user()
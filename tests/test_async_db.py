@@ -0,0 +1,278 @@
+"""
+Tests for the database engines: the async path used by async def routes, pool
+metrics and read replica routing
+
+To run tests:
+    pytest tests/test_async_db.py -v
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app import database
+from app.database import Base, RecentWrites, get_async_db, get_db, pool_options, settings, to_async_database_url
+from app.main import track_user_writes
+from app.main import app
+from app.models.depression_risk_result import DepressionRiskResult
+from app.models.emergency_contact import EmergencyContact
+from app.models.notification import Notification
+from app.models.user import User
+from app.services.pool_metrics import DB_POOL_WAIT_SECONDS, PoolMonitor, TimedQueuePool
+from app.utils.security import create_access_token, get_password_hash
+from tests.conftest import TEST_DATABASE_URL, engine, TestingSessionLocal
+
+# mood_journaling uses a PostgreSQL ARRAY column, so only create the tables these tests need
+DB_TABLES = [
+    Base.metadata.tables["users"],
+    Base.metadata.tables["emergency_contacts"],
+    Base.metadata.tables["depression_tests"],
+    Base.metadata.tables["depression_risk_results"],
+    Base.metadata.tables["chat_history"],
+    Base.metadata.tables["notifications"],
+]
+
+
+@pytest.fixture(scope="function")
+def async_db():
+    """Create the tables and return an async sessionmaker bound to the test database"""
+    Base.metadata.create_all(bind=engine, tables=DB_TABLES)
+    async_engine = create_async_engine(to_async_database_url(TEST_DATABASE_URL))
+    try:
+        yield async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    finally:
+        asyncio.run(async_engine.dispose())
+        Base.metadata.drop_all(bind=engine, tables=DB_TABLES)
+
+
+@pytest.fixture(scope="function")
+def async_client(async_db):
+    """Test client whose sync and async sessions both use the test database"""
+    async def override_get_async_db():
+        async with async_db() as session:
+            yield session
+
+    def override_get_db():
+        with TestingSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def async_user(async_db):
+    """Create a user with an emergency contact and return it with an auth header"""
+    with TestingSessionLocal() as db:
+        user = User(email="async@example.com", full_name="Async User", hashed_password=get_password_hash("password123"))
+        db.add(user)
+        db.commit()
+        db.add(EmergencyContact(user_id=user.id, contact_name="Friend", contact_email="friend@example.com"))
+        db.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+        return user.id, headers
+
+
+def test_async_database_url():
+    assert to_async_database_url("postgresql://u:p@db:5432/lumora") == "postgresql+asyncpg://u:p@db:5432/lumora"
+    assert to_async_database_url("postgresql+psycopg2://u:p@db/lumora") == "postgresql+asyncpg://u:p@db/lumora"
+    assert to_async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    with pytest.raises(ValueError):
+        to_async_database_url("mysql://u:p@db/lumora")
+
+
+def test_async_auth_routes(async_client, async_user):
+    user_id, headers = async_user
+
+    response = async_client.get("/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["id"] == user_id
+    assert response.json()["emergency_contact_name"] == "Friend"
+    assert async_client.get("/auth/me", headers={"Authorization": "Bearer invalid"}).status_code == 401
+
+    response = async_client.post("/auth/login-json", json={"email": "async@example.com", "password": "password123"})
+    assert response.status_code == 200
+    assert response.json()["user_id"] == user_id
+    response = async_client.post("/auth/login-json", json={"email": "async@example.com", "password": "wrongpassword"})
+    assert response.status_code == 401
+
+
+def test_async_profile_and_emergency_contact_routes(async_client, async_user):
+    _, headers = async_user
+
+    response = async_client.put("/user/profile", json={"full_name": "Renamed"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Renamed"
+    assert response.json()["emergency_contact_email"] == "friend@example.com"
+
+    response = async_client.get("/user/profile", headers=headers)
+    assert response.json()["full_name"] == "Renamed"
+    assert response.json()["emergency_contact"]["contact_name"] == "Friend"
+
+    response = async_client.put("/emergency-contact/", json={"contact_name": "Sibling"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["contact_name"] == "Sibling"
+    assert async_client.delete("/emergency-contact/", headers=headers).status_code == 204
+    assert async_client.get("/emergency-contact/", headers=headers).status_code == 404
+
+
+def test_latest_risk_result_async(async_client, async_db, async_user):
+    """The risk query behind the chatbot context (its mood queries need PostgreSQL)"""
+    from app.crud.depression_risk_result import get_latest_risk_result_by_user_async
+
+    user_id, headers = async_user
+    with TestingSessionLocal() as db:
+        now = datetime.utcnow()
+        db.add_all([
+            DepressionRiskResult(user_id=user_id, risk_level="High", risk_score=0.8, created_at=now - timedelta(days=1)),
+            DepressionRiskResult(user_id=user_id, risk_level="Low", risk_score=0.2, created_at=now),
+        ])
+        db.commit()
+
+    async def latest():
+        async with async_db() as session:
+            return await get_latest_risk_result_by_user_async(session, user_id)
+
+    assert asyncio.run(latest()).risk_score == 0.2
+    assert async_client.get("/chatbot/conversation/history", headers=headers).json() == []
+
+
+def test_sync_routes_still_authenticate_with_sync_session(async_client, async_user):
+    _, headers = async_user
+    response = async_client.get("/push-notifications/status", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"push_enabled": True, "token_registered": False}
+    assert async_client.get("/push-notifications/status").status_code == 401
+
+
+def test_pool_options_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", True)
+    options = pool_options("postgresql://u:p@db/lumora")
+    assert options["poolclass"] is TimedQueuePool
+    assert options["pool_size"] == 20
+    assert options["pool_pre_ping"] is True
+    assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert options["pool_recycle"] == settings.DB_POOL_RECYCLE_SECONDS
+    # SQLite keeps its own pool class and sizing
+    assert set(pool_options("sqlite:///./test.db")) == {"pool_pre_ping", "pool_recycle"}
+    assert "poolclass" in pool_options(to_async_database_url("postgresql://u:p@db/lumora"), is_async=True)
+
+
+def test_pool_monitor_reports_checkouts_overflow_and_timeouts():
+    pool_engine = create_engine(
+        TEST_DATABASE_URL, poolclass=TimedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05
+    )
+    monitor = PoolMonitor()
+    monitor.watch("test", pool_engine)
+    try:
+        first, second = pool_engine.connect(), pool_engine.connect()
+        with pytest.raises(exc.TimeoutError):
+            pool_engine.connect()
+        stats = monitor.stats()["test"]
+        assert stats["checked_out"] == 2
+        assert stats["overflow"] == 1
+        assert stats["connects"] == 2
+        assert stats["checkouts"] == 2
+        assert stats["timeouts"] == 1
+        assert 'lumora_db_pool_checked_out{pool="test"} 2' in monitor.render()
+
+        # The timed-out checkout waited for pool_timeout
+        assert DB_POOL_WAIT_SECONDS.snapshot()["test"]["count"] == 3
+        assert DB_POOL_WAIT_SECONDS.snapshot()["test"]["sum"] >= 0.05
+
+        first.close()
+        second.close()
+        assert monitor.stats()["test"]["checked_out"] == 0
+        pool_engine.dispose()
+        with pool_engine.connect():
+            assert monitor.stats()["test"]["checked_out"] == 1
+    finally:
+        pool_engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def replica(async_db, monkeypatch):
+    """A second SQLite database standing in for READ_DATABASE_URL"""
+    replica_engine = create_engine("sqlite:///./test_replica.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=replica_engine, tables=DB_TABLES)
+    ReplicaSession = sessionmaker(bind=replica_engine)
+    monkeypatch.setattr(database, "ReadSessionLocal", ReplicaSession)
+    try:
+        yield ReplicaSession
+    finally:
+        database.recent_writes.clear()
+        Base.metadata.drop_all(bind=replica_engine, tables=DB_TABLES)
+        replica_engine.dispose()
+        os.remove("test_replica.db")
+
+
+def test_read_routes_use_replica_until_user_writes(async_client, async_user, replica):
+    user_id, headers = async_user
+    with replica() as db:
+        # Lagging replica: it has the user but not the notification below
+        db.add(User(id=user_id, email="async@example.com", full_name="Replica", hashed_password="x"))
+        db.commit()
+    with TestingSessionLocal() as db:
+        db.add(Notification(user_id=user_id, type="reminder", title="Check in", message="How are you?"))
+        db.commit()
+
+    assert async_client.get("/notifications/", headers=headers).json()["items"] == []
+    consistent = async_client.get("/notifications/", headers={**headers, "X-Consistent-Read": "true"})
+    assert [item["title"] for item in consistent.json()["items"]] == ["Check in"]
+
+    database.recent_writes.record(user_id)
+    assert len(async_client.get("/notifications/", headers=headers).json()["items"]) == 1
+
+
+def test_track_user_writes_records_successful_writes():
+    database.recent_writes.clear()
+    token = create_access_token(data={"sub": "42"})
+
+    def request(method):
+        return Request({
+            "type": "http",
+            "method": method,
+            "path": "/moods/",
+            "headers": [(b"authorization", f"Bearer {token}".encode())],
+        })
+
+    def responding(status_code):
+        async def call_next(request):
+            return Response(status_code=status_code)
+        return call_next
+
+    try:
+        asyncio.run(track_user_writes(request("GET"), responding(200)))
+        asyncio.run(track_user_writes(request("POST"), responding(422)))
+        assert not database.recent_writes.is_recent(42)
+        asyncio.run(track_user_writes(request("POST"), responding(200)))
+        assert database.recent_writes.is_recent(42)
+    finally:
+        database.recent_writes.clear()
+
+
+def test_recent_writes_window():
+    writes = RecentWrites(window=0.05, max_users=2)
+    writes.record(1)
+    assert writes.is_recent(1)
+    assert not writes.is_recent(2)
+    time.sleep(0.06)
+    assert not writes.is_recent(1)
+    writes.record(2)
+    writes.record(3)  # over max_users: user 1 is forgotten
+    assert set(writes._last_write) == {2, 3}
@@ -0,0 +1,1019 @@
+"""
+Tests for the depression risk prediction service and endpoints
+
+To run tests:
+    pytest tests/test_ml.py -v
+"""
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import Base, get_db
+from app.main import app
+from app.models.depression_risk_result import DepressionRiskResult
+from app.models.depression_test import DepressionTest
+from app.services.prediction_service import (
+    FEATURE_MAPPING,
+    FEATURE_ORDER,
+    LogisticScoringEngine,
+    PredictionService,
+    prediction_service,
+)
+from tests.conftest import engine, TestingSessionLocal
+
+
+SAMPLE_TEST = {
+    "mood": "Sad",
+    "sleep_hour": "4-5 hours",
+    "appetite": "Less than usual",
+    "exercise": "None",
+    "screen_time": "7 or more hours",
+    "academic_work": "8 or more hours",
+    "socialize": "Very little",
+    "energy_level": 1,
+    "trouble_concentrating": "All day",
+    "negative_thoughts": "Yes",
+    "decision_making": "Foggy",
+    "bothered_things": "Yes",
+    "stressful_events": "Yes",
+    "sleepy_tired": "Very sleepy or tired",
+    "future_hope": "No hope at all",
+}
+
+HEALTHY_TEST = {
+    "mood": "Happy",
+    "sleep_hour": "8 or more hours",
+    "appetite": "Usual",
+    "exercise": "30 - 60 minutes",
+    "screen_time": "Less than 2 hours",
+    "academic_work": "4 - 5 hours",
+    "socialize": "High",
+    "energy_level": 4,
+    "trouble_concentrating": "Not at all",
+    "negative_thoughts": "No",
+    "decision_making": "Clear",
+    "bothered_things": "No",
+    "stressful_events": "No",
+    "sleepy_tired": "Not at all",
+    "future_hope": "Very hopeful",
+}
+
+# mood_journaling uses a PostgreSQL ARRAY column, so only create the tables these tests need
+ML_TABLES = [
+    Base.metadata.tables["users"],
+    Base.metadata.tables["depression_tests"],
+    Base.metadata.tables["depression_risk_results"],
+]
+
+
+@pytest.fixture(scope="module")
+def sklearn_service():
+    """Prediction service loaded from the pickled sklearn model and encoders"""
+    service = PredictionService()
+    service.load_sklearn_models()
+    return service
+
+
+@pytest.fixture(scope="function")
+def ml_db():
+    """Create the user/test/result tables for each test"""
+    Base.metadata.create_all(bind=engine, tables=ML_TABLES)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine, tables=ML_TABLES)
+
+
+@pytest.fixture(scope="function")
+def ml_user(ml_db):
+    """Create a user and return it with an auth header"""
+    from app.models.user import User
+    from app.utils.security import create_access_token
+
+    user = User(email="ml@example.com", full_name="ML User", hashed_password="x")
+    ml_db.add(user)
+    ml_db.commit()
+    ml_db.refresh(user)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+    return user, headers
+
+
+@pytest.fixture(scope="function")
+def ml_client(ml_db):
+    """Test client bound to the ML test database"""
+    def override_get_db():
+        yield ml_db
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_batch_prediction_matches_single_predictions():
+    """Scoring a batch gives the same result as scoring each test alone"""
+    tests = [SAMPLE_TEST, HEALTHY_TEST, {}]
+    batch = prediction_service.predict_depression_risk_batch(tests)
+    single = [prediction_service.predict_depression_risk(test) for test in tests]
+
+    assert len(batch) == len(tests)
+    for batch_prediction, prediction in zip(batch, single):
+        assert batch_prediction.risk_score == pytest.approx(prediction.risk_score)
+        assert batch_prediction.risk_level == prediction.risk_level
+        assert batch_prediction.model_version == prediction_service.model_version
+
+
+def test_batch_prediction_empty():
+    assert prediction_service.predict_depression_risk_batch([]) == []
+
+
+def test_predict_batch_endpoint(ml_client, ml_db, ml_user):
+    """Stored tests and raw payloads are scored and saved in one request"""
+    user, headers = ml_user
+    stored = DepressionTest(user_id=user.id, **SAMPLE_TEST)
+    ml_db.add(stored)
+    ml_db.commit()
+
+    response = ml_client.post(
+        "/depression-risk-results/predict-batch",
+        json={
+            "depression_test_ids": [stored.depression_test_id],
+            "tests": [dict(HEALTHY_TEST, user_id=user.id), dict(SAMPLE_TEST, user_id=user.id)],
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert len(data) == 3
+    assert data[0]["depression_test_id"] == stored.depression_test_id
+    assert data[0]["risk_score"] == pytest.approx(data[2]["risk_score"])
+    assert data[1]["risk_level"] == prediction_service.predict_depression_risk(HEALTHY_TEST).risk_level
+    assert {item["model_version"] for item in data} == {prediction_service.model_version}
+
+    assert ml_db.query(DepressionTest).count() == 3
+    assert ml_db.query(DepressionRiskResult).count() == 3
+
+
+def test_predict_batch_endpoint_rejects_other_users_tests(ml_client, ml_db, ml_user):
+    user, headers = ml_user
+    response = ml_client.post(
+        "/depression-risk-results/predict-batch",
+        json={"tests": [dict(SAMPLE_TEST, user_id=user.id + 1)]},
+        headers=headers,
+    )
+    assert response.status_code == 403
+    assert ml_db.query(DepressionTest).count() == 0
+
+
+def test_predict_batch_endpoint_missing_test(ml_client, ml_user):
+    _, headers = ml_user
+    response = ml_client.post(
+        "/depression-risk-results/predict-batch",
+        json={"depression_test_ids": [12345]},
+        headers=headers,
+    )
+    assert response.status_code == 404
+
+
+def _sklearn_encode(encoders, test_data):
+    """Reference encoding using one LabelEncoder.transform call per feature"""
+    processed = {}
+    for db_field, feature in FEATURE_MAPPING.items():
+        value = test_data.get(db_field)
+        if feature in encoders and value is not None:
+            try:
+                processed[feature] = encoders[feature].transform([str(value)])[0]
+            except ValueError:
+                processed[feature] = 0
+        else:
+            processed[feature] = value if value is not None else 0
+    return [processed.get(feature, 0) for feature in FEATURE_ORDER]
+
+
+def test_lookup_encoder_matches_label_encoders(sklearn_service):
+    """Lookup tables encode every known, unknown and missing answer like sklearn"""
+    encoders = sklearn_service.encoders
+    tests = [SAMPLE_TEST, HEALTHY_TEST, {}, dict(SAMPLE_TEST, mood="Unknown mood", energy_level=None)]
+    # One test per known answer of every categorical feature
+    for db_field, feature in FEATURE_MAPPING.items():
+        encoder = encoders.get(feature)
+        if encoder is not None:
+            tests += [{db_field: label} for label in encoder.classes_]
+
+    expected = np.array([_sklearn_encode(encoders, test) for test in tests], dtype=float)
+
+    for service in (sklearn_service, prediction_service):
+        encoded = service.preprocess_depression_tests(tests)
+        assert encoded.shape == (len(tests), 15)
+        np.testing.assert_array_equal(encoded, expected)
+        np.testing.assert_array_equal(service.preprocess_depression_test(SAMPLE_TEST), expected[:1])
+
+
+def _random_encoded_matrix(n_rows, seed=0):
+    rng = np.random.RandomState(seed)
+    return rng.randint(0, 8, size=(n_rows, len(FEATURE_ORDER))).astype(float)
+
+
+def test_closed_form_scoring_matches_predict_proba(sklearn_service):
+    """NumPy scoring of the shipped model matches sklearn predict_proba"""
+    X = _random_encoded_matrix(500)
+    expected = sklearn_service.model.predict_proba(X)[:, 1]
+
+    prediction_service.ensure_loaded()
+    for service in (sklearn_service, prediction_service):
+        engine = service.scoring_engine
+        assert engine.is_closed_form
+        np.testing.assert_allclose(engine.predict_proba(X), expected, rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(engine.predict_proba(X[:1]), expected[:1], rtol=1e-12, atol=1e-12)
+
+
+def test_closed_form_scoring_multinomial_logistic_regression():
+    from sklearn.linear_model import LogisticRegression
+
+    X = _random_encoded_matrix(200, seed=1)
+    y = (X[:, 0] + X[:, 1] > 7).astype(int)
+    model = LogisticRegression(multi_class="multinomial").fit(X, y)
+
+    engine = LogisticScoringEngine(model)
+    assert engine.is_closed_form
+    np.testing.assert_allclose(engine.predict_proba(X), model.predict_proba(X)[:, 1], rtol=1e-9)
+
+
+def test_scoring_engine_falls_back_for_non_linear_models():
+    from sklearn.tree import DecisionTreeClassifier
+
+    X = _random_encoded_matrix(200, seed=2)
+    y = (X[:, 0] > 3).astype(int)
+    model = DecisionTreeClassifier(random_state=0).fit(X, y)
+
+    engine = LogisticScoringEngine(model)
+    assert not engine.is_closed_form
+    np.testing.assert_array_equal(engine.predict_proba(X), model.predict_proba(X)[:, 1])
+
+
+def test_export_and_load_compact_artifact(sklearn_service, tmp_path):
+    """A freshly exported artifact predicts exactly like the pickles"""
+    from app.config import settings
+    from app.services.model_artifact import export_model_artifact
+
+    output_path = tmp_path / "risk_model.json"
+    compact = export_model_artifact(settings.MODEL_PATH, settings.ENCODERS_PATH, str(output_path))
+    assert compact.model_version == sklearn_service.model_version
+
+    service = PredictionService()
+    service.load_compact_model(str(output_path))
+    assert service.model is None
+    assert service.model_version == compact.model_version
+
+    tests = [SAMPLE_TEST, HEALTHY_TEST, {}]
+    assert service.predict_depression_risk_batch(tests) == pytest.approx(
+        sklearn_service.predict_depression_risk_batch(tests)
+    )
+
+
+def test_compact_artifact_loads_without_sklearn():
+    """Importing the prediction service with the shipped artifact never imports sklearn"""
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "from app.services.prediction_service import prediction_service\n"
+        "prediction_service.ensure_loaded()\n"
+        "assert prediction_service.model is None\n"
+        "assert 'sklearn' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_models_load_lazily_once_across_threads(monkeypatch):
+    """Concurrent first predictions load the model exactly once"""
+    import threading
+
+    service = PredictionService()
+    assert not service.is_ready
+
+    load_calls = []
+    original_load = service.load_compact_model
+
+    def counting_load(path):
+        load_calls.append(path)
+        original_load(path)
+
+    monkeypatch.setattr(service, "load_compact_model", counting_load)
+
+    threads = [threading.Thread(target=service.predict_depression_risk, args=(SAMPLE_TEST,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert service.is_ready
+    assert len(load_calls) == 1
+
+
+def test_missing_model_fails_on_use_not_import(monkeypatch, tmp_path):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "MODEL_ARTIFACT_PATH", str(tmp_path / "missing.json"))
+    monkeypatch.setattr(settings, "MODEL_PATH", str(tmp_path / "missing.pkl"))
+    monkeypatch.setattr(settings, "ENCODERS_PATH", str(tmp_path / "missing_encoders.pkl"))
+
+    service = PredictionService()
+    with pytest.raises(FileNotFoundError):
+        service.ensure_loaded()
+    assert not service.is_ready
+    assert "No model found" in service.load_error
+
+
+def test_readiness_endpoint(monkeypatch):
+    from app import main
+
+    client = TestClient(app)
+    service = PredictionService()
+    monkeypatch.setattr(main, "prediction_service", service)
+
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "loading"
+
+    service.ensure_loaded()
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready", "model_version": service.model_version}
+
+
+@pytest.fixture
+def model_files(monkeypatch, tmp_path):
+    """Point the model settings at a copy of the shipped artifact in tmp_path"""
+    import shutil
+    from app.config import settings
+
+    artifact_path = tmp_path / "risk_model.json"
+    shutil.copy(settings.MODEL_ARTIFACT_PATH, artifact_path)
+    monkeypatch.setattr(settings, "MODEL_ARTIFACT_PATH", str(artifact_path))
+    monkeypatch.setattr(settings, "MODEL_PATH", str(tmp_path / "missing.pkl"))
+    monkeypatch.setattr(settings, "ENCODERS_PATH", str(tmp_path / "missing_encoders.pkl"))
+    return artifact_path
+
+
+def _write_artifact_version(artifact_path, model_version, coef_scale=1.0):
+    """Rewrite the artifact as a new model version with scaled coefficients"""
+    import json
+
+    data = json.loads(artifact_path.read_text())
+    data["model_version"] = model_version
+    data["coef"] = [value * coef_scale for value in data["coef"]]
+    data["intercept"] *= coef_scale
+    artifact_path.write_text(json.dumps(data))
+
+
+def test_registry_swaps_in_new_model_version(model_files):
+    from app.services.model_registry import ModelRegistry
+
+    service = PredictionService()
+    registry = ModelRegistry(service)
+    old_version = service.ensure_loaded().model_version
+    assert registry.reload()["status"] == "unchanged"
+
+    in_flight = service.active_model
+    _write_artifact_version(model_files, "retrained-v2", coef_scale=1.01)
+    result = registry.reload()
+
+    assert result["status"] == "activated"
+    assert result["previous_version"] == old_version
+    assert result["validation"]["agreement"] >= result["validation"]["min_agreement"]
+    assert service.predict_depression_risk(SAMPLE_TEST).model_version == "retrained-v2"
+    # A snapshot taken before the swap keeps scoring with the old version
+    assert in_flight.model_version == old_version
+    assert registry.status()["history"][-1]["model_version"] == "retrained-v2"
+
+
+def test_registry_rejects_model_failing_golden_set(model_files):
+    from app.services.model_registry import ModelRegistry, ModelValidationError
+
+    service = PredictionService()
+    registry = ModelRegistry(service)
+    old_version = service.ensure_loaded().model_version
+
+    _write_artifact_version(model_files, "broken-v2", coef_scale=-1.0)
+    with pytest.raises(ModelValidationError) as exc_info:
+        registry.reload()
+
+    assert exc_info.value.report["mismatches"]
+    assert service.model_version == old_version
+    assert registry.status()["last_reload"]["status"] == "failed"
+
+
+def test_registry_reloads_when_model_files_change(model_files):
+    import os
+    from app.services.model_registry import ModelRegistry
+
+    service = PredictionService()
+    service.ensure_loaded()
+    registry = ModelRegistry(service)
+    registry.start_watching()
+    registry.stop_watching()
+    assert not registry.check_for_changes()
+
+    _write_artifact_version(model_files, "retrained-v3")
+    stat = os.stat(model_files)
+    os.utime(model_files, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert registry.check_for_changes()
+    assert service.model_version == "retrained-v3"
+
+
+def test_model_admin_endpoints_require_token(monkeypatch, model_files):
+    from app.config import settings
+    from app.services import model_registry as registry_module
+
+    client = TestClient(app)
+    service = PredictionService()
+    monkeypatch.setattr(registry_module.model_registry, "service", service)
+
+    assert client.post("/models/reload").status_code == 403
+
+    monkeypatch.setattr(settings, "MODEL_ADMIN_TOKEN", "secret")
+    assert client.post("/models/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    response = client.post("/models/reload", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "activated"
+    response = client.get("/models/active", headers={"X-Admin-Token": "secret"})
+    assert response.json()["model_version"] == service.model_version
+
+
+def test_batcher_coalesces_concurrent_predictions():
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services.prediction_batcher import PredictionBatcher
+
+    service = PredictionService(cache_size=0)
+    batcher = PredictionBatcher(service, max_batch_size=64, max_wait_ms=50, enabled=True)
+    tests = [SAMPLE_TEST, HEALTHY_TEST, {}, dict(SAMPLE_TEST, mood="Happy")] * 8
+    try:
+        with ThreadPoolExecutor(max_workers=len(tests)) as pool:
+            predictions = list(pool.map(batcher.predict, tests))
+    finally:
+        batcher.stop()
+
+    assert predictions == service.predict_depression_risk_batch(tests)
+    assert batcher.requests == len(tests)
+    assert batcher.batches < len(tests)
+
+
+def test_batcher_isolates_failing_request():
+    from app.services.prediction_batcher import PredictionBatcher
+
+    batcher = PredictionBatcher(PredictionService(cache_size=0), max_batch_size=2, max_wait_ms=1000, enabled=True)
+    try:
+        bad = batcher.submit(dict(SAMPLE_TEST, energy_level="not a number"))
+        good = batcher.submit(SAMPLE_TEST)
+        assert good.result(timeout=5) == prediction_service.predict_depression_risk(SAMPLE_TEST)
+        with pytest.raises(ValueError):
+            bad.result(timeout=5)
+    finally:
+        batcher.stop()
+    assert batcher.batches == 1
+
+
+def test_batcher_disabled_calls_service_directly():
+    from app.services.prediction_batcher import PredictionBatcher
+
+    batcher = PredictionBatcher(prediction_service, enabled=False)
+    assert batcher.predict(SAMPLE_TEST) == prediction_service.predict_depression_risk(SAMPLE_TEST)
+    assert batcher.batches == 0
+
+
+def test_prediction_cache_serves_repeat_answers():
+    service = PredictionService(cache_size=100)
+    uncached = PredictionService(cache_size=0)
+    tests = [SAMPLE_TEST, HEALTHY_TEST, {}, dict(SAMPLE_TEST, energy_level=2)]
+
+    first = service.predict_depression_risk_batch(tests)
+    again = service.predict_depression_risk_batch(tests + [dict(HEALTHY_TEST)])
+
+    assert first == uncached.predict_depression_risk_batch(tests)
+    assert again[:4] == first
+    stats = service.cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (5, 4, 4)
+
+
+def test_prediction_cache_evicts_least_recently_used():
+    service = PredictionService(cache_size=2)
+    for energy_level in (1, 2, 1, 3):
+        service.predict_depression_risk(dict(SAMPLE_TEST, energy_level=energy_level))
+
+    stats = service.cache.stats()
+    assert (stats["hits"], stats["evictions"], stats["size"]) == (1, 1, 2)
+    # energy_level=2 was least recently used, so it was evicted
+    service.predict_depression_risk(dict(SAMPLE_TEST, energy_level=1))
+    assert service.cache.stats()["hits"] == 2
+
+
+def test_prediction_cache_invalidated_on_model_swap(model_files):
+    from app.services.model_registry import ModelRegistry
+
+    service = PredictionService(cache_size=100)
+    old = service.predict_depression_risk(SAMPLE_TEST)
+    assert service.cache.stats()["size"] == 1
+
+    _write_artifact_version(model_files, "retrained-v4", coef_scale=1.01)
+    ModelRegistry(service).reload()
+    assert service.cache.stats()["size"] == 0
+
+    new = service.predict_depression_risk(SAMPLE_TEST)
+    assert new.model_version == "retrained-v4"
+    assert new.risk_score != old.risk_score
+
+
+def test_batcher_answers_cache_hits_without_queueing():
+    from app.services.prediction_batcher import PredictionBatcher
+
+    service = PredictionService(cache_size=100)
+    expected = service.predict_depression_risk(SAMPLE_TEST)
+    batcher = PredictionBatcher(service, enabled=True)
+
+    assert batcher.predict(SAMPLE_TEST) == expected
+    assert batcher.batches == 0
+    assert service.cache.stats()["hits"] == 1
+
+
+def test_rescore_tool_scores_each_test_once_and_resumes(ml_db, ml_user, tmp_path, monkeypatch):
+    import json
+    from app.crud.depression_risk_result import get_daily_risk_results
+    from app.tools.rescore import rescore_tests
+
+    user, _ = ml_user
+    tests = [DepressionTest(user_id=user.id, **test) for test in (SAMPLE_TEST, HEALTHY_TEST, {}, SAMPLE_TEST, {})]
+    ml_db.add_all(tests)
+    ml_db.flush()
+    ml_db.add(DepressionRiskResult(
+        user_id=user.id,
+        depression_test_id=tests[0].depression_test_id,
+        risk_level="Low",
+        risk_score=0.1,
+        model_version="old-version",
+    ))
+    ml_db.commit()
+
+    checkpoint_path = tmp_path / "checkpoint.json"
+    live_drift = _drift_monitor(tmp_path)
+    monkeypatch.setattr(prediction_service, "drift_monitor", live_drift)
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupt_after_first_chunk(message):
+        raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        rescore_tests(engine, chunk_size=2, checkpoint_path=str(checkpoint_path), progress=interrupt_after_first_chunk)
+    assert json.loads(checkpoint_path.read_text())["last_depression_test_id"] == tests[1].depression_test_id
+
+    checkpoint = rescore_tests(engine, chunk_size=2, checkpoint_path=str(checkpoint_path), progress=lambda _: None)
+    assert checkpoint["rows_scored"] == len(tests)
+    assert rescore_tests(engine, chunk_size=2, progress=lambda _: None)["rows_scored"] == 0
+
+    version = checkpoint["model_version"]
+    assert version == prediction_service.ensure_loaded().model_version
+    rescored = ml_db.query(DepressionRiskResult).filter_by(model_version=version).all()
+    assert sorted(result.depression_test_id for result in rescored) == sorted(t.depression_test_id for t in tests)
+    assert {result.depression_test_id: result.risk_level for result in rescored}[tests[0].depression_test_id] == "High"
+    # Re-scoring history does not feed the live drift counters
+    live_drift.flush()
+    assert live_drift.observations == 0
+
+    # User-facing reads only show the newest result of each test
+    daily = get_daily_risk_results(ml_db, user.id)
+    assert len(daily) == len(tests)
+    assert all(item["risk_score"] != 0.1 for item in daily)
+
+
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+def test_prediction_executor_modes_match_inline(mode):
+    import asyncio
+    from app.services.prediction_executor import PredictionExecutor
+
+    tests = [SAMPLE_TEST, HEALTHY_TEST, {}]
+    expected = prediction_service.predict_depression_risk_batch(tests)
+    executor = PredictionExecutor(prediction_service, mode=mode, max_workers=1)
+    try:
+        executor.start()
+        assert executor.predict_batch(tests) == expected
+        assert asyncio.run(executor.predict_async(SAMPLE_TEST)) == expected[0]
+    finally:
+        executor.shutdown()
+
+
+def test_prediction_executor_rejects_unknown_mode():
+    from app.services.prediction_executor import PredictionExecutor
+
+    with pytest.raises(ValueError):
+        PredictionExecutor(prediction_service, mode="gpu")
+
+
+def test_prediction_stages_exposed_as_histograms():
+    from app.services.metrics import PREDICTION_STAGE_SECONDS, Histogram
+
+    PREDICTION_STAGE_SECONDS.reset()
+    PredictionService(cache_size=10).predict_depression_risk_batch([SAMPLE_TEST, HEALTHY_TEST])
+    stages = PREDICTION_STAGE_SECONDS.snapshot()
+    assert {"load_model", "cache_lookup", "encode", "score"} <= set(stages)
+    assert stages["encode"]["count"] == 1
+    assert stages["cache_lookup"]["count"] == 1
+
+    # What-if scoring has its own stage, so it does not skew live scoring latency
+    prediction_service.what_if(SAMPLE_TEST)
+    stages = PREDICTION_STAGE_SECONDS.snapshot()
+    assert stages["what_if_score"]["count"] == 1
+    assert stages["score"]["count"] == 1
+
+    histogram = Histogram("test_seconds", "Test histogram", label="stage", buckets=(0.1, 1.0), registered=False)
+    histogram.observe("a", 0.05)
+    histogram.observe("a", 0.5)
+    histogram.observe("a", 5.0)
+    assert histogram.render()[2:] == [
+        'test_seconds_bucket{stage="a",le="0.1"} 1',
+        'test_seconds_bucket{stage="a",le="1"} 2',
+        'test_seconds_bucket{stage="a",le="+Inf"} 3',
+        'test_seconds_sum{stage="a"} 5.550000000',
+        'test_seconds_count{stage="a"} 3',
+    ]
+
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert 'lumora_prediction_stage_seconds_count{stage="encode"}' in response.text
+
+
+def test_explanation_contributions_add_up_to_score():
+    import math
+
+    tests = [SAMPLE_TEST, HEALTHY_TEST, {}, dict(SAMPLE_TEST, mood="Unknown mood")]
+    for test, prediction in zip(tests, prediction_service.predict_depression_risk_batch(tests)):
+        explanation = prediction_service.explain_depression_risk(test, prediction.model_version)
+        contributions = explanation["contributions"]
+        assert len(contributions) == len(FEATURE_MAPPING)
+        assert explanation["log_odds"] == pytest.approx(
+            explanation["baseline"] + sum(item["contribution"] for item in contributions)
+        )
+        assert 1 / (1 + math.exp(-explanation["log_odds"])) == pytest.approx(prediction.risk_score)
+        magnitudes = [abs(item["contribution"]) for item in contributions]
+        assert magnitudes == sorted(magnitudes, reverse=True)
+
+    assert prediction_service.explain_depression_risk(SAMPLE_TEST, "another-version") is None
+
+
+def test_predict_endpoint_explain_mode(ml_client, ml_db, ml_user):
+    user, headers = ml_user
+    stored = DepressionTest(user_id=user.id, **SAMPLE_TEST)
+    ml_db.add(stored)
+    ml_db.commit()
+
+    response = ml_client.post(f"/depression-risk-results/predict/{stored.depression_test_id}", headers=headers)
+    assert response.status_code == 201
+    assert response.json()["explanation"] is None
+
+    response = ml_client.post(
+        f"/depression-risk-results/predict/{stored.depression_test_id}?explain=true", headers=headers
+    )
+    assert response.status_code == 200
+    explanation = response.json()["explanation"]
+    assert {item["feature"] for item in explanation["contributions"]} == set(FEATURE_MAPPING)
+
+    response = ml_client.post(
+        "/depression-risk-results/predict-batch?explain=true",
+        json={"depression_test_ids": [stored.depression_test_id]},
+        headers=headers,
+    )
+    assert response.json()[0]["explanation"] == explanation
+
+
+def test_predict_endpoint_returns_existing_result(ml_client, ml_db, ml_user):
+    """Retries reuse the result of the active model version instead of scoring again"""
+    user, headers = ml_user
+    stored = DepressionTest(user_id=user.id, **SAMPLE_TEST)
+    ml_db.add(stored)
+    ml_db.commit()
+
+    first = ml_client.post(f"/depression-risk-results/predict/{stored.depression_test_id}", headers=headers)
+    second = ml_client.post(f"/depression-risk-results/predict/{stored.depression_test_id}", headers=headers)
+    assert (first.status_code, second.status_code) == (201, 200)
+    assert second.json()["result_id"] == first.json()["result_id"]
+
+    response = ml_client.post(
+        "/depression-risk-results/predict-batch",
+        json={"depression_test_ids": [stored.depression_test_id, stored.depression_test_id]},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    assert [item["result_id"] for item in response.json()] == [first.json()["result_id"]] * 2
+    assert ml_db.query(DepressionRiskResult).count() == 1
+
+
+def test_concurrent_predict_requests_score_once(ml_db, ml_user, monkeypatch):
+    """Concurrent retries for the same test collapse into a single scoring and row"""
+    import threading
+
+    from fastapi import Response
+
+    from app.api import depression_risk_result as api
+
+    user, _ = ml_user
+    stored = DepressionTest(user_id=user.id, **SAMPLE_TEST)
+    ml_db.add(stored)
+    ml_db.commit()
+    test_id = stored.depression_test_id
+
+    scored = []
+    predict = api.prediction_batcher.predict
+
+    def counting_predict(test_data):
+        scored.append(test_data)
+        return predict(test_data)
+
+    monkeypatch.setattr(api.prediction_batcher, "predict", counting_predict)
+
+    result_ids, statuses = [], []
+    start = threading.Barrier(4)
+
+    def request():
+        db = TestingSessionLocal()
+        try:
+            response = Response(status_code=201)
+            start.wait()
+            result = api.predict_and_save_risk_result(test_id, response, current_user=user, db=db)
+            result_ids.append(result.result_id)
+            statuses.append(response.status_code)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(scored) == 1
+    assert len(set(result_ids)) == 1 and len(result_ids) == 4
+    assert sorted(statuses) == [200, 200, 200, 201]
+    assert ml_db.query(DepressionRiskResult).count() == 1
+
+
+def test_get_or_create_risk_result_recovers_from_unique_violation(ml_db, ml_user):
+    """A row inserted by another worker in between is returned instead of a second one"""
+    from app.crud.depression_risk_result import get_or_create_risk_result
+
+    user, _ = ml_user
+    stored = DepressionTest(user_id=user.id, **SAMPLE_TEST)
+    ml_db.add(stored)
+    ml_db.commit()
+    existing = DepressionRiskResult(
+        user_id=user.id, depression_test_id=stored.depression_test_id,
+        risk_level="High", risk_score=0.9, model_version="v1",
+    )
+    ml_db.add(existing)
+    ml_db.commit()
+
+    result, created = get_or_create_risk_result(
+        ml_db, user.id, "Low", 0.1, stored.depression_test_id, model_version="v1"
+    )
+    assert not created
+    assert result.result_id == existing.result_id
+
+    result, created = get_or_create_risk_result(
+        ml_db, user.id, "Low", 0.1, stored.depression_test_id, model_version="v2"
+    )
+    assert created
+    assert ml_db.query(DepressionRiskResult).count() == 2
+
+
+def test_what_if_matches_individual_predictions():
+    test = dict(HEALTHY_TEST, mood=None)
+    what_if = prediction_service.what_if(test)
+
+    expected_count = sum(
+        len(values) - (test.get(db_field) in values)
+        for db_field, values in (
+            (db_field, prediction_service.lookup_encoder.vocabularies.get(feature, [1, 2, 3, 4, 5]))
+            for db_field, feature in FEATURE_MAPPING.items()
+        )
+    )
+    alternatives = what_if["alternatives"]
+    assert len(alternatives) == expected_count
+    assert what_if["risk_score"] == pytest.approx(prediction_service.predict_depression_risk(test).risk_score)
+
+    for item in alternatives[:3] + alternatives[-3:]:
+        changed = dict(test, **{item["feature"]: item["answer"]})
+        assert item["risk_score"] == pytest.approx(prediction_service.predict_depression_risk(changed).risk_score)
+        assert item["change"] == pytest.approx(item["risk_score"] - what_if["risk_score"])
+    assert [item["change"] for item in alternatives] == sorted(item["change"] for item in alternatives)
+
+
+def test_what_if_endpoint(ml_client, ml_db, ml_user):
+    user, headers = ml_user
+    stored = DepressionTest(user_id=user.id, **SAMPLE_TEST)
+    other = DepressionTest(user_id=user.id + 1, **SAMPLE_TEST)
+    ml_db.add_all([stored, other])
+    ml_db.commit()
+
+    response = ml_client.get(f"/depression-risk-results/what-if/{stored.depression_test_id}", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["risk_level"] == "High"
+    assert data["alternatives"][0]["change"] < 0
+    assert ml_db.query(DepressionRiskResult).count() == 0
+
+    response = ml_client.get(f"/depression-risk-results/what-if/{other.depression_test_id}", headers=headers)
+    assert response.status_code == 403
+
+
+def _drift_monitor(tmp_path, **kwargs):
+    from app.services.drift_monitor import DriftMonitor
+
+    return DriftMonitor(
+        list(FEATURE_MAPPING),
+        state_path=str(tmp_path / "drift_state.json"),
+        reference_path=str(tmp_path / "drift_reference.json"),
+        **kwargs,
+    )
+
+
+def test_drift_monitor_counts_answers_in_constant_memory(tmp_path):
+    from app.services.drift_monitor import MAX_ANSWERS_PER_FEATURE, MISSING, OTHER
+
+    monitor = _drift_monitor(tmp_path)
+    features = list(FEATURE_MAPPING)
+    healthy = tuple(HEALTHY_TEST[feature] for feature in features)
+    monitor.observe([healthy] * 3000, [0.05] * 3000)
+    junk = [tuple(f"junk {index}" if column == 0 else None for column in range(len(features))) for index in range(100)]
+    monitor.observe(junk, [0.95] * 100)
+
+    stats = monitor.stats()
+    assert stats["observations"] == 3100
+    mood = stats["features"]["mood"]["counts"]
+    assert mood[HEALTHY_TEST["mood"]] == 3000
+    assert len(mood) == MAX_ANSWERS_PER_FEATURE + 1  # distinct answers up to the cap, then OTHER
+    assert mood[OTHER] == 100 - (MAX_ANSWERS_PER_FEATURE - 1)
+    assert stats["features"]["energy_level"]["counts"] == {str(HEALTHY_TEST["energy_level"]): 3000, MISSING: 100}
+    assert stats["score"]["histogram"][1] == 3000 and stats["score"]["histogram"][-1] == 100
+    assert stats["max_psi"] is None
+
+
+def test_drift_monitor_psi_against_reference(tmp_path):
+    monitor = _drift_monitor(tmp_path)
+    features = list(FEATURE_MAPPING)
+    healthy = tuple(HEALTHY_TEST[feature] for feature in features)
+    sad = tuple(SAMPLE_TEST[feature] for feature in features)
+
+    monitor.observe([healthy] * 900 + [sad] * 100, [0.1] * 900 + [0.9] * 100)
+    monitor.save_reference()
+    assert monitor.stats()["observations"] == 0
+
+    monitor.observe([healthy] * 880 + [sad] * 120, [0.1] * 880 + [0.9] * 120)
+    stats = monitor.stats()
+    assert stats["reference_observations"] == 1000
+    assert stats["features"]["mood"]["status"] == "stable"
+    assert stats["score"]["status"] == "stable"
+
+    monitor.observe([sad] * 2000, [0.9] * 2000)
+    stats = monitor.stats()
+    assert stats["features"]["mood"]["status"] == "significant"
+    assert stats["score"]["psi"] > 0.25
+    assert stats["max_psi"] >= stats["score"]["psi"]
+
+
+def test_drift_monitor_persists_and_restores(tmp_path):
+    monitor = _drift_monitor(tmp_path)
+    answers = tuple(SAMPLE_TEST[feature] for feature in FEATURE_MAPPING)
+    monitor.observe([answers] * 10, [0.9] * 10)
+    monitor.save()
+
+    restored = _drift_monitor(tmp_path)
+    assert restored.state()["features"] == monitor.state()["features"]
+    restored.observe([answers], [0.9])
+    assert restored.stats()["observations"] == 11
+
+
+@pytest.mark.parametrize("cache_size", [0, 100])
+def test_prediction_service_feeds_drift_monitor(tmp_path, cache_size):
+    monitor = _drift_monitor(tmp_path)
+    service = PredictionService(cache_size=cache_size, drift_monitor=monitor)
+    service.predict_depression_risk_batch([SAMPLE_TEST, HEALTHY_TEST])
+    service.predict_depression_risk(SAMPLE_TEST)
+
+    if cache_size:
+        # The batcher serves cache hits without scoring
+        assert service.get_cached_prediction(SAMPLE_TEST) is not None
+
+    stats = monitor.stats()
+    assert stats["observations"] == 3 + bool(cache_size)
+    assert stats["features"]["mood"]["counts"] == {"Sad": 2 + bool(cache_size), "Happy": 1}
+    assert sum(stats["score"]["histogram"]) == 3 + bool(cache_size)
+
+
+def test_drift_endpoints(monkeypatch, tmp_path):
+    from app.config import settings
+
+    monitor = _drift_monitor(tmp_path)
+    monkeypatch.setattr(prediction_service, "drift_monitor", monitor)
+    monkeypatch.setattr(settings, "MODEL_ADMIN_TOKEN", "secret")
+    client = TestClient(app)
+    headers = {"X-Admin-Token": "secret"}
+
+    assert client.get("/models/drift").status_code == 403
+    assert client.post("/models/drift/reference", headers=headers).status_code == 409
+
+    prediction_service.predict_depression_risk_batch([SAMPLE_TEST, HEALTHY_TEST])
+    response = client.get("/models/drift", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["observations"] == 2
+
+    assert client.post("/models/drift/reference", headers=headers).status_code == 200
+    response = client.get("/models/drift", headers=headers)
+    assert response.json()["reference_observations"] == 2
+    assert response.json()["observations"] == 0
+
+
+def test_shadow_evaluator_reports_agreement(tmp_path):
+    import json
+    import shutil
+    from app.config import settings
+    from app.services.shadow_evaluator import ShadowEvaluator
+
+    candidate_path = tmp_path / "candidate.json"
+    shutil.copy(settings.MODEL_ARTIFACT_PATH, candidate_path)
+    _write_artifact_version(candidate_path, "inverted", coef_scale=-1.0)
+
+    service = PredictionService(cache_size=0)
+    evaluator = ShadowEvaluator(max_queue_size=100, log_path=str(tmp_path / "shadow.jsonl"))
+    evaluator.load_candidate(str(candidate_path))
+    evaluator.attach(service)
+    try:
+        primary = service.predict_depression_risk_batch([SAMPLE_TEST, HEALTHY_TEST])
+        service.predict_depression_risk(SAMPLE_TEST)
+        evaluator.wait()
+    finally:
+        evaluator.stop()
+
+    # Users still get the primary model's scores
+    assert [prediction.risk_level for prediction in primary] == ["High", "Low"]
+    report = evaluator.report()
+    assert report["candidate_version"] == "inverted"
+    assert report["compared"] == 3
+    assert report["primary_versions"] == {service.model_version: 3}
+    assert report["level_agreement"] == 0.0
+    assert report["level_flips"] == {"High->Low": 2, "Low->High": 1}
+    # Negated coefficients score 1 - p, so each delta is 1 - 2p
+    assert report["score_delta"]["mean"] == pytest.approx(
+        sum(1 - 2 * p for p in [primary[0].risk_score, primary[1].risk_score, primary[0].risk_score]) / 3
+    )
+
+    records = [json.loads(line) for line in (tmp_path / "shadow.jsonl").read_text().splitlines()]
+    assert len(records) == 3
+    assert records[0]["candidate_score"] == pytest.approx(1 - records[0]["primary_score"])
+
+
+def test_shadow_evaluator_never_blocks_scoring(monkeypatch):
+    import threading
+    import time
+    from app.services.shadow_evaluator import ShadowEvaluator
+
+    comparing, release = threading.Event(), threading.Event()
+
+    def slow_compare(items):
+        comparing.set()
+        release.wait(5)
+
+    evaluator = ShadowEvaluator(max_queue_size=1, max_wait_ms=0)
+    evaluator.set_candidate(prediction_service.ensure_loaded())
+    monkeypatch.setattr(evaluator, "_compare", slow_compare)
+    service = PredictionService(cache_size=0)
+    evaluator.attach(service)
+    try:
+        service.predict_depression_risk(SAMPLE_TEST)
+        assert comparing.wait(5)
+        start = time.perf_counter()
+        for _ in range(4):
+            service.predict_depression_risk(SAMPLE_TEST)
+        assert time.perf_counter() - start < 1.0
+        # One test in the stuck worker, one queued, the rest dropped
+        assert evaluator.report()["dropped"] == 3
+    finally:
+        release.set()
+        evaluator.stop()
+
+
+def test_shadow_endpoint(monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "MODEL_ADMIN_TOKEN", "secret")
+    client = TestClient(app)
+    assert client.get("/models/shadow").status_code == 403
+    response = client.get("/models/shadow", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["compared"] == 0
+    assert client.post("/models/shadow/reload", headers={"X-Admin-Token": "secret"}).status_code == 404
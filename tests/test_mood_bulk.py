@@ -0,0 +1,118 @@
+"""
+Tests for bulk mood entry uploads (POST /moods/bulk)
+
+To run tests:
+    pytest tests/test_mood_bulk.py -v
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import JSON, event
+
+from app.config import settings
+from app.database import Base, get_db
+from app.main import app
+from app.models.mood import MoodJournaling
+from app.models.user import User
+from app.utils.security import create_access_token
+from tests.conftest import TestingSessionLocal, engine
+
+TABLES = [Base.metadata.tables["users"], Base.metadata.tables["mood_journaling"]]
+
+
+@pytest.fixture(scope="function")
+def mood_client(monkeypatch):
+    """Test client and auth header of a user, with mood_journaling.activities stored as JSON on SQLite"""
+    monkeypatch.setattr(MoodJournaling.__table__.c.activities, "type", JSON())
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+
+    def override_get_db():
+        with TestingSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with TestingSessionLocal() as db:
+            user = User(email="bulk@example.com", full_name="Bulk", hashed_password="x")
+            db.add(user)
+            db.commit()
+            headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+            yield TestClient(app), user.id, headers
+    finally:
+        app.dependency_overrides.clear()
+        Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+def test_bulk_stores_valid_entries_and_reports_invalid_ones(mood_client):
+    client, user_id, headers = mood_client
+    entries = [
+        {"mood_type": "happy", "activities": ["walk"], "created_at": "2026-10-15T08:00:00Z"},
+        {"activities": ["walk"]},
+        {"mood_type": "calm", "selected_date": "2026-10-16", "note": "offline"},
+        {"mood_type": "x" * 51},
+        {"mood_type": "sad", "activities": ["y" * 101]},
+        {"mood_type": "tired"},
+    ]
+    response = client.post("/moods/bulk", json={"entries": entries}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (3, 3)
+    assert [item["index"] for item in body["results"]] == list(range(len(entries)))
+
+    stored = [item for item in body["results"] if item["mood_id"] is not None]
+    assert [item["index"] for item in stored] == [0, 2, 5]
+    assert all(item["error"] is None for item in stored)
+    assert body["results"][1]["error"].startswith("mood_type:")
+    assert "50 characters" in body["results"][3]["error"]
+    assert "100 characters" in body["results"][4]["error"]
+
+    # mood_ids line up with the entries they were returned for
+    with TestingSessionLocal() as db:
+        moods = {mood.mood_id: mood for mood in db.query(MoodJournaling).filter(MoodJournaling.user_id == user_id)}
+    assert [moods[item["mood_id"]].mood_type for item in stored] == ["happy", "calm", "tired"]
+    assert moods[stored[1]["mood_id"]].created_at.date().isoformat() == "2026-10-16"
+    assert moods[stored[1]["mood_id"]].note == "offline"
+
+
+def test_bulk_commits_once(mood_client):
+    """All entries are stored in one transaction
+
+    PostgreSQL receives them as one multi-row INSERT; SQLite cannot order the
+    RETURNING rows of one, so SQLAlchemy sends an INSERT per row there.
+    """
+    client, _, headers = mood_client
+    commits = []
+
+    def record_commit(conn):
+        commits.append(conn)
+
+    event.listen(engine, "commit", record_commit)
+    try:
+        entries = [{"mood_type": "happy", "activities": [f"a{i}"]} for i in range(100)]
+        response = client.post("/moods/bulk", json={"entries": entries}, headers=headers)
+    finally:
+        event.remove(engine, "commit", record_commit)
+    assert response.json()["created"] == 100
+    assert len(set(item["mood_id"] for item in response.json()["results"])) == 100
+    assert len(commits) == 1
+
+
+def test_bulk_request_size_limits(mood_client):
+    client, _, headers = mood_client
+    assert client.post("/moods/bulk", json={"entries": []}, headers=headers).status_code == 422
+    too_many = [{"mood_type": "happy"}] * (settings.MOOD_BULK_MAX_SIZE + 1)
+    assert client.post("/moods/bulk", json={"entries": too_many}, headers=headers).status_code == 422
+    assert client.post("/moods/bulk", json={"entries": [{"mood_type": "happy"}]}).status_code == 401
+
+
+def test_bulk_with_only_invalid_entries(mood_client):
+    client, _, headers = mood_client
+    response = client.post("/moods/bulk", json={"entries": [{"note": "no mood"}, "not an object"]}, headers=headers)
+    # The request shape is checked before the entries, so a non-object entry rejects the request
+    assert response.status_code == 422
+    response = client.post("/moods/bulk", json={"entries": [{"note": "no mood"}]}, headers=headers)
+    assert response.json() == {
+        "created": 0,
+        "failed": 1,
+        "results": [{"index": 0, "mood_id": None, "error": "mood_type: Field required"}],
+    }
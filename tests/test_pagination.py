@@ -0,0 +1,121 @@
+"""
+Tests for cursor pagination of the per-user listings
+
+To run tests:
+    pytest tests/test_pagination.py -v
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.depression_risk_result import DepressionRiskResult
+from app.models.mood import MoodJournaling
+from app.models.notification import Notification
+from app.utils.pagination import decode_cursor, encode_cursor
+from tests.conftest import TestingSessionLocal, create_user
+
+
+@pytest.fixture(scope="function")
+def listing(api_client):
+    """A user with 7 moods, 7 notifications and 7 risk results, three of each sharing one timestamp"""
+    user_id, headers = create_user("pages@example.com")
+    with TestingSessionLocal() as db:
+        now = datetime.utcnow().replace(microsecond=0)
+        timestamps = [now - timedelta(hours=hours) for hours in (0, 1, 2, 2, 2, 3, 4)]
+        db.add_all(
+            MoodJournaling(user_id=user_id, mood_type=f"m{i}", activities=["walk"], created_at=created_at)
+            for i, created_at in enumerate(timestamps)
+        )
+        db.add_all(
+            Notification(user_id=user_id, type="reminder", title=f"n{i}", message="m", created_at=created_at)
+            for i, created_at in enumerate(timestamps)
+        )
+        db.add_all(
+            DepressionRiskResult(user_id=user_id, risk_level="Low", risk_score=i / 10, created_at=created_at)
+            for i, created_at in enumerate(timestamps)
+        )
+        db.commit()
+    return api_client, user_id, headers
+
+
+def read_all_pages(client, url, headers, key):
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200
+        pages.append(response.json()[key])
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 17, 8, 30)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    for cursor in ("not-a-cursor", encode_cursor(created_at, 1)[:-4], "W10"):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+def test_notification_pages_cover_every_row_once(listing):
+    client, _, headers = listing
+    pages = read_all_pages(client, "/notifications/", headers, "items")
+    assert [len(page) for page in pages] == [3, 3, 1]
+    titles = [item["title"] for page in pages for item in page]
+    # Newest first; rows with the same created_at come in id order, highest first
+    assert titles == ["n0", "n1", "n4", "n3", "n2", "n5", "n6"]
+
+    response = client.get("/notifications/", params={"cursor": "garbage"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_mood_pages_cover_every_row_once(listing):
+    client, _, headers = listing
+    pages = read_all_pages(client, "/moods/", headers, "items")
+    assert [len(page) for page in pages] == [3, 3, 1]
+    # The page boundary falls inside the three entries sharing a created_at
+    assert [item["mood_type"] for item in pages[0]] == ["m0", "m1", "m4"]
+    assert [item["mood_type"] for page in pages for item in page] == ["m0", "m1", "m4", "m3", "m2", "m5", "m6"]
+
+    response = client.get("/moods/", params={"cursor": "garbage"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_mood_pages_with_server_default_timestamps(api_client):
+    """Entries saved within one second share created_at on SQLite, so every page boundary is a tie"""
+    user_id, headers = create_user("ties@example.com")
+    with TestingSessionLocal() as db:
+        db.add_all(MoodJournaling(user_id=user_id, mood_type=f"m{i}", activities=[]) for i in range(5))
+        db.commit()
+        assert db.query(MoodJournaling.created_at).distinct().count() == 1
+        mood_ids = [mood_id for (mood_id,) in db.query(MoodJournaling.mood_id).order_by(MoodJournaling.mood_id.desc())]
+    pages = read_all_pages(api_client, "/moods/", headers, "items")
+    assert [len(page) for page in pages] == [3, 2]
+    assert [item["mood_id"] for page in pages for item in page] == mood_ids
+
+
+def test_daily_risk_result_pages(listing):
+    client, user_id, headers = listing
+    pages = read_all_pages(client, f"/depression-risk-results/{user_id}/daily", headers, "results")
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [item["risk_score"] for page in pages for item in page] == [0.0, 0.1, 0.4, 0.3, 0.2, 0.5, 0.6]
+
+
+def test_legacy_list_responses(listing, monkeypatch):
+    from app.config import settings
+
+    client, user_id, headers = listing
+    monkeypatch.setattr(settings, "LEGACY_LIST_RESPONSES", True)
+
+    assert len(client.get("/moods/", params={"limit": 1}, headers=headers).json()) == 7
+
+    response = client.get("/notifications/", params={"skip": 5}, headers=headers)
+    assert [item["title"] for item in response.json()] == ["n5", "n6"]
+
+    response = client.get(f"/depression-risk-results/{user_id}/daily", params={"limit": 1}, headers=headers)
+    assert len(response.json()["results"]) == 7
+    assert response.json()["next_cursor"] is None
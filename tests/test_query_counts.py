@@ -0,0 +1,145 @@
+"""
+Statement counts of the write endpoints
+
+Every write runs in one transaction with no refresh round-trips: inserts get
+their ids and server defaults back through RETURNING, and sessions keep rows
+loaded after commit. These tests pin how many statements each endpoint sends,
+so an extra SELECT per write shows up as a failure.
+
+To run tests:
+    pytest tests/test_query_counts.py -v
+"""
+
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import auth as auth_api
+from app.database import Base, get_async_db, get_db, to_async_database_url
+from app.main import app
+from app.models.emergency_contact import EmergencyContact
+from app.models.user import User
+from app.utils.security import create_access_token
+from tests.conftest import TEST_DATABASE_URL, engine
+from tests.test_ml import SAMPLE_TEST
+
+# mood_journaling uses a PostgreSQL ARRAY column, so only create the tables these tests need
+TABLES = [
+    Base.metadata.tables["users"],
+    Base.metadata.tables["emergency_contacts"],
+    Base.metadata.tables["depression_tests"],
+    Base.metadata.tables["depression_risk_results"],
+    Base.metadata.tables["notifications"],
+    Base.metadata.tables["chat_history"],
+]
+
+# Sessions configured like app.database's
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+
+@pytest.fixture(scope="function")
+def setup(monkeypatch):
+    """Test client on the test database, a user with an emergency contact, and a statement counter"""
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    async_engine = create_async_engine(to_async_database_url(TEST_DATABASE_URL))
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    def override_get_db():
+        with SessionLocal() as session:
+            yield session
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as session:
+            yield session
+
+    async def no_email(*args):
+        return True
+
+    monkeypatch.setattr(auth_api, "send_welcome_email", no_email)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    @contextmanager
+    def counting():
+        statements.clear()
+        yield statements
+
+    for counted in (engine, async_engine.sync_engine):
+        event.listen(counted, "before_cursor_execute", record)
+    try:
+        with SessionLocal() as db:
+            user = User(email="writer@example.com", full_name="Writer", hashed_password="x")
+            db.add(user)
+            db.commit()
+            db.add(EmergencyContact(user_id=user.id, contact_name="Friend", contact_email="friend@example.com"))
+            db.commit()
+            headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+        yield TestClient(app), user.id, headers, counting
+    finally:
+        for counted in (engine, async_engine.sync_engine):
+            event.remove(counted, "before_cursor_execute", record)
+        app.dependency_overrides.clear()
+        asyncio.run(async_engine.dispose())
+        Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+def test_create_notification_statements(setup):
+    client, _, headers, counting = setup
+    with counting() as statements:
+        response = client.post(
+            "/notifications/", json={"type": "reminder", "title": "Check in", "message": "Hi"}, headers=headers
+        )
+    assert response.status_code == 200
+    assert response.json()["created_at"] is not None
+    # Current user, then the INSERT ... RETURNING
+    assert statements == ["SELECT", "INSERT"]
+
+
+def test_create_depression_test_statements(setup):
+    client, user_id, headers, counting = setup
+    with counting() as statements:
+        response = client.post("/depression-test", json=dict(SAMPLE_TEST, user_id=user_id), headers=headers)
+    assert response.status_code == 201
+    assert response.json()["created_at"] is not None
+    # Current user, the test and its result, committed together
+    assert statements == ["SELECT", "INSERT", "INSERT"]
+
+
+def test_push_preferences_statements(setup):
+    client, _, headers, counting = setup
+    with counting() as statements:
+        response = client.patch("/push-notifications/preferences", json={"enabled": False}, headers=headers)
+    assert response.json()["push_enabled"] is False
+    assert statements == ["SELECT", "UPDATE"]
+
+
+def test_signup_statements(setup):
+    client, _, _, counting = setup
+    with counting() as statements:
+        response = client.post(
+            "/auth/signup",
+            json={"email": "new@example.com", "full_name": "New User", "password": "password123"},
+        )
+    assert response.status_code == 201
+    # Email taken?, then the INSERT ... RETURNING
+    assert statements == ["SELECT", "INSERT"]
+
+
+def test_update_emergency_contact_statements(setup):
+    client, _, headers, counting = setup
+    with counting() as statements:
+        response = client.put("/emergency-contact/", json={"contact_name": "Sibling"}, headers=headers)
+    assert response.json()["contact_name"] == "Sibling"
+    assert response.json()["created_at"] is not None
+    # Current user with its contact, the contact, then the UPDATE
+    assert statements == ["SELECT", "SELECT", "UPDATE"]
@@ -0,0 +1,126 @@
+"""
+Query plan tests: per-user time-series reads must use the (user_id, created_at) indexes
+
+Plans come from SQLite's EXPLAIN QUERY PLAN for the SQL the CRUD functions
+actually emit. mood_journaling needs PostgreSQL (ARRAY column), so its index is
+only covered by the migration.
+
+To run tests:
+    pytest tests/test_query_plans.py -v
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, text
+
+from app.crud import depression_risk_result as risk_crud
+from app.crud import depression_test as test_crud
+from app.crud import notification as notification_crud
+from app.database import Base
+from app.models.depression_risk_result import DepressionRiskResult
+from app.models.depression_test import DepressionTest
+from app.models.notification import Notification
+from app.models.user import User
+from tests.conftest import TestingSessionLocal, engine
+
+TABLES = [
+    Base.metadata.tables["users"],
+    Base.metadata.tables["depression_tests"],
+    Base.metadata.tables["depression_risk_results"],
+    Base.metadata.tables["notifications"],
+]
+
+USERS = 20
+ROWS_PER_USER = 50
+
+
+@pytest.fixture(scope="module")
+def db():
+    """Several users with a history of tests, results and notifications, with planner statistics"""
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+    session = TestingSessionLocal()
+    try:
+        now = datetime.utcnow()
+        users = [User(email=f"user{i}@example.com", full_name=f"User {i}", hashed_password="x") for i in range(USERS)]
+        session.add_all(users)
+        session.flush()
+        for user in users:
+            for day in range(ROWS_PER_USER):
+                created_at = now - timedelta(days=day)
+                test = DepressionTest(user_id=user.id, mood="Happy", created_at=created_at)
+                session.add(test)
+                session.flush()
+                session.add_all([
+                    DepressionRiskResult(
+                        user_id=user.id,
+                        depression_test_id=test.depression_test_id,
+                        risk_level="Low",
+                        risk_score=0.1,
+                        created_at=created_at,
+                    ),
+                    Notification(
+                        user_id=user.id,
+                        type="reminder",
+                        title="Check in",
+                        message="How are you?",
+                        is_read=day > 2,
+                        created_at=created_at,
+                    ),
+                ])
+        session.commit()
+        session.execute(text("ANALYZE"))
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+def query_plans(db, run) -> str:
+    """EXPLAIN QUERY PLAN of every statement run() executes, one plan step per line"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    lines = []
+    connection = db.connection()
+    for statement, parameters in statements:
+        for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+            lines.append(row[-1])
+    return "\n".join(lines)
+
+
+def assert_uses_index(plan: str, index: str):
+    assert f"INDEX {index}" in plan, plan
+
+
+def test_notification_reads_use_user_created_at_indexes(db):
+    plan = query_plans(db, lambda: notification_crud.get_notifications(db, user_id=1, limit=20))
+    assert_uses_index(plan, "ix_notifications_user_id_created_at")
+    assert "TEMP B-TREE" not in plan  # rows come out of the index already ordered
+
+    plan = query_plans(db, lambda: notification_crud.get_unread_notifications(db, user_id=1))
+    assert_uses_index(plan, "ix_notifications_unread_user_id_created_at")
+
+
+def test_risk_result_reads_use_user_created_at_index(db):
+    plan = query_plans(db, lambda: risk_crud.get_latest_risk_result_by_user(db, user_id=1))
+    assert_uses_index(plan, "ix_depression_risk_results_user_id_created_at")
+
+    plan = query_plans(db, lambda: risk_crud.get_daily_risk_results(db, user_id=1, days=7))
+    assert_uses_index(plan, "ix_depression_risk_results_user_id_created_at")
+
+
+def test_depression_test_lookup_uses_user_created_at_index(db):
+    plan = query_plans(
+        db, lambda: test_crud.has_user_submitted_test_on_date(db, user_id=1, local_date=date.today(), timezone_name="UTC")
+    )
+    assert_uses_index(plan, "ix_depression_tests_user_id_created_at")
+    assert "SCAN depression_tests" not in plan
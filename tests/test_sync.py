@@ -0,0 +1,179 @@
+"""
+Tests for delta sync (GET /sync)
+
+To run tests:
+    pytest tests/test_sync.py -v
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import JSON, text
+
+from app.config import settings
+from app.crud import sync as sync_crud
+from app.crud.notification import mark_all_notifications_as_read
+from app.database import Base, get_db
+from app.main import app
+from app.models.depression_risk_result import DepressionRiskResult
+from app.models.mood import MoodJournaling
+from app.models.notification import Notification
+from app.models.sync_tombstone import SyncTombstone
+from app.models.user import User
+from app.utils.security import create_access_token
+from tests.conftest import TestingSessionLocal, engine
+from tests.test_query_plans import assert_uses_index, query_plans
+
+TABLES = [
+    Base.metadata.tables["users"],
+    Base.metadata.tables["mood_journaling"],
+    Base.metadata.tables["notifications"],
+    Base.metadata.tables["depression_tests"],
+    Base.metadata.tables["depression_risk_results"],
+    Base.metadata.tables["sync_tombstones"],
+]
+
+
+@pytest.fixture(scope="function")
+def sync_client(monkeypatch):
+    """Test client and auth header of a user with a mood, a notification and a risk result
+
+    SQLite has no ARRAY type, so mood_journaling.activities is stored as JSON here.
+    """
+    monkeypatch.setattr(MoodJournaling.__table__.c.activities, "type", JSON())
+    monkeypatch.setattr(settings, "SYNC_WATERMARK_LAG_SECONDS", 0.0)
+    Base.metadata.create_all(bind=engine, tables=TABLES)
+
+    def override_get_db():
+        with TestingSessionLocal() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with TestingSessionLocal() as db:
+            user = User(email="sync@example.com", full_name="Sync", hashed_password="x")
+            db.add(user)
+            db.commit()
+            db.add_all([
+                MoodJournaling(user_id=user.id, mood_type="happy", activities=["walk"]),
+                Notification(user_id=user.id, type="reminder", title="Check in", message="How are you?"),
+                DepressionRiskResult(user_id=user.id, risk_level="Low", risk_score=0.2),
+            ])
+            db.commit()
+            headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+            yield TestClient(app), user.id, headers
+    finally:
+        app.dependency_overrides.clear()
+        Base.metadata.drop_all(bind=engine, tables=TABLES)
+
+
+def sync(client, headers, since=None):
+    params = {"since": since} if since else {}
+    response = client.get("/sync", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_first_sync_is_full(sync_client):
+    client, user_id, headers = sync_client
+    body = sync(client, headers)
+    assert body["full"] is True
+    assert [mood["mood_type"] for mood in body["moods"]] == ["happy"]
+    assert [item["title"] for item in body["notifications"]] == ["Check in"]
+    assert [result["risk_score"] for result in body["risk_results"]] == [0.2]
+    assert body["deleted"] == {"moods": [], "notifications": [], "risk_results": []}
+    assert client.get("/sync").status_code == 401
+
+
+def test_delta_sync_returns_only_changes_and_tombstones(sync_client):
+    client, user_id, headers = sync_client
+    watermark = sync(client, headers)["watermark"]
+
+    # Nothing changed since
+    body = sync(client, headers, watermark)
+    assert body["full"] is False
+    assert (body["moods"], body["notifications"], body["risk_results"]) == ([], [], [])
+
+    with TestingSessionLocal() as db:
+        mood_id = db.query(MoodJournaling.mood_id).scalar()
+        notification_id = db.query(Notification.id).scalar()
+        mood_day = db.query(MoodJournaling.created_at).scalar()
+    client.post("/notifications/", json={"type": "result", "title": "New", "message": "m"}, headers=headers)
+    assert client.patch("/notifications/read-all", headers=headers).status_code == 200
+    deleted = client.delete("/moods/daily", params={"selected_date": mood_day.date().isoformat(), "mood_id": mood_id}, headers=headers)
+    assert deleted.json() == {"deleted": 1}
+
+    body = sync(client, headers, watermark)
+    assert body["moods"] == []
+    assert body["risk_results"] == []
+    # Marking read updated the old notification too
+    assert sorted(item["id"] for item in body["notifications"]) == sorted([notification_id, notification_id + 1])
+    assert all(item["is_read"] for item in body["notifications"])
+    assert body["deleted"] == {"moods": [mood_id], "notifications": [], "risk_results": []}
+
+    client.delete("/notifications/", headers=headers)
+    later = sync(client, headers, body["watermark"])
+    assert later["notifications"] == []
+    assert sorted(later["deleted"]["notifications"]) == sorted([notification_id, notification_id + 1])
+
+
+def test_stale_or_naive_watermarks(sync_client):
+    client, _, headers = sync_client
+    stale = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+    body = sync(client, headers, stale.isoformat())
+    assert body["full"] is True
+    assert len(body["moods"]) == 1
+
+    # A watermark without an offset is UTC
+    naive = (datetime.now(timezone.utc) + timedelta(minutes=1)).replace(tzinfo=None)
+    body = sync(client, headers, naive.isoformat())
+    assert body["full"] is False
+    assert body["notifications"] == []
+    assert client.get("/sync", params={"since": "yesterday"}, headers=headers).status_code == 422
+
+
+def test_mark_all_read_bumps_updated_at(sync_client):
+    _, user_id, _ = sync_client
+    with TestingSessionLocal() as db:
+        before = db.query(Notification.updated_at).scalar()
+        assert mark_all_notifications_as_read(db, user_id) == 1
+        assert db.query(Notification.updated_at).scalar() > before
+
+
+def test_record_deletions_prunes_expired_tombstones(sync_client):
+    _, user_id, _ = sync_client
+    with TestingSessionLocal() as db:
+        expired = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+        db.add(SyncTombstone(user_id=user_id, table_name="notifications", row_id=99, deleted_at=expired))
+        db.commit()
+        sync_crud.record_deletions(db, user_id, "notifications", [100])
+        db.commit()
+        assert [row_id for (row_id,) in db.query(SyncTombstone.row_id)] == [100]
+
+
+def test_sync_queries_use_updated_at_indexes(sync_client):
+    _, user_id, _ = sync_client
+    with TestingSessionLocal() as db:
+        # Enough history per user that the planner prefers the composite indexes
+        db.add_all(User(email=f"other{i}@example.com", full_name="Other", hashed_password="x") for i in range(20))
+        db.flush()
+        db.add_all(
+            Notification(user_id=other, type="reminder", title="t", message="m")
+            for other in range(user_id + 1, user_id + 21)
+            for _ in range(20)
+        )
+        db.add_all(
+            SyncTombstone(user_id=other, table_name="notifications", row_id=i)
+            for other in range(user_id + 1, user_id + 21)
+            for i in range(20)
+        )
+        db.commit()
+        db.execute(text("ANALYZE"))
+
+        since = datetime.now(timezone.utc) - timedelta(hours=1)
+        plan = query_plans(db, lambda: sync_crud.get_changes(db, user_id=user_id, since=since))
+    assert_uses_index(plan, "ix_mood_journaling_user_id_updated_at")
+    assert_uses_index(plan, "ix_notifications_user_id_updated_at")
+    assert_uses_index(plan, "ix_depression_risk_results_user_id_updated_at")
+    assert_uses_index(plan, "ix_sync_tombstones_user_id_deleted_at")
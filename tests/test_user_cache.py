@@ -0,0 +1,133 @@
+"""
+Tests for the user cache behind get_current_user
+
+To run tests:
+    pytest tests/test_user_cache.py -v
+"""
+
+import time
+
+import pytest
+from sqlalchemy import JSON, event
+
+from app.api import email as email_api
+from app.crud import user as user_crud
+from app.models.mood import MoodJournaling
+from app.services.user_cache import UserCache, user_cache
+from tests.conftest import TestingSessionLocal, engine
+from tests.test_async_db import async_client, async_db, async_user  # noqa: F401  (fixtures)
+
+
+@pytest.fixture(scope="function")
+def mood_table(async_db, monkeypatch):
+    """Deleting a user cascades to mood_journaling; SQLite stores its ARRAY column as JSON here"""
+    monkeypatch.setattr(MoodJournaling.__table__.c.activities, "type", JSON())
+    MoodJournaling.__table__.create(bind=engine)
+    yield
+    MoodJournaling.__table__.drop(bind=engine)
+
+
+def count_statements(run):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = run()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, statements
+
+
+def test_cached_user_skips_the_users_query(async_client, async_user):
+    user_id, headers = async_user
+    response, statements = count_statements(lambda: async_client.get("/push-notifications/status", headers=headers))
+    assert response.status_code == 200
+    assert statements == ["SELECT"]
+    hits = user_cache.stats()["hits"]
+
+    response, statements = count_statements(lambda: async_client.get("/push-notifications/status", headers=headers))
+    assert response.status_code == 200
+    assert statements == []
+    assert user_cache.stats()["hits"] == hits + 1
+
+    # The cached user is attached to the request's session: changes to it are committed
+    response, statements = count_statements(
+        lambda: async_client.patch("/push-notifications/preferences", json={"enabled": False}, headers=headers)
+    )
+    assert response.json()["push_enabled"] is False
+    assert statements[0] == "UPDATE"
+    with TestingSessionLocal() as db:
+        assert user_crud.get_user_by_id(db, user_id).is_push_reminder_enabled is False
+
+
+def test_deleted_user_is_rejected_immediately(async_client, async_user, mood_table):
+    _, headers = async_user
+    assert async_client.get("/push-notifications/status", headers=headers).status_code == 200
+    assert async_client.get("/push-notifications/status", headers=headers).status_code == 200  # from the cache
+
+    assert async_client.delete("/user/profile", headers=headers).status_code == 204
+    assert async_client.get("/push-notifications/status", headers=headers).status_code == 401
+    assert async_client.get("/push-notifications/status", headers=headers).status_code == 401
+
+
+def test_deleted_user_is_rejected_immediately_sync_crud(async_client, async_user, mood_table):
+    user_id, headers = async_user
+    assert async_client.get("/push-notifications/status", headers=headers).status_code == 200
+    with TestingSessionLocal() as db:
+        assert user_crud.delete_user(db, user_id)
+    assert async_client.get("/push-notifications/status", headers=headers).status_code == 401
+
+
+def test_writes_invalidate_the_cached_user(async_client, async_user, monkeypatch):
+    user_id, headers = async_user
+
+    def push_status():
+        return async_client.get("/push-notifications/status", headers=headers).json()
+
+    assert push_status() == {"push_enabled": True, "token_registered": False}
+
+    # Profile update through update_user_async
+    assert async_client.put("/user/profile", json={"is_push_reminder_enabled": False}, headers=headers).status_code == 200
+    assert push_status()["push_enabled"] is False
+
+    # Push token endpoints
+    async_client.post("/push-notifications/register-token", json={"fcm_token": "device-token-0123456789"}, headers=headers)
+    assert push_status() == {"push_enabled": True, "token_registered": True}
+    async_client.delete("/push-notifications/token", headers=headers)
+    assert push_status()["token_registered"] is False
+
+    # Password reset
+    assert user_cache.get(user_id) is not None
+    monkeypatch.setattr(email_api, "is_code_verified", lambda email: True)
+    response = async_client.post(
+        "/email/reset-password", json={"email": "async@example.com", "new_password": "newpassword123"}
+    )
+    assert response.status_code == 200
+    assert user_cache.get(user_id) is None
+
+
+def test_entries_expire_and_are_bounded():
+    cache = UserCache(max_size=2, ttl=0.05)
+    cache.put(1, {"id": 1}, cache.generation)
+    assert cache.get(1) == {"id": 1}
+    time.sleep(0.06)
+    assert cache.get(1) is None
+
+    for user_id in (1, 2, 3):
+        cache.put(user_id, {"id": user_id}, cache.generation)
+    assert cache.get(1) is None  # least recently used, evicted
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 2, 1)
+    assert stats["hit_rate"] == 1 / 3
+
+
+def test_row_read_before_an_invalidation_is_not_stored():
+    cache = UserCache(max_size=10, ttl=60)
+    generation = cache.generation  # a request starts reading user 1
+    cache.invalidate(1)  # another request commits a change to it
+    cache.put(1, {"id": 1, "full_name": "Old"}, generation)
+    assert cache.get(1) is None
+    assert "lumora_user_cache_invalidations_total 1" in cache.render()